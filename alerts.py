@@ -0,0 +1,417 @@
+import json
+import math
+import queue
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from collections import deque
+from datetime import datetime
+
+import numpy as np
+import requests
+
+from config import ALERT_RULES_FILE, ALERT_FILE, ALERT_WEBHOOK_URL
+
+# Rule operators and the direction of the move that fires them
+OPERATORS = {
+    '>': 'above',
+    'crosses_above': 'above',
+    '<': 'below',
+    'crosses_below': 'below',
+    'crosses': 'both'
+}
+
+# The levels get_momentum_analysis and get_volatility_analysis label on screen
+DEFAULT_RULES = [
+    {'rule': 'RSI > 70', 'name': 'RSI overbought'},
+    {'rule': 'RSI < 30', 'name': 'RSI oversold'},
+    {'rule': 'stoch_k > 80', 'name': 'Stochastic overbought'},
+    {'rule': 'stoch_k < 20', 'name': 'Stochastic oversold'},
+    {'rule': 'volatility_ratio > 1.5', 'name': 'High volatility'},
+    {'rule': 'price crosses_above BB_upper', 'name': 'Price above upper Bollinger Band'},
+    {'rule': 'price crosses_below BB_lower', 'name': 'Price below lower Bollinger Band'},
+    {'rule': 'SMA_50 crosses_above SMA_200', 'name': 'Golden cross'},
+    {'rule': 'SMA_50 crosses_below SMA_200', 'name': 'Death cross'}
+]
+
+# Fired alerts kept for /alerts
+ALERT_HISTORY = 200
+
+# Alert batches waiting for the sinks; newer batches are dropped once the
+# sinks fall this far behind
+SINK_QUEUE_SIZE = 100
+
+
+class AlertRule:
+    """
+    One alert condition: a column compared with a number or another column
+
+    Rules fire when their condition becomes true (an edge), not on every
+    bar it stays true. Comparing two columns is a threshold of 0 on their
+    difference, so both kinds share the same threshold index.
+    """
+
+    def __init__(self, rule_id, field, operator, value, name=None):
+        if operator not in OPERATORS:
+            raise ValueError(f"Unsupported operator {operator}, use one of: {', '.join(OPERATORS)}")
+
+        self.id = rule_id
+        self.field = field
+        self.operator = operator
+        self.value = value
+        self.direction = OPERATORS[operator]
+        self.text = f"{field} {operator} {value if isinstance(value, str) else format(value, 'g')}"
+        self.name = name or self.text
+
+        if isinstance(value, str):
+            self.series = (field, value)
+            self.threshold = 0.0
+        else:
+            self.series = field
+            self.threshold = float(value)
+
+    @classmethod
+    def parse(cls, rule_id, text, name=None):
+        """Rule from text such as 'RSI > 70' or 'price crosses_above BB_upper'"""
+        parts = text.split()
+        if len(parts) != 3:
+            raise ValueError(f"Can't parse alert rule '{text}', expected '<column> <operator> <number or column>'")
+
+        field, operator, value = parts
+        try:
+            value = float(value)
+        except ValueError:
+            pass
+        return cls(rule_id, field, operator, value, name)
+
+    def to_dict(self):
+        return {'id': self.id, 'rule': self.text, 'name': self.name}
+
+class ThresholdIndex:
+    """
+    Sorted thresholds of the rules on one series, per direction
+
+    When the series moves from p to v, the rules that fire are a contiguous
+    slice of the sorted thresholds (above: p <= t < v, below: v < t <= p),
+    found with two binary searches however many rules there are.
+    """
+
+    def __init__(self):
+        self.above_thresholds, self.above_ids = [], []
+        self.below_thresholds, self.below_ids = [], []
+
+    def __len__(self):
+        return len(set(self.above_ids) | set(self.below_ids))
+
+    def add(self, rule):
+        if rule.direction in ('above', 'both'):
+            self._insert(self.above_thresholds, self.above_ids, rule)
+        if rule.direction in ('below', 'both'):
+            self._insert(self.below_thresholds, self.below_ids, rule)
+
+    def remove(self, rule):
+        for thresholds, ids in ((self.above_thresholds, self.above_ids), (self.below_thresholds, self.below_ids)):
+            if rule.id in ids:
+                position = ids.index(rule.id)
+                del thresholds[position]
+                del ids[position]
+
+    @staticmethod
+    def _insert(thresholds, ids, rule):
+        position = bisect_right(thresholds, rule.threshold)
+        thresholds.insert(position, rule.threshold)
+        ids.insert(position, rule.id)
+
+    def crossed(self, previous, current):
+        """Ids of the rules whose condition became true moving from previous to current"""
+        if current > previous:
+            return self.above_ids[bisect_left(self.above_thresholds, previous):
+                                  bisect_left(self.above_thresholds, current)]
+        if current < previous:
+            return self.below_ids[bisect_right(self.below_thresholds, current):
+                                  bisect_right(self.below_thresholds, previous)]
+        return []
+
+class LogSink:
+    """Prints fired alerts"""
+
+    def send(self, alerts):
+        for alert in alerts:
+            print(f"🔔 {alert['timestamp']} {alert['name']}: {alert['rule']} ({alert['value']:.4g})")
+
+class FileSink:
+    """Appends fired alerts to a JSON lines file"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def send(self, alerts):
+        with open(self.path, 'a') as f:
+            for alert in alerts:
+                f.write(json.dumps(alert) + "\n")
+
+class WebhookSink:
+    """POSTs each batch of fired alerts as JSON (mock_market_server.py serves a /webhook stand-in)"""
+
+    def __init__(self, url, timeout=5):
+        self.url = url
+        self.timeout = timeout
+
+    def send(self, alerts):
+        response = requests.post(self.url, json={'alerts': alerts}, timeout=self.timeout)
+        if response.status_code >= 400:
+            raise RuntimeError(f"webhook returned status {response.status_code}")
+
+class AlertEngine:
+    """
+    Evaluates registered alert rules bar by bar against the indicator data
+
+    Rules are grouped per series (a column, or the difference of two
+    columns) in threshold indexes, so each new bar costs a couple of binary
+    searches per series, independent of the number of rules. Only bars
+    newer than the last evaluated one are processed on each refresh.
+    Fired alerts are handed to the sinks from a background thread, so a
+    slow webhook never holds up a refresh.
+
+    Parameters:
+    rules (list): Rule texts or {'rule': ..., 'name': ...} dicts
+    sinks (list): Objects with a send(alerts) method, called once per batch
+    """
+
+    def __init__(self, rules=(), sinks=(), history=ALERT_HISTORY):
+        self.sinks = list(sinks)
+        self.rules = {}
+        self.last_timestamp = None
+        self.evaluated_bars = 0
+        self.fired = 0
+        self.last_evaluation_ms = None
+        self.history = deque(maxlen=history)
+
+        self._indexes = {}
+        self._previous = {}
+        self._open_bar = None
+        self._open_fired = set()
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+        self._outbox = queue.Queue(maxsize=SINK_QUEUE_SIZE)
+        self._sender = None
+        self._sender_lock = threading.Lock()
+
+        for rule in rules:
+            if isinstance(rule, dict):
+                self.add_rule(rule['rule'], rule.get('name'))
+            else:
+                self.add_rule(rule)
+
+    def add_rule(self, text, name=None):
+        """Register a rule such as 'RSI > 70'; returns its id"""
+        with self._lock:
+            rule = AlertRule.parse(self._next_id, text, name)
+            self._next_id += 1
+            self.rules[rule.id] = rule
+            self._indexes.setdefault(rule.series, ThresholdIndex()).add(rule)
+            return rule.id
+
+    def remove_rule(self, rule_id):
+        with self._lock:
+            rule = self.rules.pop(rule_id)
+            index = self._indexes[rule.series]
+            index.remove(rule)
+            if len(index) == 0:
+                del self._indexes[rule.series]
+                self._previous.pop(rule.series, None)
+
+    def columns(self):
+        """Data columns the rules read"""
+        names = set()
+        for series in self._indexes:
+            names.update(series if isinstance(series, tuple) else (series,))
+        return sorted(names)
+
+    def evaluate_frame(self, data, since=None):
+        """
+        Evaluate the bars of data after the last closed one evaluated (or after since)
+
+        The latest bar is still open and revised by every refresh, so it is
+        evaluated against the state of the last closed bar each time and only
+        committed once a newer bar arrives. Each rule fires at most once per
+        bar. On the first call only the latest bar is evaluated, against the
+        one before it, so loading the history doesn't replay years of alerts.
+        Returns the fired alerts.
+        """
+        start = time.perf_counter()
+        with self._lock:
+            if len(data) == 0:
+                return []
+
+            # first: the first bar to evaluate; the state is rebuilt from the
+            # bar before it unless it continues from the last committed bar
+            reseed = True
+            if since is not None:
+                first = int(data.index.searchsorted(since))
+                if first < len(data) and data.index[first] == since:
+                    first += 1
+            elif self.last_timestamp is None:
+                first = len(data) - 1
+            else:
+                first = int(data.index.searchsorted(self.last_timestamp))
+                if first < len(data) and data.index[first] == self.last_timestamp:
+                    first += 1
+                    reseed = False
+                # Otherwise the bar the state was taken at is gone; restart from the bar before the new ones
+            if first >= len(data):
+                return []
+
+            lead = max(first - 1, 0)
+            columns = [name for name in self.columns() if name in data.columns]
+            values = (data[columns].iloc[lead:].to_numpy(dtype=np.float64) if columns
+                      else np.empty((len(data) - lead, 0)))
+            timestamps = data.index[lead:]
+            positions = {name: i for i, name in enumerate(columns)}
+
+            if reseed:
+                self._previous = {}
+                self.last_timestamp = None
+                if first > 0:
+                    self._set_previous(values[0], positions)
+                    self.last_timestamp = timestamps[0]
+
+            alerts = []
+            fired_at = datetime.now().isoformat(timespec='seconds')
+            rows = list(zip(values[first - lead:], timestamps[first - lead:]))
+            for row, timestamp in rows[:-1]:
+                skip = self._open_fired if timestamp == self._open_bar else ()
+                alerts.extend(self._evaluate_row(row, positions, self._previous, timestamp, fired_at, skip))
+                self.last_timestamp = timestamp
+
+            # The open bar is evaluated on a copy of the committed state
+            row, timestamp = rows[-1]
+            skip = self._open_fired if timestamp == self._open_bar else set()
+            fired = self._evaluate_row(row, positions, dict(self._previous), timestamp, fired_at, skip)
+            self._open_bar = timestamp
+            self._open_fired = skip | {alert['rule_id'] for alert in fired}
+            alerts.extend(fired)
+
+            self.evaluated_bars += len(rows) - 1
+            self.fired += len(alerts)
+            self.history.extend(alerts)
+            self.last_evaluation_ms = (time.perf_counter() - start) * 1000
+
+        if alerts:
+            self._notify(alerts)
+        return alerts
+
+    def _series_value(self, series, row, positions):
+        if isinstance(series, tuple):
+            left, right = series
+            if left not in positions or right not in positions:
+                return math.nan
+            return row[positions[left]] - row[positions[right]]
+        return row[positions[series]] if series in positions else math.nan
+
+    def _set_previous(self, row, positions):
+        for series in self._indexes:
+            self._previous[series] = self._series_value(series, row, positions)
+
+    def _evaluate_row(self, row, positions, state, timestamp, fired_at, skip=()):
+        """Alerts of one bar against state (the previous values per series), which is updated to this bar"""
+        alerts = []
+        bar = None
+        for series, index in self._indexes.items():
+            current = self._series_value(series, row, positions)
+            previous = state.get(series, math.nan)
+            state[series] = current
+
+            # Indicators are NaN until their window fills; no edge without both values
+            if math.isnan(current) or math.isnan(previous):
+                continue
+
+            rule_ids = index.crossed(previous, current)
+            if rule_ids and bar is None:
+                bar = timestamp.isoformat() if hasattr(timestamp, 'isoformat') else str(timestamp)
+            for rule_id in rule_ids:
+                if rule_id in skip:
+                    continue
+                rule = self.rules[rule_id]
+                alerts.append({
+                    'rule_id': rule_id,
+                    'name': rule.name,
+                    'rule': rule.text,
+                    'timestamp': bar,
+                    'value': float(row[positions[rule.field]]),
+                    'fired_at': fired_at
+                })
+        return alerts
+
+    def _notify(self, alerts):
+        """Queue a batch for the sink thread (started on first use)"""
+        if not self.sinks:
+            return
+
+        try:
+            self._outbox.put_nowait(alerts)
+        except queue.Full:
+            print(f"❌ Alert sinks are falling behind, dropped {len(alerts)} alerts")
+            return
+
+        with self._sender_lock:
+            if self._sender is None:
+                self._sender = threading.Thread(target=self._send_batches, name="alert-sinks", daemon=True)
+                self._sender.start()
+
+    def _send_batches(self):
+        while True:
+            alerts = self._outbox.get()
+            for sink in self.sinks:
+                try:
+                    sink.send(alerts)
+                except Exception as e:
+                    print(f"❌ Alert sink {type(sink).__name__} failed: {e}")
+            self._outbox.task_done()
+
+    def flush(self):
+        """Wait until every queued batch has been handed to the sinks"""
+        self._outbox.join()
+
+    def snapshot(self):
+        """Rules, counters and the most recent alerts, for /alerts"""
+        with self._lock:
+            return {
+                'rules': [rule.to_dict() for rule in self.rules.values()],
+                'series': len(self._indexes),
+                'evaluated_bars': self.evaluated_bars,
+                'fired': self.fired,
+                'last_bar': self.last_timestamp.isoformat() if self.last_timestamp is not None else None,
+                'last_evaluation_ms': self.last_evaluation_ms,
+                'recent': list(self.history)[::-1]
+            }
+
+def load_rules(path):
+    """Rules from a JSON file: a list of rule texts or {'rule': ..., 'name': ...} objects"""
+    with open(path) as f:
+        rules = json.load(f)
+    if not isinstance(rules, list):
+        raise ValueError(f"{path} must contain a list of rules")
+    return rules
+
+def create_alert_engine():
+    """Alert engine with the configured rules (BTC_ALERT_RULES) and sinks"""
+    rules = DEFAULT_RULES
+    if ALERT_RULES_FILE:
+        try:
+            rules = load_rules(ALERT_RULES_FILE)
+        except Exception as e:
+            print(f"❌ Could not load alert rules from {ALERT_RULES_FILE}, using the defaults: {e}")
+
+    sinks = [LogSink()]
+    if ALERT_FILE:
+        sinks.append(FileSink(ALERT_FILE))
+    if ALERT_WEBHOOK_URL:
+        sinks.append(WebhookSink(ALERT_WEBHOOK_URL))
+
+    try:
+        return AlertEngine(rules, sinks)
+    except ValueError as e:
+        print(f"❌ Invalid alert rule, using the defaults: {e}")
+        return AlertEngine(DEFAULT_RULES, sinks)
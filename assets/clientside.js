@@ -0,0 +1,202 @@
+// Clientside callbacks for the Bitcoin dashboard.
+// Everything in here runs in the browser and never calls back to the server.
+
+(function () {
+    const TIME_RANGE_BUTTONS = {
+        '1m-btn': '1M',
+        '3m-btn': '3M',
+        '6m-btn': '6M',
+        '1y-btn': '1Y',
+        '2y-btn': '2Y'
+    };
+
+    const TIME_RANGE_LABEL = /\b(1M|3M|6M|1Y|2Y)\b/g;
+
+    // Dates without a timezone are read as UTC, as plotly places them
+    function toMs(value) {
+        if (typeof value === 'number') {
+            return value;
+        }
+        const text = String(value).replace(' ', 'T');
+        return Date.parse(/(Z|[+-]\d\d:?\d\d)$/.test(text) ? text : text + 'Z');
+    }
+
+    function relabel(title, label) {
+        if (!title) {
+            return title;
+        }
+        if (typeof title === 'string') {
+            return title.replace(TIME_RANGE_LABEL, label);
+        }
+        return Object.assign({}, title, {text: relabel(title.text, label)});
+    }
+
+    // Re-slice every trace to the window and fit each y axis to what is visible
+    function withTimeRange(figure, range, label) {
+        const start = toMs(range.start);
+        const end = toMs(range.end);
+        const layout = Object.assign({}, figure.layout);
+        const extents = {};
+
+        function include(axis, value) {
+            if (value === null || value === undefined || !isFinite(value)) {
+                return;
+            }
+            const extent = extents[axis] || (extents[axis] = [value, value]);
+            extent[0] = Math.min(extent[0], value);
+            extent[1] = Math.max(extent[1], value);
+        }
+
+        (figure.data || []).forEach(function (trace) {
+            const x = trace.x;
+            const y = trace.y;
+            if (!x || !y) {
+                return;
+            }
+            const axis = trace.yaxis || 'y';
+            for (let i = 0; i < x.length; i++) {
+                const t = toMs(x[i]);
+                if (t >= start && t <= end) {
+                    include(axis, y[i]);
+                }
+            }
+            if (trace.type === 'bar') {
+                include(axis, 0);
+            }
+        });
+
+        // Keep reference lines (RSI 70/30, ratio 1.0, ...) in view
+        (layout.shapes || []).forEach(function (shape) {
+            if (shape.yref && shape.y0 === shape.y1) {
+                include(shape.yref.split(' ')[0], shape.y0);
+            }
+        });
+
+        Object.keys(layout).forEach(function (key) {
+            if (/^xaxis\d*$/.test(key)) {
+                layout[key] = Object.assign({}, layout[key], {range: [range.start, range.end], autorange: false});
+            }
+        });
+
+        Object.keys(extents).forEach(function (axis) {
+            const key = 'yaxis' + axis.slice(1);
+            const extent = extents[axis];
+            // Axes pinned with fixedrange (correlation's -1..1) keep their range
+            if (layout[key] && layout[key].fixedrange) {
+                return;
+            }
+            const padding = (extent[1] - extent[0]) * 0.05 || Math.abs(extent[0]) * 0.05 || 1;
+            layout[key] = Object.assign({}, layout[key], {
+                range: [extent[0] - padding, extent[1] + padding],
+                autorange: false
+            });
+        });
+
+        layout.title = relabel(layout.title, label);
+        if (layout.annotations) {
+            layout.annotations = layout.annotations.map(function (annotation) {
+                return Object.assign({}, annotation, {text: relabel(annotation.text, label)});
+            });
+        }
+
+        return Object.assign({}, figure, {layout: layout});
+    }
+
+    // Only charts over time follow the range (not the correlation bars or heatmap)
+    function isTimeSeries(figure) {
+        const trace = (figure.data || [])[0];
+        const x = trace && trace.x;
+        return Boolean(x && x.length && typeof x[0] === 'string' && isFinite(toMs(x[0])));
+    }
+
+    // Same wording as update_summary_cards
+    function formatPriceChange(change1d, changePeriod, label) {
+        // NaN is sent as null
+        change1d = change1d === null ? NaN : change1d;
+        changePeriod = changePeriod === null ? NaN : changePeriod;
+        const sign = change1d >= 0 ? '+' : '';
+        return sign + change1d.toFixed(2) + '% (1D) • ' + sign + changePeriod.toFixed(2) + '% (' + label + ')';
+    }
+
+    let livePriceSource = null;
+
+    function setText(id, text) {
+        const element = document.getElementById(id);
+        if (element) {
+            element.textContent = text;
+        }
+    }
+
+    // Update the price card in place; the full card callback is not rerun
+    function applyLivePrice(update) {
+        setText('current-price', '$' + update.price.toLocaleString('en-US', {
+            minimumFractionDigits: 2,
+            maximumFractionDigits: 2
+        }));
+
+        const change = document.getElementById('price-change');
+        if (change && update.change_1d !== null) {
+            const sign = update.change_1d >= 0 ? '+' : '';
+            const oneDay = sign + update.change_1d.toFixed(2) + '% (1D)';
+            change.textContent = /\(1D\)/.test(change.textContent)
+                ? change.textContent.replace(/^\S+% \(1D\)/, oneDay)
+                : oneDay;
+        }
+
+        setText('price-timestamp', 'Live: ' + new Date(update.timestamp * 1000).toLocaleTimeString());
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        livePrice: {
+            connect: function (config) {
+                if (!config || !config.enabled || !window.EventSource) {
+                    return '';
+                }
+                if (!livePriceSource) {
+                    livePriceSource = new EventSource(config.url);
+                    livePriceSource.onmessage = function (event) {
+                        applyLivePrice(JSON.parse(event.data));
+                    };
+                }
+                return '● Live';
+            }
+        },
+
+
+        timeRange: {
+            selectRange: function () {
+                const triggered = window.dash_clientside.callback_context.triggered;
+                if (!triggered || !triggered.length) {
+                    return '2Y';
+                }
+                const buttonId = triggered[0].prop_id.split('.')[0];
+                return TIME_RANGE_BUTTONS[buttonId] || '2Y';
+            },
+
+            applyRange: function (timeRange, series) {
+                const figures = Array.prototype.slice.call(arguments, 2);
+                const noUpdate = window.dash_clientside.no_update;
+
+                if (!series || !series.ranges || !series.ranges[timeRange]) {
+                    return figures.map(function () { return noUpdate; }).concat([noUpdate]);
+                }
+
+                const range = series.ranges[timeRange];
+                const updated = figures.map(function (figure) {
+                    return figure && isTimeSeries(figure) ? withTimeRange(figure, range, timeRange) : noUpdate;
+                });
+                updated.push(formatPriceChange(series.change_1d, range.change, timeRange));
+                return updated;
+            },
+
+            // Risk card texts are built per range on the server and shipped with the range bounds
+            applyRisk: function (timeRange, series) {
+                const cards = series && series.risk && series.risk[timeRange];
+                if (!cards) {
+                    return Array(12).fill(window.dash_clientside.no_update);
+                }
+                return cards;
+            }
+        }
+    });
+})();
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Tick-to-bar aggregation with ring-buffer bar stores
+
+Builds OHLCV bars from a stream of trades: time bars (e.g. 1m, 1h),
+volume bars (every N BTC traded) and dollar bars (every N USD traded).
+Ticks are processed in NumPy batches and completed bars land in
+preallocated column arrays holding the last N bars per series, which
+can be handed to TechnicalAnalysis. A CSV of trades (timestamp in epoch
+milliseconds, price, size) stands in for a live trade feed.
+
+Usage:
+    python bar_aggregator.py --generate 5000000 ticks.csv      # write a synthetic tick file
+    python bar_aggregator.py ticks.csv                          # replay it into 1m, 1h, volume and dollar bars
+    python bar_aggregator.py ticks.csv --bars 5m,volume:100 --capacity 20000
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from technical_analysis import TechnicalAnalysis
+
+# Column arrays of a bar store: bar start (ns), OHLC, volume in BTC and USD, trade count
+BAR_FIELDS = {
+    'timestamp': np.int64,
+    'open': np.float64,
+    'high': np.float64,
+    'low': np.float64,
+    'close': np.float64,
+    'volume': np.float64,
+    'dollar_volume': np.float64,
+    'ticks': np.int64
+}
+
+BAR_KINDS = ('time', 'volume', 'dollar')
+
+# Bars kept per series
+DEFAULT_CAPACITY = 10_000
+
+# Series built by default: 1 minute and 1 hour bars, 50 BTC bars and $5M bars
+DEFAULT_BAR_SPECS = ('1m', '1h', 'volume:50', 'dollar:5e6')
+
+# Ticks read from a replay file per batch
+REPLAY_CHUNK = 500_000
+
+TIME_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+class BarRingBuffer:
+    """
+    The last `capacity` bars in preallocated column arrays
+
+    Appending a batch of bars is one slice assignment per column (two when
+    it wraps around), with no per-bar Python objects.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.columns = {name: np.zeros(capacity, dtype=dtype) for name, dtype in BAR_FIELDS.items()}
+        self.total = 0  # bars ever appended
+
+    def __len__(self):
+        return min(self.total, self.capacity)
+
+    def extend(self, bars):
+        """Append bars given as a dict of equal-length arrays (oldest first)"""
+        count = len(bars['timestamp'])
+        if count == 0:
+            return
+
+        # Only the newest `capacity` bars of a large batch survive anyway
+        kept = min(count, self.capacity)
+        start = (self.total + count - kept) % self.capacity
+        first = min(kept, self.capacity - start)
+
+        for name, column in self.columns.items():
+            values = bars[name][count - kept:]
+            column[start:start + first] = values[:first]
+            column[:kept - first] = values[first:]
+
+        self.total += count
+
+    def arrays(self):
+        """Copies of the stored bars per column, oldest first"""
+        if self.total <= self.capacity:
+            return {name: column[:self.total].copy() for name, column in self.columns.items()}
+
+        split = self.total % self.capacity
+        return {name: np.concatenate([column[split:], column[:split]]) for name, column in self.columns.items()}
+
+    def to_frame(self):
+        """
+        Stored bars in the shape DataFetcher returns
+
+        'price' is the close and 'volume' is in USD like the API sources;
+        the BTC volume and trade count are kept alongside.
+        """
+        bars = self.arrays()
+        frame = pd.DataFrame({
+            'open': bars['open'],
+            'high': bars['high'],
+            'low': bars['low'],
+            'price': bars['close'],
+            'volume': bars['dollar_volume'],
+            'base_volume': bars['volume'],
+            'ticks': bars['ticks']
+        }, index=pd.DatetimeIndex(bars['timestamp'], name='date'))
+
+        frame['returns'] = frame['price'].pct_change()
+        frame['volatility'] = frame['returns'].rolling(window=30).std()
+        return frame
+
+class BarAggregator:
+    """
+    Builds one bar series from batches of ticks
+
+    Each tick gets a bar key: its time divided by the bar size for time
+    bars, or the running volume (or dollar volume) before it divided by the
+    threshold for volume and dollar bars, so a bar closes on the trade that
+    takes the running total past the next multiple of the threshold. Runs
+    of equal keys are reduced with np.*.reduceat; the last, still open bar
+    is carried over to the next batch. Ticks must arrive in time order.
+
+    Parameters:
+    kind (str): 'time', 'volume' or 'dollar'
+    size (float): Bar length in seconds, or the BTC / USD threshold
+    capacity (int): Completed bars kept
+    """
+
+    def __init__(self, kind, size, capacity=DEFAULT_CAPACITY):
+        if kind not in BAR_KINDS:
+            raise ValueError(f"Unsupported bar kind {kind}, use one of: {', '.join(BAR_KINDS)}")
+        if size <= 0:
+            raise ValueError("Bar size must be positive")
+
+        self.kind = kind
+        self.size = int(size * 10**9) if kind == 'time' else float(size)
+        self.bars = BarRingBuffer(capacity)
+        self.ticks = 0
+
+        self._open = None        # the bar in progress: its key and field values
+        self._cumulative = 0.0   # running volume / dollar volume of threshold bars
+
+    @classmethod
+    def parse(cls, spec, capacity=DEFAULT_CAPACITY):
+        """Aggregator from a spec such as '1m', '4h', 'volume:50' or 'dollar:5e6'"""
+        if ':' in spec:
+            kind, size = spec.split(':', 1)
+            return cls(kind, float(size), capacity)
+
+        unit = spec[-1]
+        if unit not in TIME_UNITS:
+            raise ValueError(f"Can't parse bar spec '{spec}', use e.g. 1m, 4h, volume:50 or dollar:5e6")
+        return cls('time', float(spec[:-1]) * TIME_UNITS[unit], capacity)
+
+    def add_ticks(self, timestamps, prices, sizes):
+        """
+        Aggregate a batch of ticks (timestamps in ns, prices, sizes in BTC)
+
+        Returns the number of bars completed by the batch.
+        """
+        count = len(prices)
+        if count == 0:
+            return 0
+        self.ticks += count
+
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        prices = np.asarray(prices, dtype=np.float64)
+        sizes = np.asarray(sizes, dtype=np.float64)
+        dollars = prices * sizes
+
+        if self.kind == 'time':
+            keys = timestamps // self.size
+            last_closed = False
+        else:
+            amounts = sizes if self.kind == 'volume' else dollars
+            cumulative = self._cumulative + np.cumsum(amounts)
+            keys = np.floor((cumulative - amounts) / self.size).astype(np.int64)
+            # The last bar is done once the total has reached its threshold
+            last_closed = np.floor(cumulative[-1] / self.size) > keys[-1]
+            self._cumulative = float(cumulative[-1])
+
+        starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+        ends = np.append(starts[1:], count) - 1
+
+        groups = {
+            'key': keys[starts],
+            'timestamp': keys[starts] * self.size if self.kind == 'time' else timestamps[starts],
+            'open': prices[starts],
+            'high': np.maximum.reduceat(prices, starts),
+            'low': np.minimum.reduceat(prices, starts),
+            'close': prices[ends],
+            'volume': np.add.reduceat(sizes, starts),
+            'dollar_volume': np.add.reduceat(dollars, starts),
+            'ticks': np.diff(np.append(starts, count))
+        }
+
+        carried = self._open
+        if carried is not None:
+            if carried['key'] == groups['key'][0]:
+                # The batch continues the open bar
+                groups['timestamp'][0] = carried['timestamp']
+                groups['open'][0] = carried['open']
+                groups['high'][0] = max(groups['high'][0], carried['high'])
+                groups['low'][0] = min(groups['low'][0], carried['low'])
+                groups['volume'][0] += carried['volume']
+                groups['dollar_volume'][0] += carried['dollar_volume']
+                groups['ticks'][0] += carried['ticks']
+            else:
+                groups = {name: np.concatenate(([carried[name]], values)) for name, values in groups.items()}
+
+        completed = len(groups['key']) if last_closed else len(groups['key']) - 1
+        self.bars.extend({name: values[:completed] for name, values in groups.items()})
+        self._open = None if last_closed else {name: values[-1] for name, values in groups.items()}
+        return completed
+
+    def flush(self):
+        """Close the bar in progress (e.g. at the end of a replay); returns 1 if there was one"""
+        if self._open is None:
+            return 0
+        self.bars.extend({name: np.array([value]) for name, value in self._open.items()})
+        self._open = None
+        return 1
+
+    def current(self):
+        """The bar in progress as a dict, or None"""
+        if self._open is None:
+            return None
+        return {name: value.item() for name, value in self._open.items() if name != 'key'}
+
+class BarPipeline:
+    """
+    One tick stream aggregated into several bar series
+
+    Parameters:
+    specs (list): Bar specs, e.g. ['1m', '1h', 'volume:50', 'dollar:5e6']
+    capacity (int): Completed bars kept per series
+    """
+
+    def __init__(self, specs=DEFAULT_BAR_SPECS, capacity=DEFAULT_CAPACITY):
+        self.aggregators = {spec: BarAggregator.parse(spec, capacity) for spec in specs}
+        self.ticks = 0
+        self._analysis = {}
+
+    def add_ticks(self, timestamps, prices, sizes):
+        """Feed a batch of ticks to every series; returns the bars completed per series"""
+        self.ticks += len(prices)
+        return {spec: aggregator.add_ticks(timestamps, prices, sizes)
+                for spec, aggregator in self.aggregators.items()}
+
+    def replay(self, path, chunk_ticks=REPLAY_CHUNK):
+        """Feed every tick of a CSV file (timestamp in epoch ms, price, size); returns the tick count"""
+        ticks = 0
+        for chunk in read_ticks(path, chunk_ticks):
+            self.add_ticks(*chunk)
+            ticks += len(chunk[1])
+        return ticks
+
+    def flush(self):
+        for aggregator in self.aggregators.values():
+            aggregator.flush()
+
+    def frame(self, spec):
+        return self.aggregators[spec].bars.to_frame()
+
+    def technical_analysis(self, spec):
+        """
+        TechnicalAnalysis of a series' stored bars
+
+        Rebuilt only when bars were completed since the last call.
+        """
+        total = self.aggregators[spec].bars.total
+        cached = self._analysis.get(spec)
+        if cached is None or cached[0] != total:
+            cached = self._analysis[spec] = (total, TechnicalAnalysis(self.frame(spec)))
+        return cached[1]
+
+def read_ticks(path, chunk_ticks=REPLAY_CHUNK):
+    """Yield (timestamps in ns, prices, sizes) arrays from a tick CSV, chunk_ticks rows at a time"""
+    dtypes = {'timestamp': np.int64, 'price': np.float64, 'size': np.float64}
+    for chunk in pd.read_csv(path, usecols=list(dtypes), dtype=dtypes, chunksize=chunk_ticks):
+        yield (chunk['timestamp'].to_numpy() * 1_000_000, chunk['price'].to_numpy(), chunk['size'].to_numpy())
+
+def write_ticks(path, timestamps, prices, sizes):
+    """Write ticks (timestamps in ns) as a replay CSV"""
+    pd.DataFrame({
+        'timestamp': np.asarray(timestamps, dtype=np.int64) // 1_000_000,
+        'price': prices,
+        'size': sizes
+    }).to_csv(path, index=False)
+
+def main():
+    parser = argparse.ArgumentParser(description="Aggregate a trade tick file into time, volume and dollar bars")
+    parser.add_argument('path', help="Tick CSV with timestamp (epoch ms), price and size columns")
+    parser.add_argument('--bars', default=','.join(DEFAULT_BAR_SPECS),
+                        help=f"Comma-separated bar specs (default: {','.join(DEFAULT_BAR_SPECS)})")
+    parser.add_argument('--capacity', type=int, default=DEFAULT_CAPACITY,
+                        help=f"Bars kept per series (default: {DEFAULT_CAPACITY})")
+    parser.add_argument('--generate', type=int, metavar='TICKS', help="Write this many synthetic ticks to path and exit")
+    args = parser.parse_args()
+
+    if args.generate:
+        from synthetic_data import generate_ticks
+
+        write_ticks(args.path, *generate_ticks(args.generate))
+        print(f"💾 {args.generate:,} synthetic ticks written to {args.path}")
+        return 0
+
+    try:
+        pipeline = BarPipeline([spec for spec in args.bars.split(',') if spec], args.capacity)
+    except ValueError as e:
+        parser.error(str(e))
+
+    start = time.perf_counter()
+    ticks = pipeline.replay(args.path)
+    elapsed = time.perf_counter() - start
+    print(f"📊 {ticks:,} ticks replayed in {elapsed:.2f} s ({ticks / max(elapsed, 1e-9):,.0f} ticks/s, including CSV parsing)")
+
+    pipeline.flush()
+    for spec, aggregator in pipeline.aggregators.items():
+        bars = aggregator.bars
+        print(f"   {spec:<12} {bars.total:>9,} bars ({len(bars):,} kept)")
+
+        if len(bars) >= 200:
+            analysis = pipeline.technical_analysis(spec)
+            trend = analysis.get_trend_analysis()
+            momentum = analysis.get_momentum_analysis()
+            print(f"      {trend['trend']}, RSI {momentum['RSI']['value']:.1f} ({momentum['RSI']['signal']})")
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
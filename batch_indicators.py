@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Headless batch computation of technical indicators
+
+Fetches each symbol (through the local dataset cache), computes the
+TechnicalAnalysis indicators in a process pool and writes one Parquet file
+per symbol. Doesn't load Dash.
+
+Usage:
+    python batch_indicators.py BTC ETH SOL --interval 1d --start 2023-01-01 --end 2024-12-31
+    python batch_indicators.py BTC --interval 1h --start 2024-06-01 --output-dir indicators --workers 4
+
+Exits with status 1 if any symbol failed.
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
+
+from config import DATASET_TTL
+from data_cache import DatasetCache
+from data_fetcher import DataFetcher, CRYPTOCOMPARE_INTERVALS
+from technical_analysis import TechnicalAnalysis
+
+
+def parse_date(text):
+    return datetime.strptime(text, '%Y-%m-%d')
+
+def fetch_cached(symbol, interval, start_date, end_date, cache_ttl):
+    """Fetch a symbol's history, reusing a cached copy younger than cache_ttl seconds"""
+    cache = DatasetCache()
+    # Entries cached before datasets carried OHLC bars are not reused
+    key = f"{symbol}_{interval}_{start_date:%Y%m%d}_{end_date:%Y%m%d}_ohlcv"
+
+    if cache_ttl > 0:
+        data = cache.get(key, cache_ttl)
+        if data is not None:
+            return data, True
+
+    data = DataFetcher().fetch_symbol_data(symbol, interval, start_date, end_date)
+    if data is not None and not data.empty and cache_ttl > 0:
+        cache.set(key, data)
+
+    return data, False
+
+def process_symbol(symbol, interval, start_date, end_date, output_dir, cache_ttl):
+    """
+    Fetch one symbol, compute its indicators and write them to Parquet
+
+    Runs in a worker process; returns a summary dict, raises on failure.
+    """
+    start = time.perf_counter()
+
+    data, cached = fetch_cached(symbol, interval, start_date, end_date, cache_ttl)
+    if data is None or data.empty:
+        raise RuntimeError(f"no data for {symbol} ({interval})")
+
+    analysis = TechnicalAnalysis(data)
+
+    path = os.path.join(output_dir, f"{symbol}_{interval}_{start_date:%Y%m%d}_{end_date:%Y%m%d}.parquet")
+    analysis.data.to_parquet(path)
+
+    return {
+        'symbol': symbol,
+        'rows': len(analysis.data),
+        'columns': len(analysis.data.columns),
+        'cached': cached,
+        'path': path,
+        'seconds': time.perf_counter() - start
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Compute technical indicators for several symbols and write Parquet files")
+    parser.add_argument('symbols', nargs='+', help="Coin symbols, e.g. BTC ETH SOL")
+    parser.add_argument('--interval', default='1d', choices=list(CRYPTOCOMPARE_INTERVALS), help="Bar interval (default: 1d)")
+    parser.add_argument('--start', type=parse_date, help="First date, YYYY-MM-DD in UTC (default: 2 years before --end)")
+    parser.add_argument('--end', type=parse_date, help="Last date, YYYY-MM-DD (default: today)")
+    parser.add_argument('--output-dir', default='indicators', help="Directory for the Parquet files (default: indicators)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="Worker processes (default: all cores)")
+    parser.add_argument('--cache-ttl', type=float, default=DATASET_TTL,
+                        help=f"Reuse cached datasets younger than this many seconds, 0 to always refetch (default: {DATASET_TTL:.0f})")
+    args = parser.parse_args()
+
+    # --end is a date: include the whole day
+    end_date = args.end + timedelta(days=1) - timedelta(seconds=1) if args.end else datetime.utcnow()
+    start_date = args.start or end_date - timedelta(days=730)
+    if start_date >= end_date:
+        parser.error("--start must be before --end")
+
+    symbols = list(dict.fromkeys(symbol.upper() for symbol in args.symbols))
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    print(f"📊 Computing {args.interval} indicators for {', '.join(symbols)} "
+          f"({start_date:%Y-%m-%d} to {end_date:%Y-%m-%d}) with {args.workers} workers")
+
+    failures = []
+    with ProcessPoolExecutor(max_workers=max(1, min(args.workers, len(symbols)))) as pool:
+        futures = {
+            pool.submit(process_symbol, symbol, args.interval, start_date, end_date, args.output_dir, args.cache_ttl): symbol
+            for symbol in symbols
+        }
+
+        for future in as_completed(futures):
+            symbol = futures[future]
+            try:
+                result = future.result()
+                source = "cache" if result['cached'] else "API"
+                print(f"✅ {symbol}: {result['rows']:,} rows x {result['columns']} columns from {source} "
+                      f"in {result['seconds']:.1f} s -> {result['path']}")
+            except Exception as e:
+                print(f"❌ {symbol} failed: {e}")
+                failures.append(symbol)
+
+    if failures:
+        print(f"\n❌ {len(failures)} of {len(symbols)} symbols failed: {', '.join(failures)}")
+        return 1
+
+    print(f"\n✅ All {len(symbols)} symbols written to {args.output_dir}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
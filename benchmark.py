@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Offline benchmarks for the analysis and rendering hot paths
+
+Runs on synthetic data (no API calls) and times TechnicalAnalysis, each
+calculate_* group, the get_*_analysis methods, time range filtering, the
+chart and card callbacks, calculate_correlations, the alert engine and
+tick-to-bar aggregation (one tick per row) at several sizes.
+
+Usage:
+    python benchmark.py                               # 1k, 100k, 1M and 10M rows
+    python benchmark.py --sizes 1k,100k --repeat 5
+    python benchmark.py --save-baseline               # store the results as the baseline
+    python benchmark.py --threshold 0.25              # fail if >25% slower than the baseline
+
+The 10M row case needs roughly 6 GB of memory.
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+
+# The dashboard module must not fetch live data when imported
+os.environ.setdefault("BTC_STARTUP_FETCH", "0")
+
+import numpy as np
+import pandas as pd
+
+import dashboard
+from alerts import AlertEngine
+from bar_aggregator import BarPipeline
+from correlation_engine import RollingCorrelation
+from data_fetcher import DataFetcher
+from regime_detection import VolatilityRegimeDetector
+from risk_analysis import RiskAnalysis
+from metrics import metrics
+from synthetic_data import generate_price_data, generate_market_data, generate_ticks
+from technical_analysis import TechnicalAnalysis
+
+DEFAULT_SIZES = "1k,100k,1M,10M"
+DEFAULT_OUTPUT = os.path.join("benchmarks", "latest.json")
+DEFAULT_BASELINE = os.path.join("benchmarks", "baseline.json")
+
+INDICATOR_GROUPS = [
+    'calculate_moving_averages',
+    'calculate_volatility_indicators',
+    'calculate_volume_indicators',
+    'calculate_momentum_indicators',
+    'calculate_support_resistance'
+]
+
+ANALYSIS_METHODS = [
+    'get_trend_analysis',
+    'get_volatility_analysis',
+    'get_momentum_analysis',
+    'get_volume_analysis',
+    'get_summary_statistics'
+]
+
+CHART_CALLBACKS = [
+    'update_price_chart',
+    'update_volume_chart',
+    'update_indicators_chart',
+    'update_volatility_chart'
+]
+
+# Alert rules registered for the alert engine case, and the bars it evaluates
+ALERT_RULES = 10_000
+ALERT_BARS = 100
+
+# Ticks per batch fed to the bar pipeline (one tick per data row is benchmarked)
+TICK_BATCH = 100_000
+
+# Time range and viewport the callbacks are benchmarked with
+BENCH_TIME_RANGE = '2Y'
+BENCH_VIEWPORT_WIDTH = 1920
+
+
+def parse_size(text):
+    """'1k' -> 1000, '10M' -> 10000000"""
+    text = text.strip()
+    multipliers = {'k': 1_000, 'K': 1_000, 'm': 1_000_000, 'M': 1_000_000}
+    if text[-1] in multipliers:
+        return int(float(text[:-1]) * multipliers[text[-1]])
+    return int(text)
+
+def measure(func, repeat):
+    """Run func repeat times, returns timing stats in seconds"""
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    return {'min_s': min(times), 'median_s': statistics.median(times), 'runs': repeat}
+
+def callback_errors(name):
+    """Errors the metrics registry has counted for a callback (callbacks catch their own exceptions)"""
+    return metrics.summary().get('callback', {}).get(name, {}).get('errors', 0)
+
+def make_alert_rules(count, seed=0):
+    """Random threshold rules over the oscillators plus the default cross rules"""
+    rng = np.random.default_rng(seed)
+    ranges = {'RSI': (0, 100), 'stoch_k': (0, 100), 'volatility_ratio': (0.3, 3.0)}
+    fields = rng.choice(list(ranges), size=count)
+    operators = rng.choice(['>', '<', 'crosses'], size=count)
+    return [f"{field} {operator} {rng.uniform(*ranges[field]):.3f}" for field, operator in zip(fields, operators)]
+
+def aggregate_ticks(ticks):
+    """Feed ticks through the default bar series in batches, as a live feed would"""
+    pipeline = BarPipeline()
+    timestamps, prices, sizes = ticks
+    for start in range(0, len(prices), TICK_BATCH):
+        end = start + TICK_BATCH
+        pipeline.add_ticks(timestamps[start:end], prices[start:end], sizes[start:end])
+    return pipeline
+
+def warm_up():
+    """Build every figure once so first-call costs (plotly validators, imports) aren't timed"""
+    data = generate_price_data(300)
+    dashboard.btc_data = data
+    dashboard.technical_analysis = TechnicalAnalysis(data)
+    version_info = {'version': dashboard.data_version}
+
+    for name in CHART_CALLBACKS:
+        getattr(dashboard, name)(version_info, BENCH_VIEWPORT_WIDTH, BENCH_TIME_RANGE)
+    dashboard.update_summary_cards(version_info, BENCH_TIME_RANGE)
+
+    dashboard.btc_data = dashboard.technical_analysis = None
+
+def benchmark_size(rows, repeat):
+    """Time every case on a synthetic dataset of the given number of rows"""
+    results = {}
+
+    data = generate_price_data(rows)
+    market_data = generate_market_data(data.index)
+    print(f"📊 {rows:,} rows ({data.index[0]} to {data.index[-1]})")
+
+    def record(case, func, runs=repeat):
+        try:
+            results[case] = measure(func, runs)
+            print(f"   {case:<40} {results[case]['min_s'] * 1000:>10.2f} ms")
+        except Exception as e:
+            results[case] = {'error': str(e)[:200]}
+            print(f"   ❌ {case} failed: {e}")
+
+    # Analysis
+    record('TechnicalAnalysis', lambda: TechnicalAnalysis(data))
+    analysis = TechnicalAnalysis(data)
+
+    for group in INDICATOR_GROUPS:
+        record(group, getattr(analysis, group))
+
+    for method in ANALYSIS_METHODS:
+        record(method, getattr(analysis, method))
+
+    alert_engine = AlertEngine(make_alert_rules(ALERT_RULES))
+    alert_start = analysis.data.index[max(len(data) - ALERT_BARS - 1, 0)]
+    record(f'AlertEngine.evaluate_frame[{ALERT_RULES // 1000}k rules]',
+           lambda: alert_engine.evaluate_frame(analysis.data, since=alert_start))
+
+    ticks = generate_ticks(rows)
+    record('BarPipeline.add_ticks', lambda: aggregate_ticks(ticks))
+    if 'min_s' in results['BarPipeline.add_ticks']:
+        print(f"   {'':<40} {rows / results['BarPipeline.add_ticks']['min_s']:>10,.0f} ticks/s")
+    del ticks
+
+    fetcher = DataFetcher()
+    record('calculate_correlations', lambda: fetcher.calculate_correlations(data, market_data))
+    record('RollingCorrelation', lambda: RollingCorrelation.from_frames(data, market_data))
+    record('RiskAnalysis', lambda: RiskAnalysis(data))
+    record('RiskAnalysis.summary', lambda: RiskAnalysis(data).summary(data.index[-1] - pd.Timedelta(days=365)))
+    record('VolatilityRegimeDetector', lambda: VolatilityRegimeDetector().update_frame(data))
+
+    for time_range in dashboard.TIME_RANGE_DAYS:
+        record(f'filter_data_by_time_range[{time_range}]',
+               lambda: dashboard.filter_data_by_time_range(data, time_range))
+
+    # Callbacks read the dashboard's module state
+    dashboard.btc_data = data
+    dashboard.market_data = market_data
+    dashboard.technical_analysis = analysis
+    dashboard.correlations = fetcher.calculate_correlations(data, market_data)
+    dashboard.correlation_engine = RollingCorrelation.from_frames(data, market_data)
+    dashboard.risk_analysis = RiskAnalysis(data)
+    dashboard.volatility_regimes = VolatilityRegimeDetector().update_frame(data)
+    version_info = {'version': dashboard.data_version}
+
+    for name in CHART_CALLBACKS:
+        callback = getattr(dashboard, name)
+        errors = callback_errors(name)
+        record(name, lambda: callback(version_info, BENCH_VIEWPORT_WIDTH, BENCH_TIME_RANGE))
+        if callback_errors(name) > errors:
+            results[name]['error'] = "callback reported an error"
+
+    correlation_args = (version_info, BENCH_TIME_RANGE)
+    for name, callback_name, args in [
+        ('update_summary_cards', 'update_summary_cards', (version_info, BENCH_TIME_RANGE)),
+        ('update_risk_cards', 'update_risk_cards', (version_info, BENCH_TIME_RANGE)),
+        ('update_correlation_chart', 'update_correlation_chart', correlation_args + ('bars', 90, BENCH_VIEWPORT_WIDTH)),
+        ('update_correlation_chart[rolling]', 'update_correlation_chart', correlation_args + ('rolling', 90, BENCH_VIEWPORT_WIDTH)),
+        ('update_correlation_chart[heatmap]', 'update_correlation_chart', correlation_args + ('heatmap', 90, BENCH_VIEWPORT_WIDTH))
+    ]:
+        callback = getattr(dashboard, callback_name)
+        errors = callback_errors(callback_name)
+        record(name, lambda: callback(*args))
+        if callback_errors(callback_name) > errors:
+            results[name]['error'] = "callback reported an error"
+
+    dashboard.btc_data = dashboard.market_data = dashboard.technical_analysis = dashboard.correlations = None
+    dashboard.correlation_engine = dashboard.risk_analysis = None
+    dashboard.volatility_regimes = []
+    del data, market_data, analysis
+    gc.collect()
+
+    return results
+
+def compare(results, baseline, threshold, min_time):
+    """
+    Compare results with a baseline, returns the list of regressions
+
+    A case regresses when its best time is more than threshold (fraction)
+    slower than the baseline's; cases faster than min_time are ignored as noise.
+    """
+    regressions = []
+    print(f"\n📏 Comparison with baseline from {baseline.get('meta', {}).get('timestamp', 'unknown')}")
+
+    for size, cases in results['results'].items():
+        baseline_cases = baseline.get('results', {}).get(size, {})
+        for case, stats in cases.items():
+            base = baseline_cases.get(case)
+            if not base or 'min_s' not in base or 'min_s' not in stats:
+                continue
+
+            ratio = stats['min_s'] / base['min_s'] if base['min_s'] else float('inf')
+            if ratio > 1 + threshold and stats['min_s'] >= min_time:
+                regressions.append((size, case, base['min_s'], stats['min_s'], ratio))
+                print(f"   ❌ {size:>9} rows {case:<40} {base['min_s'] * 1000:.2f} -> {stats['min_s'] * 1000:.2f} ms ({ratio:.2f}x)")
+            elif ratio < 1 - threshold and base['min_s'] >= min_time:
+                print(f"   ✅ {size:>9} rows {case:<40} {base['min_s'] * 1000:.2f} -> {stats['min_s'] * 1000:.2f} ms ({ratio:.2f}x)")
+
+    if not regressions:
+        print("   No regressions")
+
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the analysis and rendering hot paths on synthetic data")
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help=f"Comma-separated row counts (default: {DEFAULT_SIZES})")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per case; the best run is compared (default: 3)")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help=f"Where to write the results (default: {DEFAULT_OUTPUT})")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help=f"Baseline to compare against (default: {DEFAULT_BASELINE})")
+    parser.add_argument('--save-baseline', action='store_true', help="Also store the results as the new baseline")
+    parser.add_argument('--threshold', type=float, default=0.25, help="Allowed slowdown as a fraction (default: 0.25)")
+    parser.add_argument('--min-time', type=float, default=0.001, help="Ignore cases faster than this many seconds (default: 0.001)")
+    args = parser.parse_args()
+
+    sizes = [parse_size(size) for size in args.sizes.split(',') if size.strip()]
+
+    results = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'repeat': args.repeat
+        },
+        'results': {}
+    }
+
+    warm_up()
+    for rows in sizes:
+        results['results'][str(rows)] = benchmark_size(rows, args.repeat)
+
+    for path in [args.output] + ([args.baseline] if args.save_baseline else []):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 Results written to {path}")
+
+    if args.save_baseline or not os.path.exists(args.baseline):
+        if not args.save_baseline:
+            print(f"⚠️  No baseline at {args.baseline}, run with --save-baseline to create one")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+
+    regressions = compare(results, baseline, args.threshold, args.min_time)
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objs as go
+
+from config import DENSE_POINT_THRESHOLD
+
+# Assumed browser width when the client has not reported its viewport yet
+DEFAULT_VIEWPORT_WIDTH = 1920
+
+# A line can't show more than about one distinct point per horizontal pixel
+POINTS_PER_PIXEL = 1
+
+# Never downsample below this many points, even on very narrow screens
+MIN_TARGET_POINTS = 200
+
+
+def get_target_points(viewport_width, width_fraction=1.0):
+    """Number of points worth sending for a chart spanning width_fraction of the viewport"""
+    if not viewport_width:
+        viewport_width = DEFAULT_VIEWPORT_WIDTH
+
+    return max(MIN_TARGET_POINTS, int(viewport_width * width_fraction * POINTS_PER_PIXEL))
+
+def _index_as_float(index):
+    """Convert a (datetime) index to a float x-axis usable for triangle areas"""
+    if isinstance(index, pd.DatetimeIndex):
+        return index.asi8.astype(np.float64)
+
+    try:
+        return np.asarray(index, dtype=np.float64)
+    except (TypeError, ValueError):
+        return np.arange(len(index), dtype=np.float64)
+
+def lttb_indices(x, y, threshold):
+    """
+    Largest-Triangle-Three-Buckets downsampling
+
+    Returns the positions of the points to keep so that a line drawn through
+    them looks like the line through all points. NaN values are skipped, the
+    first and last valid points are always kept.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    valid = np.flatnonzero(np.isfinite(y))
+    n = len(valid)
+
+    if threshold < 3 or n <= threshold:
+        return valid
+
+    xv = x[valid]
+    yv = y[valid]
+
+    # threshold - 2 buckets over the interior points (first/last are fixed)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+
+    # Average of every bucket, used as the third triangle vertex
+    bucket_x = np.add.reduceat(xv[1:n - 1], edges[:-1] - 1) / np.diff(edges)
+    bucket_y = np.add.reduceat(yv[1:n - 1], edges[:-1] - 1) / np.diff(edges)
+    next_x = np.append(bucket_x[1:], xv[-1])
+    next_y = np.append(bucket_y[1:], yv[-1])
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        ax, ay = xv[a], yv[a]
+
+        # Twice the triangle area; the constant factor doesn't change the argmax
+        area = np.abs((ax - next_x[i]) * (yv[start:end] - ay) -
+                      (ax - xv[start:end]) * (next_y[i] - ay))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+
+    return valid[selected]
+
+def minmax_indices(y, threshold):
+    """
+    Min/max bucket downsampling for bars
+
+    Keeps the lowest and highest point of each bucket so spikes (e.g. volume
+    surges, MACD histogram extremes) survive the reduction.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+
+    if threshold < 2 or n <= threshold:
+        return np.arange(n)
+
+    n_buckets = threshold // 2
+    edges = np.linspace(0, n, n_buckets + 1).astype(np.int64)
+
+    # NaNs must never win argmin/argmax
+    low = np.where(np.isnan(y), np.inf, y)
+    high = np.where(np.isnan(y), -np.inf, y)
+
+    keep = np.empty(2 * n_buckets, dtype=np.int64)
+    for i in range(n_buckets):
+        start, end = edges[i], edges[i + 1]
+        keep[2 * i] = start + int(np.argmin(low[start:end]))
+        keep[2 * i + 1] = start + int(np.argmax(high[start:end]))
+
+    return np.unique(keep)
+
+def downsample_frame(data, column, threshold, method='lttb'):
+    """
+    Return the rows of data that best represent data[column] at threshold points
+
+    The last row is always kept, so the final point of every trace is the
+    latest bar (incremental chart updates replace it in place).
+
+    Parameters:
+    data (pd.DataFrame): Time-indexed data
+    column (str): Column the reduction is driven by
+    threshold (int): Maximum number of rows to keep
+    method (str): 'lttb' for lines, 'minmax' for bars
+    """
+    if data is None or len(data) <= threshold:
+        return data
+
+    values = data[column].to_numpy(dtype=np.float64, na_value=np.nan)
+
+    if method == 'minmax':
+        positions = minmax_indices(values, threshold)
+    else:
+        positions = lttb_indices(_index_as_float(data.index), values, threshold)
+
+    positions = np.union1d(positions, [len(data) - 1])
+
+    return data.iloc[positions]
+
+def get_scatter_type(n_points, target_points=None):
+    """
+    WebGL scatter for dense traces, SVG scatter otherwise
+
+    n_points is what a trace plots after downsampling. A trace is dense when it
+    plots DENSE_POINT_THRESHOLD points or fills the chart's point budget
+    (target_points): the window has a bar for every pixel, so the line was
+    downsampled to the chart width.
+    """
+    threshold = DENSE_POINT_THRESHOLD if target_points is None else min(DENSE_POINT_THRESHOLD, target_points)
+    return go.Scattergl if n_points >= threshold else go.Scatter
@@ -0,0 +1,98 @@
+"""
+Runtime options for the dashboard and data tools
+
+All options are read from environment variables so they can be changed
+without touching the code, e.g. BTC_CLIENTSIDE_RANGES=1 python dashboard.py
+"""
+
+import os
+
+def env_flag(name, default=False):
+    """Read a boolean option (1/true/yes/on)"""
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+def env_int(name, default):
+    """Read an integer option, falling back to default when unset or invalid"""
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+def env_float(name, default):
+    """Read a float option, falling back to default when unset or invalid"""
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+# Fetch data when the dashboard module is imported; benchmarks and load
+# tests turn this off and load their own data
+STARTUP_FETCH = env_flag("BTC_STARTUP_FETCH", True)
+
+# Ship the full history once and switch time ranges in the browser
+CLIENTSIDE_RANGES = env_flag("BTC_CLIENTSIDE_RANGES")
+
+# Chart traces plotting this many points (after downsampling), or as many as the
+# chart is wide, render with WebGL
+DENSE_POINT_THRESHOLD = env_int("BTC_DENSE_THRESHOLD", 2000)
+
+# Push live prices to the summary cards over Server-Sent Events
+LIVE_MODE = env_flag("BTC_LIVE_MODE")
+
+# Live price feed: 'cryptocompare', 'replay' (recorded history) or 'replay:<file>'
+LIVE_SOURCE = os.environ.get("BTC_LIVE_SOURCE", "cryptocompare")
+
+# Seconds between polls of the live price feed
+LIVE_INTERVAL = env_float("BTC_LIVE_INTERVAL", 5.0)
+
+# Profile wrapped callbacks and data refreshes; with BTC_PROFILE_HEADER,
+# requests can also opt in with an "X-Profile: 1" header
+PROFILE_MODE = env_flag("BTC_PROFILE")
+PROFILE_HEADER = env_flag("BTC_PROFILE_HEADER")
+
+# Where profiles are written and in which format ('collapsed' or 'speedscope')
+PROFILE_DIR = os.environ.get("BTC_PROFILE_DIR", "profiles")
+PROFILE_FORMAT = os.environ.get("BTC_PROFILE_FORMAT", "collapsed")
+
+# Stack sampling interval and the most profiles recorded per minute
+PROFILE_INTERVAL_MS = env_float("BTC_PROFILE_INTERVAL_MS", 5.0)
+PROFILE_MAX_PER_MINUTE = env_int("BTC_PROFILE_MAX_PER_MINUTE", 6)
+
+# Record tracemalloc allocation snapshots around data refreshes (/memory)
+TRACEMALLOC = env_flag("BTC_TRACEMALLOC")
+
+# Local cache for fetched prices and datasets
+CACHE_DIR = os.environ.get("BTC_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "btc-price-analysis"))
+
+# Seconds a cached latest price / recent closes stay fresh
+QUOTE_TTL = env_float("BTC_QUOTE_TTL", 60.0)
+
+# Seconds fetched datasets stay fresh in the cache (batch jobs)
+DATASET_TTL = env_float("BTC_DATASET_TTL", 3600.0)
+
+# Circuit breaker per data source: skip a source after this many failures
+# in a row, then probe it again after the cooldown (seconds)
+BREAKER_FAILURES = env_int("BTC_BREAKER_FAILURES", 3)
+BREAKER_COOLDOWN = env_float("BTC_BREAKER_COOLDOWN", 300.0)
+
+# Concurrent identical fetches and refreshes share one run; its result is
+# reused for this many seconds after it finished
+DEDUPE_WINDOW = env_float("BTC_DEDUPE_WINDOW", 10.0)
+
+# Processes a Monte Carlo forecast spreads its path chunks over (1 = in process)
+MONTE_CARLO_WORKERS = env_int("BTC_MC_WORKERS", 1)
+
+# Alert rules (JSON list of rules like "RSI > 70"; unset = the built-in defaults)
+# and where fired alerts go besides the log: a JSON lines file and a webhook URL
+ALERT_RULES_FILE = os.environ.get("BTC_ALERT_RULES") or None
+ALERT_FILE = os.environ.get("BTC_ALERT_FILE") or None
+ALERT_WEBHOOK_URL = os.environ.get("BTC_ALERT_WEBHOOK") or None
+
+# Market data API base URLs, e.g. pointed at mock_market_server.py for offline runs.
+# Yahoo Finance goes through yfinance unless a chart API base URL is set.
+CRYPTOCOMPARE_BASE_URL = os.environ.get("BTC_CRYPTOCOMPARE_URL", "https://min-api.cryptocompare.com/data")
+COINGECKO_BASE_URL = os.environ.get("BTC_COINGECKO_URL", "https://api.coingecko.com/api/v3")
+YAHOO_BASE_URL = os.environ.get("BTC_YAHOO_URL") or None
@@ -0,0 +1,183 @@
+import numpy as np
+import pandas as pd
+
+from time_index import DAY_NS, bar_step, bar_keys, last_per_key, merge_join
+
+# Rolling windows offered by the dashboard, in days
+CORRELATION_WINDOWS = (30, 90, 180)
+
+# Name of the Bitcoin column in aligned price frames
+BITCOIN = 'Bitcoin'
+
+
+def align_prices(btc_data, market_data):
+    """
+    Bitcoin and market closes on their common bars
+
+    Both frames are reduced to their last price per bar, at the coarser of
+    their two bar sizes, and inner-joined on int64 epoch bar keys with a
+    sorted merge. Returns a DataFrame with a 'Bitcoin' column followed by
+    the market columns, and the bar size in nanoseconds.
+    """
+    step = max(bar_step(btc_data.index), bar_step(market_data.index))
+
+    btc_keys = bar_keys(btc_data.index, step)
+    btc_rows = last_per_key(btc_keys)
+    market_keys = bar_keys(market_data.index, step)
+    market_rows = last_per_key(market_keys)
+
+    _, btc_pos, market_pos = merge_join(btc_keys[btc_rows], market_keys[market_rows])
+    btc_rows = btc_rows[btc_pos]
+    market_rows = market_rows[market_pos]
+
+    columns = {BITCOIN: btc_data['price'].to_numpy(dtype=np.float64)[btc_rows]}
+    for col in market_data.columns:
+        columns[col] = market_data[col].to_numpy(dtype=np.float64)[market_rows]
+
+    return pd.DataFrame(columns, index=btc_data.index[btc_rows]), step
+
+class RollingCorrelation:
+    """
+    Rolling correlation matrices across Bitcoin and any number of assets
+
+    Keeps running (prefix) sums of every return and of every pairwise
+    product, so the sums over any window are one subtraction and a window
+    of any length costs the same as the full-period correlation. New bars
+    are added with append() without touching the existing sums.
+
+    Parameters:
+    prices (pd.DataFrame): Aligned closes, one column per asset (see align_prices)
+    step (int): Bar size in nanoseconds, used to turn window days into bars
+    """
+
+    def __init__(self, prices, step=DAY_NS):
+        self.names = list(prices.columns)
+        self.step = step
+        size = len(self.names)
+        self._pair_rows, self._pair_cols = np.triu_indices(size)
+        # Pair column holding each asset's squared returns
+        self._square_columns = np.flatnonzero(self._pair_rows == self._pair_cols)
+
+        self.index = prices.index[:0]
+        self._count = 0
+        self._last_prices = None
+        self._sum = np.zeros((1, size))
+        self._pair_sum = np.zeros((1, len(self._pair_rows)))
+        self.append(prices)
+
+    @classmethod
+    def from_frames(cls, btc_data, market_data):
+        prices, step = align_prices(btc_data, market_data)
+        return cls(prices, step)
+
+    def __len__(self):
+        """Number of returns (bars after the first)"""
+        return self._count
+
+    def append(self, prices):
+        """Extend the running sums with the returns of newer aligned closes"""
+        values = prices[self.names].to_numpy(dtype=np.float64)
+        if len(values) == 0:
+            return
+
+        if self._last_prices is not None:
+            values = np.vstack([self._last_prices, values])
+            new_index = prices.index
+        else:
+            new_index = prices.index[1:]
+        self._last_prices = values[-1:]
+
+        returns = values[1:] / values[:-1] - 1
+        # A missing close makes both of its returns zero rather than poisoning the sums
+        returns[~np.isfinite(returns)] = 0.0
+        if len(returns) == 0:
+            return
+
+        sums = self._sum[-1] + np.cumsum(returns, axis=0)
+        pair_sums = self._pair_sum[-1] + np.cumsum(returns[:, self._pair_rows] * returns[:, self._pair_cols], axis=0)
+
+        self._sum = np.vstack([self._sum, sums])
+        self._pair_sum = np.vstack([self._pair_sum, pair_sums])
+        self.index = self.index.append(new_index)
+        self._count += len(returns)
+
+    def window_bars(self, window_days):
+        """Returns per window for a window given in days"""
+        return max(2, int(round(window_days * DAY_NS / self.step)))
+
+    def _pair_correlations(self, bars, ends, columns=None):
+        """
+        Correlations of pairs (upper triangle columns, default all) for the
+        windows of `bars` returns ending after each position in ends
+        """
+        if columns is None:
+            columns = np.arange(len(self._pair_rows))
+        rows, cols = self._pair_rows[columns], self._pair_cols[columns]
+        assets = np.union1d(rows, cols)
+        squares = self._square_columns[assets]
+
+        sums = np.zeros((len(ends), len(self.names)))
+        sums[:, assets] = self._sum[ends][:, assets] - self._sum[ends - bars][:, assets]
+        square_sums = np.zeros((len(ends), len(self.names)))
+        square_sums[:, assets] = self._pair_sum[ends][:, squares] - self._pair_sum[ends - bars][:, squares]
+        pair_sums = self._pair_sum[ends][:, columns] - self._pair_sum[ends - bars][:, columns]
+
+        means = sums / bars
+        covariance = pair_sums / bars - means[:, rows] * means[:, cols]
+        variance = square_sums / bars - means ** 2
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            std = np.sqrt(np.clip(variance, 0.0, None))
+            correlation = covariance / (std[:, rows] * std[:, cols])
+        return np.clip(correlation, -1.0, 1.0)
+
+    def _ends(self, bars, start=None):
+        ends = np.arange(bars, self._count + 1)
+        if start is not None:
+            ends = ends[self.index[ends - 1] >= start]
+        return ends
+
+    def matrix(self, window_days, end=None):
+        """
+        Correlation matrix of the window ending at the last return (or at end)
+
+        Returns a DataFrame indexed and labelled by asset, or None when there
+        are fewer returns than the window.
+        """
+        bars = self.window_bars(window_days)
+        last = self._count if end is None else int(self.index.searchsorted(end, side='right'))
+        if last < bars:
+            return None
+
+        pairs = self._pair_correlations(bars, np.array([last]))[0]
+        size = len(self.names)
+        matrix = np.empty((size, size))
+        matrix[self._pair_rows, self._pair_cols] = pairs
+        matrix[self._pair_cols, self._pair_rows] = pairs
+        return pd.DataFrame(matrix, index=self.names, columns=self.names)
+
+    def series(self, window_days, pairs=None, start=None):
+        """
+        Rolling correlation over time, one column per pair ('A / B')
+
+        pairs: (asset, asset) tuples; defaults to Bitcoin against every other asset
+        start: only windows ending at or after this timestamp
+        """
+        bars = self.window_bars(window_days)
+        ends = self._ends(bars, start)
+
+        if pairs is None:
+            pairs = [(self.names[0], name) for name in self.names[1:]]
+
+        positions = {name: i for i, name in enumerate(self.names)}
+        pair_columns = []
+        for a, b in pairs:
+            i, j = sorted((positions[a], positions[b]))
+            pair_columns.append(int(np.flatnonzero((self._pair_rows == i) & (self._pair_cols == j))[0]))
+
+        if len(ends) == 0:
+            return pd.DataFrame(columns=[f"{a} / {b}" for a, b in pairs], dtype=np.float64)
+
+        correlations = self._pair_correlations(bars, ends, np.array(pair_columns))
+        return pd.DataFrame(correlations, index=self.index[ends - 1],
+                            columns=[f"{a} / {b}" for a, b in pairs])
@@ -1,16 +1,33 @@
 import dash
-from dash import dcc, html, Input, Output, callback, State
+from dash import dcc, html, Input, Output, callback, State, ClientsideFunction, Patch
+from dash.exceptions import MissingCallbackContextException
 import dash_bootstrap_components as dbc
 import plotly.graph_objs as go
-import plotly.express as px
+import plotly.io as pio
 from plotly.subplots import make_subplots
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import json
+import threading
+import time
+from flask import Response, g, jsonify, request
 
 from data_fetcher import DataFetcher
 from technical_analysis import TechnicalAnalysis
+from chart_utils import downsample_frame, get_target_points, get_scatter_type
+from config import CLIENTSIDE_RANGES, LIVE_MODE, LIVE_SOURCE, LIVE_INTERVAL, TRACEMALLOC, STARTUP_FETCH, DEDUPE_WINDOW
+from data_export import EXPORT_FORMATS, ExportCache, build_export, iter_chunks
+from metrics import metrics
+from profiling import profiler
+from memory_accounting import AllocationTracker, PayloadSizes, dataset_report, deep_nbytes
+from live_feed import CryptoComparePriceSource, ReplayPriceSource, PriceBroadcaster, stream_updates
+from singleflight import SingleFlight
+from correlation_engine import CORRELATION_WINDOWS, RollingCorrelation
+from risk_analysis import RiskAnalysis
+from monte_carlo import CONE_PERCENTILES, ForecastJobs
+from alerts import create_alert_engine
+from regime_detection import VolatilityRegimeDetector
 
 # Initialize the Dash app with dark theme
 app = dash.Dash(__name__, external_stylesheets=[dbc.themes.CYBORG])
@@ -23,7 +40,51 @@ fetcher = DataFetcher()
 btc_data = None
 market_data = None
 correlations = None
+correlation_engine = None
 technical_analysis = None
+risk_analysis = None
+volatility_regimes = []
+
+# Guards publishing a new set of the globals above; concurrent refresh
+# clicks share one fetch_and_process_data run
+data_lock = threading.Lock()
+refresh_flight = SingleFlight(dedupe_window=DEDUPE_WINDOW)
+
+# Dataset version, bumped on every successful fetch, and the last bar of recent
+# versions so charts can be patched with only the bars a client hasn't seen
+data_version = 0
+dataset_versions = {}
+MAX_TRACKED_VERSIONS = 20
+
+# Above this many new bars a full figure rebuild is cheaper than a patch
+PATCH_MAX_NEW_BARS = 500
+
+# Built export files, reused until the dataset version changes
+export_cache = ExportCache()
+
+# Shared live price subscription (live mode only)
+price_broadcaster = None
+
+# Monte Carlo forecasts run in background threads and are polled by the browser
+forecast_jobs = ForecastJobs()
+
+# Alert rules, evaluated on the bars each refresh adds
+alert_engine = create_alert_engine()
+
+# Volatility regimes, updated with the bars each refresh adds
+regime_detector = VolatilityRegimeDetector()
+
+# Shading of the regimes on the volatility chart
+REGIME_COLORS = {
+    'High Volatility': 'rgba(255, 71, 87, 0.18)',
+    'Above Average Volatility': 'rgba(247, 147, 26, 0.14)',
+    'Normal Volatility': 'rgba(128, 128, 128, 0.06)',
+    'Low Volatility': 'rgba(0, 255, 136, 0.10)'
+}
+
+# Allocation snapshots around data refreshes and the size of each callback's last response
+allocation_tracker = AllocationTracker(enabled=TRACEMALLOC)
+payload_sizes = PayloadSizes()
 
 # Custom CSS for dark theme and Bitcoin branding
 app.index_string = '''
@@ -96,30 +157,126 @@ app.index_string = '''
 </html>
 '''
 
+@profiler.profiled()
+@allocation_tracker.tracked()
 def fetch_and_process_data():
-    """Fetch and process all data"""
-    global btc_data, market_data, correlations, technical_analysis
+    """
+    Fetch and process all data
+
+    Everything is computed into locals first and published together under
+    data_lock, so callbacks never see new prices with old indicators.
+    """
+    global btc_data, market_data, correlations, correlation_engine, technical_analysis, risk_analysis, data_version
+    global volatility_regimes
     
     print("Fetching Bitcoin data...")
-    btc_data = fetcher.fetch_bitcoin_data()
+    with metrics.track("fetch_stage", "bitcoin"):
+        new_btc_data = fetcher.fetch_bitcoin_data()
     
-    if btc_data is not None:
+    if new_btc_data is not None:
         print("Fetching traditional market data...")
         end_date = datetime.now()
         start_date = end_date - timedelta(days=730)
-        market_data = fetcher.fetch_traditional_markets(start_date, end_date)
+        with metrics.track("fetch_stage", "traditional_markets"):
+            new_market_data = fetcher.fetch_traditional_markets(start_date, end_date)
         
-        if market_data is not None:
-            correlations = fetcher.calculate_correlations(btc_data, market_data)
+        new_correlations = correlations
+        new_correlation_engine = correlation_engine
+        if new_market_data is not None:
+            with metrics.track("fetch_stage", "correlations"):
+                new_correlations = fetcher.calculate_correlations(new_btc_data, new_market_data)
+            with metrics.track("fetch_stage", "correlation_engine"):
+                new_correlation_engine = RollingCorrelation.from_frames(new_btc_data, new_market_data)
         
         # Initialize technical analysis
-        technical_analysis = TechnicalAnalysis(btc_data)
+        with metrics.track("fetch_stage", "technical_analysis"):
+            new_technical_analysis = TechnicalAnalysis(new_btc_data)
+        
+        # Risk statistics per time range are computed on first use and then cached
+        with metrics.track("fetch_stage", "risk_analysis"):
+            new_risk_analysis = RiskAnalysis(new_btc_data)
+        
+        with metrics.track("fetch_stage", "regimes"):
+            new_volatility_regimes = regime_detector.update_frame(new_btc_data)
+        
+        with data_lock:
+            btc_data = new_btc_data
+            market_data = new_market_data
+            correlations = new_correlations
+            correlation_engine = new_correlation_engine
+            technical_analysis = new_technical_analysis
+            risk_analysis = new_risk_analysis
+            volatility_regimes = new_volatility_regimes
+            
+            data_version += 1
+            dataset_versions[data_version] = btc_data.index[-1]
+            for old_version in sorted(dataset_versions)[:-MAX_TRACKED_VERSIONS]:
+                del dataset_versions[old_version]
+        
+        with metrics.track("fetch_stage", "alerts"):
+            alert_engine.evaluate_frame(new_technical_analysis.data)
+        
+        # Live updates measure the 1D change against the previous close
+        if price_broadcaster is not None and len(new_btc_data) > 1:
+            price_broadcaster.set_reference_price(new_btc_data['price'].iloc[-2])
+        
         print("Data processing complete!")
     else:
         print("Failed to fetch data")
 
+def refresh_datasets():
+    """
+    Run fetch_and_process_data, sharing the run with concurrent refreshes
+
+    Clicks from many users within a refresh (or DEDUPE_WINDOW seconds after
+    it) trigger one upstream fetch and one TechnicalAnalysis build.
+    """
+    refresh_flight.do('refresh', fetch_and_process_data)
+
+def get_export_source():
+    """Data offered for download: price data plus every computed indicator"""
+    if technical_analysis is not None:
+        return technical_analysis.data
+    return btc_data
+
+def get_export(export_format, time_range, columns=None):
+    """
+    Export artifact for the current dataset version and selection
+
+    Built once per (version, format, range, columns) and then served from the
+    cache. Without a column selection the raw price data columns are exported.
+    """
+    columns = tuple(columns or btc_data.columns)
+    key = (data_version, export_format, time_range, columns)
+    
+    return export_cache.get_or_build(
+        key,
+        lambda: build_export(
+            filter_data_by_time_range(get_export_source(), time_range),
+            export_format,
+            columns
+        )
+    )
+
+def create_price_broadcaster():
+    """Live price fan-out for the configured source (a replay stands in for the real feed)"""
+    if LIVE_SOURCE.startswith("replay:"):
+        source = ReplayPriceSource.from_file(LIVE_SOURCE[len("replay:"):])
+    elif LIVE_SOURCE == "replay":
+        source = ReplayPriceSource(btc_data['price'].tail(100) if btc_data is not None else [0])
+    else:
+        source = CryptoComparePriceSource(fetcher.cryptocompare_base_url)
+    
+    return PriceBroadcaster(source, interval=LIVE_INTERVAL)
+
 # Fetch data on startup
-fetch_and_process_data()
+if STARTUP_FETCH:
+    fetch_and_process_data()
+
+if LIVE_MODE:
+    price_broadcaster = create_price_broadcaster()
+    if btc_data is not None and len(btc_data) > 1:
+        price_broadcaster.set_reference_price(btc_data['price'].iloc[-2])
 
 # App layout with modern dark theme
 app.layout = html.Div([
@@ -150,7 +307,8 @@ app.layout = html.Div([
                     html.H4("Current Price", className="card-title", style={'color': '#f7931a'}),
                     html.H2(id="current-price", className="bitcoin-orange"),
                     html.P(id="price-change", className="card-text"),
-                    html.Small(id="price-timestamp", style={'color': '#888'})
+                    html.Small(id="price-timestamp", style={'color': '#888'}),
+                    html.Small(id="live-status", className="price-positive ms-2")
                 ])
             ], className="metric-card text-center")
         ], width=3),
@@ -186,6 +344,50 @@ app.layout = html.Div([
         ], width=3)
     ], className="mb-4"),
     
+    # Risk Metrics Cards
+    dbc.Row([
+        dbc.Col([
+            dbc.Card([
+                dbc.CardBody([
+                    html.H4("Value at Risk", className="card-title", style={'color': '#f7931a'}),
+                    html.H2(id="risk-var", className="price-negative"),
+                    html.P(id="risk-cvar", className="card-text"),
+                    html.Small(id="risk-var-parametric", style={'color': '#888'})
+                ])
+            ], className="metric-card text-center")
+        ], width=3),
+        dbc.Col([
+            dbc.Card([
+                dbc.CardBody([
+                    html.H4("Max Drawdown", className="card-title", style={'color': '#f7931a'}),
+                    html.H2(id="risk-drawdown", className="price-negative"),
+                    html.P(id="risk-drawdown-duration", className="card-text"),
+                    html.Small(id="risk-current-drawdown", style={'color': '#888'})
+                ])
+            ], className="metric-card text-center")
+        ], width=3),
+        dbc.Col([
+            dbc.Card([
+                dbc.CardBody([
+                    html.H4("Risk-Adjusted Return", className="card-title", style={'color': '#f7931a'}),
+                    html.H2(id="risk-sharpe", className="text-primary"),
+                    html.P(id="risk-sortino", className="card-text"),
+                    html.Small(id="risk-volatility", style={'color': '#888'})
+                ])
+            ], className="metric-card text-center")
+        ], width=3),
+        dbc.Col([
+            dbc.Card([
+                dbc.CardBody([
+                    html.H4("Return Distribution", className="card-title", style={'color': '#f7931a'}),
+                    html.H2(id="risk-skewness", className="text-info"),
+                    html.P(id="risk-kurtosis", className="card-text"),
+                    html.Small(id="risk-periods", style={'color': '#888'})
+                ])
+            ], className="metric-card text-center")
+        ], width=3)
+    ], className="mb-4"),
+    
     # Main Price Chart with Technical Indicators
     html.Div([
         html.H5("Bitcoin Price Chart with Technical Indicators", 
@@ -220,11 +422,79 @@ app.layout = html.Div([
         dbc.Col([
             html.Div([
                 html.H5("Market Correlations", style={'color': '#f7931a', 'marginBottom': '20px'}),
+                dbc.Row([
+                    dbc.Col([
+                        dcc.RadioItems(
+                            id="correlation-view",
+                            options=[
+                                {'label': 'Full period', 'value': 'bars'},
+                                {'label': 'Over time', 'value': 'rolling'},
+                                {'label': 'Heatmap', 'value': 'heatmap'}
+                            ],
+                            value='bars',
+                            inline=True,
+                            inputStyle={'marginRight': '5px', 'marginLeft': '10px'}
+                        )
+                    ], width=7),
+                    dbc.Col([
+                        dcc.RadioItems(
+                            id="correlation-window",
+                            options=[{'label': f'{days}D', 'value': days} for days in CORRELATION_WINDOWS],
+                            value=90,
+                            inline=True,
+                            inputStyle={'marginRight': '5px', 'marginLeft': '10px'}
+                        )
+                    ], width=5, className="text-end")
+                ], className="mb-2"),
                 dcc.Graph(id="correlation-chart", style={'height': '500px'})
             ], className="chart-container")
         ], width=6)
     ], className="mb-4"),
     
+    # Monte Carlo Forecast
+    html.Div([
+        html.H5("Monte Carlo Price Forecast", style={'color': '#f7931a', 'marginBottom': '20px'}),
+        dbc.Row([
+            dbc.Col([
+                dcc.RadioItems(
+                    id="forecast-method",
+                    options=[
+                        {'label': 'Bootstrap returns', 'value': 'bootstrap'},
+                        {'label': 'Fitted GBM', 'value': 'gbm'}
+                    ],
+                    value='bootstrap',
+                    inline=True,
+                    inputStyle={'marginRight': '5px', 'marginLeft': '10px'}
+                )
+            ], width=4),
+            dbc.Col([
+                dcc.Dropdown(
+                    id="forecast-horizon",
+                    options=[{'label': f'{days} days', 'value': days} for days in (30, 90, 180, 365)],
+                    value=90,
+                    clearable=False,
+                    style={'color': '#000'}
+                )
+            ], width=2),
+            dbc.Col([
+                dcc.Dropdown(
+                    id="forecast-paths",
+                    options=[{'label': f'{paths:,} paths', 'value': paths} for paths in (10_000, 100_000, 1_000_000)],
+                    value=100_000,
+                    clearable=False,
+                    style={'color': '#000'}
+                )
+            ], width=2),
+            dbc.Col([
+                dbc.Button("🎲 Run Forecast", id="forecast-btn", color="warning", size="sm", className="me-3"),
+                html.Small(id="forecast-status", style={'color': '#888'})
+            ], width=4)
+        ], className="mb-3"),
+        dcc.Graph(id="forecast-chart", style={'height': '500px'}),
+        dcc.Store(id="forecast-job"),
+        dcc.Interval(id="forecast-poll", interval=500, disabled=True)
+    ], className="chart-container"),
+    
     # Market Summary and Statistics
     html.Div([
         html.H5("Market Summary & Statistics", style={'color': '#f7931a', 'marginBottom': '20px'}),
@@ -248,6 +518,32 @@ app.layout = html.Div([
                 dbc.Button("📈 Export Charts", id="export-btn", color="info", size="lg")
             ], className="text-center")
         ]),
+        dbc.Row([
+            dbc.Col([
+                dcc.Dropdown(
+                    id="export-format",
+                    options=[
+                        {'label': 'CSV', 'value': 'csv'},
+                        {'label': 'CSV (gzip)', 'value': 'csv.gz'},
+                        {'label': 'Parquet', 'value': 'parquet'},
+                        {'label': 'Arrow IPC', 'value': 'arrow'}
+                    ],
+                    value='csv',
+                    clearable=False,
+                    style={'color': '#000'}
+                )
+            ], width=3),
+            dbc.Col([
+                dcc.Dropdown(
+                    id="export-columns",
+                    options=[{'label': col, 'value': col} for col in get_export_source().columns]
+                    if get_export_source() is not None else [],
+                    multi=True,
+                    placeholder="Columns to export (default: price data)",
+                    style={'color': '#000'}
+                )
+            ], width=9)
+        ], className="mt-3"),
         html.Div([
             html.Small(id="last-updated", style={'color': '#888'})
         ], className="text-center mt-3")
@@ -260,19 +556,51 @@ app.layout = html.Div([
     dcc.Download(id="download-dataframe-csv"),
     
     # Store for time range selection
-    dcc.Store(id="time-range-store", data="2Y")
+    dcc.Store(id="time-range-store", data="2Y"),
+    
+    # Dataset version shown by this client and the version it replaces
+    dcc.Store(id="data-version-store"),
+    
+    # Browser width, used to size chart payloads to what can actually be drawn
+    dcc.Store(id="viewport-store"),
+    
+    # Time range boundaries for switching ranges in the browser (clientside mode)
+    dcc.Store(id="series-store"),
+    
+    # Live price stream settings, read by the browser
+    dcc.Store(id="live-config", data={'enabled': LIVE_MODE, 'url': '/stream/price'})
     
 ], className="dashboard-container")
 
-# Callback to handle time range selection
-@app.callback(
-    Output("time-range-store", "data"),
-    [Input("1m-btn", "n_clicks"),
-     Input("3m-btn", "n_clicks"),
-     Input("6m-btn", "n_clicks"),
-     Input("1y-btn", "n_clicks"),
-     Input("2y-btn", "n_clicks")]
+# Report the browser width once on load so charts can be downsampled to it
+app.clientside_callback(
+    "function(storeId) { return window.innerWidth; }",
+    Output("viewport-store", "data"),
+    Input("viewport-store", "id")
+)
+
+# Open the live price stream; updates are written straight into the price card
+app.clientside_callback(
+    ClientsideFunction(namespace="livePrice", function_name="connect"),
+    Output("live-status", "children"),
+    Input("live-config", "data")
 )
+
+# In clientside mode the charts hold the full history and a range switch only
+# moves their axes in the browser, so the time range must not trigger the server
+RANGE_DEPENDENCY = State if CLIENTSIDE_RANGES else Input
+
+# Time range buttons
+TIME_RANGE_INPUTS = [
+    Input("1m-btn", "n_clicks"),
+    Input("3m-btn", "n_clicks"),
+    Input("6m-btn", "n_clicks"),
+    Input("1y-btn", "n_clicks"),
+    Input("2y-btn", "n_clicks")
+]
+
+# Callback to handle time range selection
+@metrics.timed("callback")
 def update_time_range(btn1, btn2, btn3, btn4, btn5):
     ctx = dash.callback_context
     if not ctx.triggered:
@@ -289,6 +617,16 @@ def update_time_range(btn1, btn2, btn3, btn4, btn5):
     
     return time_mapping.get(button_id, "2Y")
 
+if CLIENTSIDE_RANGES:
+    app.clientside_callback(
+        ClientsideFunction(namespace="timeRange", function_name="selectRange"),
+        Output("time-range-store", "data"),
+        TIME_RANGE_INPUTS,
+        prevent_initial_call=True
+    )
+else:
+    app.callback(Output("time-range-store", "data"), TIME_RANGE_INPUTS)(update_time_range)
+
 # Callback to update summary cards
 @app.callback(
     [Output("current-price", "children"),
@@ -303,10 +641,12 @@ def update_time_range(btn1, btn2, btn3, btn4, btn5):
      Output("volume-pattern", "children"),
      Output("volume-details", "children"),
      Output("volume-trend", "children")],
-    [Input("refresh-btn", "n_clicks"),
-     Input("time-range-store", "data")]
+    [Input("data-version-store", "data"),
+     RANGE_DEPENDENCY("time-range-store", "data")]
 )
-def update_summary_cards(n_clicks, time_range):
+@metrics.timed("callback")
+@profiler.profiled()
+def update_summary_cards(version_info, time_range):
     if btc_data is None or technical_analysis is None:
         return ["N/A"] * 12
     
@@ -385,28 +725,231 @@ def update_summary_cards(n_clicks, time_range):
         ]
     except Exception as e:
         print(f"Error updating summary cards: {e}")
+        metrics.mark_error()
         return ["Error"] * 12
 
+# Days covered by each time range button (unknown ranges fall back to 2Y)
+TIME_RANGE_DAYS = {
+    "1M": 30,
+    "3M": 90,
+    "6M": 180,
+    "1Y": 365,
+    "2Y": 730
+}
+
+RISK_CARD_OUTPUTS = [
+    "risk-var", "risk-cvar", "risk-var-parametric", "risk-drawdown", "risk-drawdown-duration",
+    "risk-current-drawdown", "risk-sharpe", "risk-sortino", "risk-volatility", "risk-skewness",
+    "risk-kurtosis", "risk-periods"
+]
+
+# Callback to update risk cards
+@app.callback(
+    [Output(card, "children") for card in RISK_CARD_OUTPUTS],
+    [Input("data-version-store", "data"),
+     RANGE_DEPENDENCY("time-range-store", "data")]
+)
+@metrics.timed("callback")
+def update_risk_cards(version_info, time_range):
+    if btc_data is None or risk_analysis is None:
+        return ["N/A"] * 12
+    
+    try:
+        return build_risk_cards(time_range)
+        
+    except Exception as e:
+        print(f"Error updating risk cards: {e}")
+        metrics.mark_error()
+        return ["N/A"] * 12
+
+def build_risk_cards(time_range):
+    """Risk card texts for a time range (the per-range summaries are cached by RiskAnalysis)"""
+    start_date, _ = get_time_range_bounds(btc_data, time_range)
+    risk = risk_analysis.summary(start_date)
+    confidence = f"{risk['confidence']:.0%}"
+    
+    def loss(value):
+        return f"-{value * 100:.2f}%" if value is not None else "N/A"
+    
+    def ratio(value):
+        return f"{value:.2f}" if value is not None else "N/A"
+    
+    def days(value):
+        return f"{value:.0f} days" if value is not None else "N/A"
+    
+    volatility = f"{risk['volatility_annual'] * 100:.2f}%" if risk['volatility_annual'] is not None else "N/A"
+    
+    return [
+        loss(risk['var_historical']),
+        f"CVaR ({confidence}): {loss(risk['cvar_historical'])}",
+        f"Parametric: {loss(risk['var_parametric'])} / {loss(risk['cvar_parametric'])}",
+        loss(risk['max_drawdown']),
+        f"Longest under water: {days(risk['max_drawdown_duration_days'])}",
+        f"Current: {loss(risk['current_drawdown'])} for {days(risk['current_drawdown_duration_days'])}",
+        f"Sharpe {ratio(risk['sharpe'])}",
+        f"Sortino {ratio(risk['sortino'])}",
+        f"Annual volatility: {volatility}",
+        f"Skew {ratio(risk['skewness'])}",
+        f"Excess kurtosis {ratio(risk['kurtosis'])}",
+        f"{risk['periods']:,} returns ({time_range})"
+    ]
+
+def get_time_range_bounds(data, time_range):
+    """Start and end date of the selected time range"""
+    end_date = data.index[-1]
+    start_date = end_date - timedelta(days=TIME_RANGE_DAYS.get(time_range, 730))
+    return start_date, end_date
+
 def filter_data_by_time_range(data, time_range):
     """Filter data based on selected time range"""
     if data is None or data.empty:
         return pd.DataFrame()
     
-    end_date = data.index[-1]
-    
-    if time_range == "1M":
-        start_date = end_date - timedelta(days=30)
-    elif time_range == "3M":
-        start_date = end_date - timedelta(days=90)
-    elif time_range == "6M":
-        start_date = end_date - timedelta(days=180)
-    elif time_range == "1Y":
-        start_date = end_date - timedelta(days=365)
-    else:  # 2Y
-        start_date = end_date - timedelta(days=730)
+    start_date, _ = get_time_range_bounds(data, time_range)
     
     return data[data.index >= start_date]
 
+def get_chart_range(time_range):
+    """Time range a chart is built from; the full history when ranges switch clientside"""
+    return "2Y" if CLIENTSIDE_RANGES else time_range
+
+def set_initial_time_range(fig, data, time_range):
+    """In clientside mode, open a full-history chart zoomed to the selected range"""
+    if CLIENTSIDE_RANGES and time_range != "2Y":
+        start_date, end_date = get_time_range_bounds(data, time_range)
+        fig.update_xaxes(range=[str(start_date), str(end_date)])
+
+def get_triggered_id():
+    """Id of the component that triggered the running callback (None when called directly)"""
+    try:
+        triggered = dash.callback_context.triggered
+    except MissingCallbackContextException:
+        return None
+    
+    if not triggered:
+        return None
+    return triggered[0]['prop_id'].split('.')[0]
+
+def get_new_rows(version_info, time_range, target_points):
+    """
+    Bars a chart has to add since the dataset version the client is showing
+
+    Returns None when the figure must be rebuilt instead: the callback was not
+    triggered by a refresh, the client's version is unknown or too old, there
+    are too many new bars, or the chart's window has more bars than
+    target_points. Patches keep one point per bar, so downsampled charts are
+    rebuilt, which is already capped at the chart width. The client's last
+    bar is included because the latest (still open) bar is revised by every
+    refresh.
+    """
+    if get_triggered_id() != "data-version-store":
+        return None
+    
+    if not version_info or btc_data is None:
+        return None
+    
+    base_version = version_info.get('base')
+    if base_version == version_info.get('version'):
+        return btc_data.iloc[:0]
+    if base_version not in dataset_versions:
+        return None
+    
+    base_last_bar = dataset_versions[base_version]
+    if base_last_bar not in btc_data.index:
+        return None
+    
+    new_rows = btc_data[btc_data.index >= base_last_bar]
+    if len(new_rows) > PATCH_MAX_NEW_BARS:
+        return None
+    
+    # Bars in the client's window and in the current one
+    index = btc_data.index
+    base_start, new_start = get_patch_window_starts(new_rows, time_range)
+    base_bars = index.searchsorted(base_last_bar, side='right') - index.searchsorted(base_start)
+    if max(base_bars, len(index) - index.searchsorted(new_start)) > target_points:
+        return None
+    
+    return new_rows
+
+def get_patch_window_starts(new_rows, time_range):
+    """Start of the chart window the client shows (ending at its last bar) and of the current one"""
+    days = timedelta(days=TIME_RANGE_DAYS.get(get_chart_range(time_range), 730))
+    return new_rows.index[0] - days, btc_data.index[-1] - days
+
+# Per-point trace arrays carried over into incremental updates
+PATCHED_TRACE_ARRAYS = [('x',), ('y',), ('customdata',), ('marker', 'color')]
+
+def build_append_patch(delta_fig, new_rows, time_range):
+    """
+    Turn a figure built from the new bars only into a partial update
+
+    Every trace drops the points of the bars that left the window and its
+    last point (the client's stale latest bar), and is extended with the new
+    points, so it ends up with the points a rebuild would send. The x axes
+    slide to the current window and the y axes are fitted again, since a
+    clientside range switch pins them. Styling is never resent, so the
+    payload grows with the number of new bars.
+    """
+    patch = Patch()
+    
+    # Serialize the same way a full figure is, so patched points match exactly
+    delta = json.loads(pio.to_json(delta_fig, validate=False))
+    
+    base_start, new_start = get_patch_window_starts(new_rows, time_range)
+    index = btc_data.index
+    dropped = max(0, int(index.searchsorted(new_start) - index.searchsorted(base_start)))
+    
+    for i, trace in enumerate(delta['data']):
+        for path in PATCHED_TRACE_ARRAYS:
+            values = trace
+            for key in path:
+                values = values.get(key) if isinstance(values, dict) else None
+            
+            if not isinstance(values, list):
+                continue
+            
+            target = patch['data'][i]
+            for key in path:
+                target = target[key]
+            for _ in range(dropped):
+                del target[0]
+            del target[-1]
+            target.extend(values)
+    
+    start_date, end_date = get_time_range_bounds(btc_data, time_range)
+    for key, axis in delta['layout'].items():
+        if key.startswith('xaxis'):
+            patch['layout'][key]['range'] = [str(start_date), str(end_date)]
+        elif key.startswith('yaxis'):
+            # Back to what a rebuild has: its fixed range, or autorange
+            if axis.get('range') is not None:
+                patch['layout'][key]['range'] = axis['range']
+                patch['layout'][key]['autorange'] = False
+            else:
+                patch['layout'][key]['autorange'] = True
+    
+    return patch
+
+def build_range_summary(data):
+    """Per-range axis bounds and period change, used by the clientside range switch"""
+    if data is None or data.empty:
+        return None
+    
+    ranges = {}
+    for time_range in TIME_RANGE_DAYS:
+        start_date, end_date = get_time_range_bounds(data, time_range)
+        window = data['price'][data.index >= start_date]
+        ranges[time_range] = {
+            'start': str(start_date),
+            'end': str(end_date),
+            'change': ((window.iloc[-1] / window.iloc[0]) - 1) * 100 if len(window) > 1 else 0
+        }
+    
+    return {
+        'change_1d': data['returns'].iloc[-1] * 100 if len(data) > 1 else 0,
+        'ranges': ranges
+    }
+
 def get_trend_strength(trend_analysis):
     """Calculate trend strength based on moving average positions"""
     if not isinstance(trend_analysis, dict):
@@ -432,20 +975,39 @@ def get_trend_strength(trend_analysis):
 # Callback to update price chart
 @app.callback(
     Output("price-chart", "figure"),
-    [Input("refresh-btn", "n_clicks"),
-     Input("time-range-store", "data")]
+    [Input("data-version-store", "data"),
+     Input("viewport-store", "data"),
+     RANGE_DEPENDENCY("time-range-store", "data")]
 )
-def update_price_chart(n_clicks, time_range):
+@metrics.timed("callback")
+@profiler.profiled()
+def update_price_chart(version_info, viewport_width, time_range):
     if btc_data is None or technical_analysis is None:
         return go.Figure()
     
     try:
+        # Send only as many points as the chart is wide
+        target_points = get_target_points(viewport_width)
+        
         # Filter data based on time range
-        filtered_data = filter_data_by_time_range(btc_data, time_range)
+        # After a refresh only the new bars are built and sent as a patch
+        new_rows = get_new_rows(version_info, time_range, target_points)
+        if new_rows is not None and new_rows.empty:
+            return dash.no_update
+        
+        if new_rows is not None:
+            filtered_data = new_rows
+        else:
+            filtered_data = filter_data_by_time_range(btc_data, get_chart_range(time_range))
         
         if filtered_data.empty:
             return go.Figure()
         
+        price_data = downsample_frame(filtered_data, 'price', target_points)
+        
+        # WebGL traces once the window fills the chart width
+        Scatter = get_scatter_type(len(price_data), target_points)
+        
         # Create subplot for price and volume
         fig = make_subplots(
             rows=2, cols=1,
@@ -457,9 +1019,9 @@ def update_price_chart(n_clicks, time_range):
         
         # Price line with Bitcoin orange color
         fig.add_trace(
-            go.Scatter(
-                x=filtered_data.index,
-                y=filtered_data['price'],
+            Scatter(
+                x=price_data.index,
+                y=price_data['price'],
                 mode='lines',
                 name='BTC Price',
                 line=dict(color='#f7931a', width=3),
@@ -469,8 +1031,8 @@ def update_price_chart(n_clicks, time_range):
                             '<b>📊 Change</b>: %{customdata[0]:+.2f}%<br>' +
                             '<b>📈 Volume</b>: %{customdata[1]:,.0f}<extra></extra></div>',
                 customdata=np.column_stack((
-                    filtered_data['returns'] * 100,
-                    filtered_data['volume']
+                    price_data['returns'] * 100,
+                    price_data['volume']
                 ))
             ),
             row=1, col=1
@@ -478,10 +1040,11 @@ def update_price_chart(n_clicks, time_range):
         
         # Moving averages
         if 'SMA_20' in filtered_data.columns:
+            trace_data = downsample_frame(filtered_data, 'SMA_20', target_points)
             fig.add_trace(
-                go.Scatter(
-                    x=filtered_data.index,
-                    y=filtered_data['SMA_20'],
+                Scatter(
+                    x=trace_data.index,
+                    y=trace_data['SMA_20'],
                     mode='lines',
                     name='SMA 20',
                     line=dict(color='#00d4ff', width=2),
@@ -493,10 +1056,11 @@ def update_price_chart(n_clicks, time_range):
             )
         
         if 'SMA_50' in filtered_data.columns:
+            trace_data = downsample_frame(filtered_data, 'SMA_50', target_points)
             fig.add_trace(
-                go.Scatter(
-                    x=filtered_data.index,
-                    y=filtered_data['SMA_50'],
+                Scatter(
+                    x=trace_data.index,
+                    y=trace_data['SMA_50'],
                     mode='lines',
                     name='SMA 50',
                     line=dict(color='#ff6b35', width=2),
@@ -508,10 +1072,11 @@ def update_price_chart(n_clicks, time_range):
             )
         
         if 'SMA_200' in filtered_data.columns:
+            trace_data = downsample_frame(filtered_data, 'SMA_200', target_points)
             fig.add_trace(
-                go.Scatter(
-                    x=filtered_data.index,
-                    y=filtered_data['SMA_200'],
+                Scatter(
+                    x=trace_data.index,
+                    y=trace_data['SMA_200'],
                     mode='lines',
                     name='SMA 200',
                     line=dict(color='#ff4757', width=2),
@@ -524,10 +1089,11 @@ def update_price_chart(n_clicks, time_range):
         
         # Bollinger Bands
         if 'BB_upper' in filtered_data.columns:
+            trace_data = downsample_frame(filtered_data, 'BB_upper', target_points)
             fig.add_trace(
-                go.Scatter(
-                    x=filtered_data.index,
-                    y=filtered_data['BB_upper'],
+                Scatter(
+                    x=trace_data.index,
+                    y=trace_data['BB_upper'],
                     mode='lines',
                     name='BB Upper',
                     line=dict(color='rgba(255,255,255,0.5)', width=1, dash='dash'),
@@ -539,10 +1105,11 @@ def update_price_chart(n_clicks, time_range):
                 row=1, col=1
             )
             
+            trace_data = downsample_frame(filtered_data, 'BB_lower', target_points)
             fig.add_trace(
-                go.Scatter(
-                    x=filtered_data.index,
-                    y=filtered_data['BB_lower'],
+                Scatter(
+                    x=trace_data.index,
+                    y=trace_data['BB_lower'],
                     mode='lines',
                     name='BB Lower',
                     line=dict(color='rgba(255,255,255,0.5)', width=1, dash='dash'),
@@ -555,14 +1122,14 @@ def update_price_chart(n_clicks, time_range):
                 row=1, col=1
             )
         
-        # Volume bars with color coding
-        colors = ['#00ff88' if filtered_data['returns'].iloc[i] >= 0 else '#ff4757' 
-                 for i in range(len(filtered_data))]
+        # Volume bars with color coding (min/max buckets keep volume spikes)
+        volume_data = downsample_frame(filtered_data, 'volume', target_points, method='minmax')
+        colors = np.where(volume_data['returns'].to_numpy() >= 0, '#00ff88', '#ff4757')
         
         fig.add_trace(
             go.Bar(
-                x=filtered_data.index,
-                y=filtered_data['volume'],
+                x=volume_data.index,
+                y=volume_data['volume'],
                 name='Volume',
                 marker_color=colors,
                 opacity=0.7,
@@ -570,7 +1137,7 @@ def update_price_chart(n_clicks, time_range):
                             '<b>📅 Date</b>: %{x|%B %d, %Y}<br>' +
                             '<b>📊 Volume</b>: %{y:,.0f}<br>' +
                             '<b>💰 Price</b>: $%{customdata:,.2f}<extra></extra></div>',
-                customdata=filtered_data['price']
+                customdata=volume_data['price']
             ),
             row=2, col=1
         )
@@ -594,28 +1161,51 @@ def update_price_chart(n_clicks, time_range):
         fig.update_xaxes(gridcolor='rgba(255,255,255,0.1)', zerolinecolor='rgba(255,255,255,0.3)')
         fig.update_yaxes(gridcolor='rgba(255,255,255,0.1)', zerolinecolor='rgba(255,255,255,0.3)')
         
+        if new_rows is not None:
+            return build_append_patch(fig, new_rows, time_range)
+        
+        set_initial_time_range(fig, btc_data, time_range)
+        
         return fig
         
     except Exception as e:
         print(f"Error updating price chart: {e}")
+        metrics.mark_error()
         return go.Figure()
 
 # Callback to update volume chart
 @app.callback(
     Output("volume-chart", "figure"),
-    [Input("refresh-btn", "n_clicks"),
-     Input("time-range-store", "data")]
+    [Input("data-version-store", "data"),
+     Input("viewport-store", "data"),
+     RANGE_DEPENDENCY("time-range-store", "data")]
 )
-def update_volume_chart(n_clicks, time_range):
+@metrics.timed("callback")
+@profiler.profiled()
+def update_volume_chart(version_info, viewport_width, time_range):
     if btc_data is None:
         return go.Figure()
     
     try:
-        filtered_data = filter_data_by_time_range(btc_data, time_range)
+        # Half-width chart
+        target_points = get_target_points(viewport_width, width_fraction=0.5)
+        
+        # After a refresh only the new bars are built and sent as a patch
+        new_rows = get_new_rows(version_info, time_range, target_points)
+        if new_rows is not None and new_rows.empty:
+            return dash.no_update
+        
+        if new_rows is not None:
+            filtered_data = new_rows
+        else:
+            filtered_data = filter_data_by_time_range(btc_data, get_chart_range(time_range))
         
         if filtered_data.empty:
             return go.Figure()
 
+        # WebGL traces once the window fills the chart width
+        Scatter = get_scatter_type(min(len(filtered_data), target_points), target_points)
+
         fig = make_subplots(
             rows=2, cols=1,
             shared_xaxes=True,
@@ -625,10 +1215,11 @@ def update_volume_chart(n_clicks, time_range):
         )
         
         # Volume with moving average
+        trace_data = downsample_frame(filtered_data, 'volume', target_points)
         fig.add_trace(
-            go.Scatter(
-                x=filtered_data.index,
-                y=filtered_data['volume'],
+            Scatter(
+                x=trace_data.index,
+                y=trace_data['volume'],
                 mode='lines',
                 name='Volume',
                 line=dict(color='#1f77b4', width=2)
@@ -637,10 +1228,11 @@ def update_volume_chart(n_clicks, time_range):
         )
         
         if 'volume_SMA_20' in filtered_data.columns:
+            trace_data = downsample_frame(filtered_data, 'volume_SMA_20', target_points)
             fig.add_trace(
-                go.Scatter(
-                    x=filtered_data.index,
-                    y=filtered_data['volume_SMA_20'],
+                Scatter(
+                    x=trace_data.index,
+                    y=trace_data['volume_SMA_20'],
                     mode='lines',
                     name='Volume SMA 20',
                     line=dict(color='orange', width=1)
@@ -650,10 +1242,11 @@ def update_volume_chart(n_clicks, time_range):
         
         # Volume Rate of Change
         if 'volume_ROC' in filtered_data.columns:
+            trace_data = downsample_frame(filtered_data, 'volume_ROC', target_points)
             fig.add_trace(
-                go.Scatter(
-                    x=filtered_data.index,
-                    y=filtered_data['volume_ROC'] * 100,
+                Scatter(
+                    x=trace_data.index,
+                    y=trace_data['volume_ROC'] * 100,
                     mode='lines',
                     name='Volume ROC (%)',
                     line=dict(color='green', width=2)
@@ -676,28 +1269,51 @@ def update_volume_chart(n_clicks, time_range):
             margin=dict(l=50, r=50, t=50, b=50)
         )
         
+        if new_rows is not None:
+            return build_append_patch(fig, new_rows, time_range)
+        
+        set_initial_time_range(fig, btc_data, time_range)
+        
         return fig
         
     except Exception as e:
         print(f"Error updating volume chart: {e}")
+        metrics.mark_error()
         return go.Figure()
 
 # Callback to update indicators chart
 @app.callback(
     Output("indicators-chart", "figure"),
-    [Input("refresh-btn", "n_clicks"),
-     Input("time-range-store", "data")]
+    [Input("data-version-store", "data"),
+     Input("viewport-store", "data"),
+     RANGE_DEPENDENCY("time-range-store", "data")]
 )
-def update_indicators_chart(n_clicks, time_range):
+@metrics.timed("callback")
+@profiler.profiled()
+def update_indicators_chart(version_info, viewport_width, time_range):
     if btc_data is None:
         return go.Figure()
     
     try:
-        filtered_data = filter_data_by_time_range(btc_data, time_range)
+        # Half-width chart
+        target_points = get_target_points(viewport_width, width_fraction=0.5)
+        
+        # After a refresh only the new bars are built and sent as a patch
+        new_rows = get_new_rows(version_info, time_range, target_points)
+        if new_rows is not None and new_rows.empty:
+            return dash.no_update
+        
+        if new_rows is not None:
+            filtered_data = new_rows
+        else:
+            filtered_data = filter_data_by_time_range(btc_data, get_chart_range(time_range))
         
         if filtered_data.empty:
             return go.Figure()
 
+        # WebGL traces once the window fills the chart width
+        Scatter = get_scatter_type(min(len(filtered_data), target_points), target_points)
+
         fig = make_subplots(
             rows=3, cols=1,
             shared_xaxes=True,
@@ -708,10 +1324,11 @@ def update_indicators_chart(n_clicks, time_range):
         
         # RSI
         if 'RSI' in filtered_data.columns:
+            trace_data = downsample_frame(filtered_data, 'RSI', target_points)
             fig.add_trace(
-                go.Scatter(
-                    x=filtered_data.index,
-                    y=filtered_data['RSI'],
+                Scatter(
+                    x=trace_data.index,
+                    y=trace_data['RSI'],
                     mode='lines',
                     name='RSI',
                     line=dict(color='purple', width=2)
@@ -726,10 +1343,11 @@ def update_indicators_chart(n_clicks, time_range):
         
         # MACD
         if 'MACD' in filtered_data.columns:
+            trace_data = downsample_frame(filtered_data, 'MACD', target_points)
             fig.add_trace(
-                go.Scatter(
-                    x=filtered_data.index,
-                    y=filtered_data['MACD'],
+                Scatter(
+                    x=trace_data.index,
+                    y=trace_data['MACD'],
                     mode='lines',
                     name='MACD',
                     line=dict(color='blue', width=2)
@@ -738,10 +1356,11 @@ def update_indicators_chart(n_clicks, time_range):
             )
             
             if 'MACD_signal' in filtered_data.columns:
+                trace_data = downsample_frame(filtered_data, 'MACD_signal', target_points)
                 fig.add_trace(
-                    go.Scatter(
-                        x=filtered_data.index,
-                        y=filtered_data['MACD_signal'],
+                    Scatter(
+                        x=trace_data.index,
+                        y=trace_data['MACD_signal'],
                         mode='lines',
                         name='MACD Signal',
                         line=dict(color='red', width=1)
@@ -750,11 +1369,12 @@ def update_indicators_chart(n_clicks, time_range):
                 )
             
             if 'MACD_histogram' in filtered_data.columns:
-                colors = ['green' if val >= 0 else 'red' for val in filtered_data['MACD_histogram']]
+                trace_data = downsample_frame(filtered_data, 'MACD_histogram', target_points, method='minmax')
+                colors = np.where(trace_data['MACD_histogram'].to_numpy() >= 0, 'green', 'red')
                 fig.add_trace(
                     go.Bar(
-                        x=filtered_data.index,
-                        y=filtered_data['MACD_histogram'],
+                        x=trace_data.index,
+                        y=trace_data['MACD_histogram'],
                         name='MACD Histogram',
                         marker_color=colors
                     ),
@@ -763,10 +1383,11 @@ def update_indicators_chart(n_clicks, time_range):
         
         # Stochastic
         if 'stoch_k' in filtered_data.columns:
+            trace_data = downsample_frame(filtered_data, 'stoch_k', target_points)
             fig.add_trace(
-                go.Scatter(
-                    x=filtered_data.index,
-                    y=filtered_data['stoch_k'],
+                Scatter(
+                    x=trace_data.index,
+                    y=trace_data['stoch_k'],
                     mode='lines',
                     name='%K',
                     line=dict(color='blue', width=2)
@@ -775,10 +1396,11 @@ def update_indicators_chart(n_clicks, time_range):
             )
             
             if 'stoch_d' in filtered_data.columns:
+                trace_data = downsample_frame(filtered_data, 'stoch_d', target_points)
                 fig.add_trace(
-                    go.Scatter(
-                        x=filtered_data.index,
-                        y=filtered_data['stoch_d'],
+                    Scatter(
+                        x=trace_data.index,
+                        y=trace_data['stoch_d'],
                         mode='lines',
                         name='%D',
                         line=dict(color='red', width=1)
@@ -802,86 +1424,193 @@ def update_indicators_chart(n_clicks, time_range):
             margin=dict(l=50, r=50, t=50, b=50)
         )
         
+        if new_rows is not None:
+            return build_append_patch(fig, new_rows, time_range)
+        
+        set_initial_time_range(fig, btc_data, time_range)
+        
         return fig
         
     except Exception as e:
         print(f"Error updating indicators chart: {e}")
+        metrics.mark_error()
         return go.Figure()
 
 # Callback to update correlation chart
 @app.callback(
     Output("correlation-chart", "figure"),
-    [Input("refresh-btn", "n_clicks"),
-     Input("time-range-store", "data")]
+    [Input("data-version-store", "data"),
+     RANGE_DEPENDENCY("time-range-store", "data"),
+     Input("correlation-view", "value"),
+     Input("correlation-window", "value"),
+     Input("viewport-store", "data")]
 )
-def update_correlation_chart(n_clicks, time_range):
-    if correlations is None:
-        return go.Figure()
+@metrics.timed("callback")
+@profiler.profiled()
+def update_correlation_chart(version_info, time_range, view, window, viewport_width):
+    view = view or 'bars'
+    window = window or 90
     
     try:
-        # Create correlation bar chart
-        markets = list(correlations.keys())
-        corr_values = list(correlations.values())
-        
-        # Color coding based on correlation strength
-        colors = []
-        for corr in corr_values:
-            if abs(corr) > 0.7:
-                colors.append('red' if corr < 0 else 'green')
-            elif abs(corr) > 0.5:
-                colors.append('orange' if corr < 0 else 'lightgreen')
-            else:
-                colors.append('gray')
-        
-        fig = go.Figure(data=[
-            go.Bar(
-                x=markets,
-                y=corr_values,
-                marker_color=colors,
-                text=[f'{val:.3f}' for val in corr_values],
-                textposition='auto'
-            )
-        ])
-        
-        fig.update_layout(
-            title="Bitcoin Correlation with Traditional Markets",
-            xaxis_title="Market",
-            yaxis_title="Correlation Coefficient",
-            yaxis=dict(range=[-1, 1]),
-            height=500,
-            showlegend=False,
-            template='plotly_dark',
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)',
-            font=dict(color='white'),
-            margin=dict(l=50, r=50, t=50, b=50)
-        )
-        
-        # Add zero line
-        fig.add_hline(y=0, line_dash="dash", line_color="white")
-        
-        return fig
+        if view == 'rolling' and correlation_engine is not None:
+            return build_rolling_correlation_chart(window, time_range, viewport_width)
+        if view == 'heatmap' and correlation_engine is not None:
+            return build_correlation_heatmap(window)
+        if correlations is None:
+            return go.Figure()
+        return build_correlation_bars()
         
     except Exception as e:
         print(f"Error updating correlation chart: {e}")
+        metrics.mark_error()
+        return go.Figure()
+
+def build_correlation_bars():
+    """Full-period correlation of Bitcoin with each market"""
+    # Create correlation bar chart
+    markets = list(correlations.keys())
+    corr_values = list(correlations.values())
+    
+    # Color coding based on correlation strength
+    colors = []
+    for corr in corr_values:
+        if abs(corr) > 0.7:
+            colors.append('red' if corr < 0 else 'green')
+        elif abs(corr) > 0.5:
+            colors.append('orange' if corr < 0 else 'lightgreen')
+        else:
+            colors.append('gray')
+    
+    fig = go.Figure(data=[
+        go.Bar(
+            x=markets,
+            y=corr_values,
+            marker_color=colors,
+            text=[f'{val:.3f}' for val in corr_values],
+            textposition='auto'
+        )
+    ])
+    
+    fig.update_layout(
+        title="Bitcoin Correlation with Traditional Markets",
+        xaxis_title="Market",
+        yaxis_title="Correlation Coefficient",
+        yaxis=dict(range=[-1, 1]),
+        height=500,
+        showlegend=False,
+        template='plotly_dark',
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='white'),
+        margin=dict(l=50, r=50, t=50, b=50)
+    )
+    
+    # Add zero line
+    fig.add_hline(y=0, line_dash="dash", line_color="white")
+    
+    return fig
+
+def build_rolling_correlation_chart(window, time_range, viewport_width):
+    """Rolling correlation of Bitcoin with each market over the selected time range"""
+    start_date, _ = get_time_range_bounds(btc_data, get_chart_range(time_range))
+    series = correlation_engine.series(window, start=start_date)
+    
+    # Evenly spaced windows are plenty for a line chart half the page wide
+    target_points = get_target_points(viewport_width, width_fraction=0.5)
+    if len(series) > target_points:
+        positions = np.unique(np.linspace(0, len(series) - 1, target_points).astype(np.intp))
+        series = series.iloc[positions]
+    
+    Scatter = get_scatter_type(len(series), target_points)
+    fig = go.Figure([
+        Scatter(x=series.index, y=series[pair], mode='lines', name=pair.split(' / ')[1])
+        for pair in series.columns
+    ])
+    
+    fig.update_layout(
+        title=f"Bitcoin {window}-Day Rolling Correlation ({time_range})",
+        yaxis_title="Correlation Coefficient",
+        yaxis=dict(range=[-1, 1], fixedrange=True),
+        height=500,
+        hovermode='x unified',
+        template='plotly_dark',
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='white'),
+        margin=dict(l=50, r=50, t=50, b=50),
+        legend=dict(orientation='h', y=-0.15)
+    )
+    fig.add_hline(y=0, line_dash="dash", line_color="white")
+    set_initial_time_range(fig, btc_data, time_range)
+    
+    return fig
+
+def build_correlation_heatmap(window):
+    """Correlation matrix of all assets over the latest window"""
+    matrix = correlation_engine.matrix(window)
+    if matrix is None:
         return go.Figure()
+    
+    fig = go.Figure(data=[
+        go.Heatmap(
+            z=matrix.to_numpy(),
+            x=matrix.columns,
+            y=matrix.index,
+            zmin=-1,
+            zmax=1,
+            colorscale='RdBu',
+            text=matrix.round(2).to_numpy(),
+            texttemplate='%{text}' if len(matrix) <= 12 else None,
+            hovertemplate='%{y} / %{x}: %{z:.3f}<extra></extra>'
+        )
+    ])
+    
+    fig.update_layout(
+        title=f"{window}-Day Correlation Matrix (to {correlation_engine.index[-1]:%Y-%m-%d})",
+        height=500,
+        template='plotly_dark',
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='white'),
+        margin=dict(l=50, r=50, t=50, b=50),
+        yaxis=dict(autorange='reversed')
+    )
+    
+    return fig
 
 # Callback to update volatility chart
 @app.callback(
     Output("volatility-chart", "figure"),
-    [Input("refresh-btn", "n_clicks"),
-     Input("time-range-store", "data")]
+    [Input("data-version-store", "data"),
+     Input("viewport-store", "data"),
+     RANGE_DEPENDENCY("time-range-store", "data")]
 )
-def update_volatility_chart(n_clicks, time_range):
+@metrics.timed("callback")
+@profiler.profiled()
+def update_volatility_chart(version_info, viewport_width, time_range):
     if btc_data is None:
         return go.Figure()
     
     try:
-        filtered_data = filter_data_by_time_range(btc_data, time_range)
+        # Half-width chart
+        target_points = get_target_points(viewport_width, width_fraction=0.5)
+        
+        # After a refresh only the new bars are built and sent as a patch
+        new_rows = get_new_rows(version_info, time_range, target_points)
+        if new_rows is not None and new_rows.empty:
+            return dash.no_update
+        
+        if new_rows is not None:
+            filtered_data = new_rows
+        else:
+            filtered_data = filter_data_by_time_range(btc_data, get_chart_range(time_range))
         
         if filtered_data.empty:
             return go.Figure()
 
+        # WebGL traces once the window fills the chart width
+        Scatter = get_scatter_type(min(len(filtered_data), target_points), target_points)
+
         fig = make_subplots(
             rows=2, cols=1,
             shared_xaxes=True,
@@ -892,10 +1621,11 @@ def update_volatility_chart(n_clicks, time_range):
         
         # Volatility
         if 'volatility' in filtered_data.columns:
+            trace_data = downsample_frame(filtered_data, 'volatility', target_points)
             fig.add_trace(
-                go.Scatter(
-                    x=filtered_data.index,
-                    y=filtered_data['volatility'] * 100,
+                Scatter(
+                    x=trace_data.index,
+                    y=trace_data['volatility'] * 100,
                     mode='lines',
                     name='Volatility (%)',
                     line=dict(color='red', width=2)
@@ -905,10 +1635,11 @@ def update_volatility_chart(n_clicks, time_range):
         
         # Volatility ratio
         if 'volatility_ratio' in filtered_data.columns:
+            trace_data = downsample_frame(filtered_data, 'volatility_ratio', target_points)
             fig.add_trace(
-                go.Scatter(
-                    x=filtered_data.index,
-                    y=filtered_data['volatility_ratio'],
+                Scatter(
+                    x=trace_data.index,
+                    y=trace_data['volatility_ratio'],
                     mode='lines',
                     name='Volatility Ratio',
                     line=dict(color='purple', width=2)
@@ -921,8 +1652,15 @@ def update_volatility_chart(n_clicks, time_range):
             fig.add_hline(y=1.5, line_dash="dash", line_color="red", row=2, col=1)
             fig.add_hline(y=0.5, line_dash="dash", line_color="green", row=2, col=1)
         
+        # Detected regimes across the whole chart window, also for patches
+        window_start, window_end = get_time_range_bounds(btc_data, get_chart_range(time_range))
+        regimes = add_regime_shapes(fig, volatility_regimes, window_start, window_end)
+        title = "Volatility Analysis"
+        if regimes:
+            title += f" · {regimes[-1]['label']} since {regimes[-1]['start'].strftime('%Y-%m-%d')}"
+        
         fig.update_layout(
-            title="Volatility Analysis",
+            title=title,
             xaxis_title="Date",
             height=400,
             showlegend=True,
@@ -933,47 +1671,330 @@ def update_volatility_chart(n_clicks, time_range):
             margin=dict(l=50, r=50, t=50, b=50)
         )
         
+        if new_rows is not None:
+            patch = build_append_patch(fig, new_rows, time_range)
+            patch['layout']['shapes'] = [shape.to_plotly_json() for shape in fig.layout.shapes]
+            patch['layout']['title'] = fig.layout.title.to_plotly_json()
+            return patch
+        
+        set_initial_time_range(fig, btc_data, time_range)
+        
         return fig
         
     except Exception as e:
         print(f"Error updating volatility chart: {e}")
+        metrics.mark_error()
         return go.Figure()
 
+def add_regime_shapes(fig, regimes, start, end):
+    """Shade the volatility regimes overlapping start..end; returns those regimes"""
+    visible = [regime for regime in regimes if regime['end'] >= start and regime['start'] <= end]
+    for regime in visible:
+        fig.add_vrect(
+            x0=str(max(regime['start'], start)),
+            x1=str(min(regime['end'], end)),
+            fillcolor=REGIME_COLORS.get(regime['label'], REGIME_COLORS['Normal Volatility']),
+            line_width=0,
+            layer="below",
+            row="all", col=1
+        )
+    return visible
+
+if CLIENTSIDE_RANGES:
+    # Ship the range boundaries once per refresh; range switches then stay in the browser
+    @app.callback(
+        Output("series-store", "data"),
+        [Input("data-version-store", "data")]
+    )
+    @metrics.timed("callback")
+    def update_series_store(version_info):
+        summary = build_range_summary(btc_data)
+        if summary is not None and risk_analysis is not None:
+            try:
+                summary['risk'] = {time_range: build_risk_cards(time_range) for time_range in TIME_RANGE_DAYS}
+            except Exception as e:
+                print(f"Error building risk cards: {e}")
+        return summary
+    
+    app.clientside_callback(
+        ClientsideFunction(namespace="timeRange", function_name="applyRange"),
+        [Output("price-chart", "figure", allow_duplicate=True),
+         Output("volume-chart", "figure", allow_duplicate=True),
+         Output("indicators-chart", "figure", allow_duplicate=True),
+         Output("volatility-chart", "figure", allow_duplicate=True),
+         Output("correlation-chart", "figure", allow_duplicate=True),
+         Output("price-change", "children", allow_duplicate=True)],
+        Input("time-range-store", "data"),
+        [State("series-store", "data"),
+         State("price-chart", "figure"),
+         State("volume-chart", "figure"),
+         State("indicators-chart", "figure"),
+         State("volatility-chart", "figure"),
+         State("correlation-chart", "figure")],
+        prevent_initial_call=True
+    )
+    
+    app.clientside_callback(
+        ClientsideFunction(namespace="timeRange", function_name="applyRisk"),
+        [Output(card, "children", allow_duplicate=True) for card in RISK_CARD_OUTPUTS],
+        Input("time-range-store", "data"),
+        State("series-store", "data"),
+        prevent_initial_call=True
+    )
+
+# Callbacks to run a Monte Carlo forecast in the background and poll for it
+@app.callback(
+    [Output("forecast-job", "data"),
+     Output("forecast-poll", "disabled")],
+    [Input("forecast-btn", "n_clicks")],
+    [State("forecast-method", "value"),
+     State("forecast-horizon", "value"),
+     State("forecast-paths", "value")],
+    prevent_initial_call=True
+)
+@metrics.timed("callback")
+def start_forecast(n_clicks, method, horizon_days, n_paths):
+    if btc_data is None:
+        return None, True
+    
+    key = (data_version, method, horizon_days, n_paths)
+    forecast_jobs.start(key, btc_data, method=method, horizon_days=horizon_days, n_paths=n_paths)
+    return list(key), False
+
+@app.callback(
+    [Output("forecast-chart", "figure"),
+     Output("forecast-status", "children"),
+     Output("forecast-poll", "disabled", allow_duplicate=True)],
+    [Input("forecast-poll", "n_intervals"),
+     Input("forecast-job", "data")],
+    prevent_initial_call=True
+)
+@metrics.timed("callback")
+def poll_forecast(n_intervals, job_key):
+    job = forecast_jobs.status(tuple(job_key)) if job_key else None
+    if job is None:
+        return go.Figure(), "", True
+    
+    if job['state'] == 'running':
+        return dash.no_update, f"Simulating... {job['done'] / job['total']:.0%}", False
+    if job['state'] == 'failed':
+        return go.Figure(), f"Forecast failed: {job['error']}", True
+    
+    try:
+        result = job['result']
+        status = (f"{result['paths']:,} paths in {job['seconds']:.1f} s • "
+                  f"P(above ${result['start_price']:,.0f}) = {result['probability_above_start']:.0%} • "
+                  f"Expected ${result['expected_price']:,.0f}")
+        return build_forecast_chart(result), status, True
+    except Exception as e:
+        print(f"Error updating forecast chart: {e}")
+        metrics.mark_error()
+        return go.Figure(), "", True
+
+def build_forecast_chart(result):
+    """Recent prices followed by the simulated percentile cones and a few sample paths"""
+    history = btc_data['price'].iloc[-result['horizon'] * 2:] if btc_data is not None else None
+    dates = result['dates']
+    cones = result['cones']
+    low, high = CONE_PERCENTILES[0], CONE_PERCENTILES[-1]
+    
+    fig = go.Figure()
+    
+    for path in result['sample_paths']:
+        fig.add_trace(go.Scatter(x=dates, y=path, mode='lines', line=dict(color='rgba(255,255,255,0.12)', width=1),
+                                 hoverinfo='skip', showlegend=False))
+    
+    # Outer and inner bands, each drawn as its upper edge then filled down to the lower one
+    for lower, upper, color in [(low, high, 'rgba(247,147,26,0.15)'), (25, 75, 'rgba(247,147,26,0.35)')]:
+        fig.add_trace(go.Scatter(x=dates, y=cones[upper], mode='lines', line=dict(width=0),
+                                 hoverinfo='skip', showlegend=False))
+        fig.add_trace(go.Scatter(x=dates, y=cones[lower], mode='lines', line=dict(width=0), fill='tonexty',
+                                 fillcolor=color, name=f'{lower}th-{upper}th percentile'))
+    
+    fig.add_trace(go.Scatter(x=dates, y=cones[50], mode='lines', line=dict(color='#f7931a', width=2),
+                             name='Median'))
+    
+    if history is not None:
+        fig.add_trace(go.Scatter(x=history.index, y=history, mode='lines', line=dict(color='white', width=2),
+                                 name='Bitcoin Price'))
+    
+    fig.update_layout(
+        title=f"{result['horizon']}-Step Forecast ({result['method']}, {result['paths']:,} paths)",
+        yaxis_title="Price (USD)",
+        height=500,
+        hovermode='x unified',
+        template='plotly_dark',
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='white'),
+        margin=dict(l=50, r=50, t=50, b=50),
+        legend=dict(orientation='h', y=-0.15)
+    )
+    
+    return fig
+
 # Callback to refresh data
+# The charts and cards listen to the version store, so they only update once
+# the new data is in place
 @app.callback(
-    Output("last-updated", "children"),
-    [Input("refresh-btn", "n_clicks")]
+    [Output("last-updated", "children"),
+     Output("data-version-store", "data")],
+    [Input("refresh-btn", "n_clicks")],
+    [State("data-version-store", "data")]
 )
-def refresh_data(n_clicks):
+@metrics.timed("callback")
+def refresh_data(n_clicks, version_info):
+    # The version this client shows is the base for incremental chart updates
+    base_version = version_info.get('version') if version_info else None
+    
     if n_clicks:
-        fetch_and_process_data()
-        return f"Last updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-    return f"Last updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+        refresh_datasets()
+    
+    return [
+        f"Last updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+        {'version': data_version, 'base': base_version}
+    ]
 
 # Callback to download data
 @app.callback(
     Output("download-dataframe-csv", "data"),
     [Input("download-btn", "n_clicks")],
+    [State("export-format", "value"),
+     State("export-columns", "value"),
+     State("time-range-store", "data")],
     prevent_initial_call=True
 )
-def download_csv(n_clicks):
+@metrics.timed("callback")
+def download_csv(n_clicks, export_format, columns, time_range):
     if btc_data is None:
         return None
     
     try:
-        # Prepare data for download
-        download_data = btc_data.reset_index()
-        download_data['date'] = download_data['date'].dt.strftime('%Y-%m-%d')
-        
-        return dcc.send_data_frame(
-            download_data.to_csv,
-            "bitcoin_analysis_data.csv",
-            index=False
-        )
+        payload = get_export(export_format, time_range, columns)
+        _, extension = EXPORT_FORMATS[export_format]
+        
+        return dcc.send_bytes(payload, f"bitcoin_analysis_data.{extension}")
     except Exception as e:
         print(f"Error downloading data: {e}")
+        metrics.mark_error()
         return None
 
+# Request latency, including callback output serialization. Dash updates are
+# labelled by their outputs, static assets aren't tracked.
+UNTRACKED_PATH_PREFIXES = ("/assets/", "/_dash-component-suites/", "/_favicon")
+
+@app.server.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+@app.server.after_request
+def record_request_latency(response):
+    start = g.pop('request_start', None)
+    if start is None or request.path.startswith(UNTRACKED_PATH_PREFIXES):
+        return response
+    
+    name = request.path
+    if request.path == "/_dash-update-component":
+        payload = request.get_json(silent=True) or {}
+        name = payload.get('output', name)
+        if response.content_length is not None:
+            payload_sizes.record(name, response.content_length)
+    
+    metrics.observe("http", name, time.perf_counter() - start, error=response.status_code >= 500)
+    return response
+
+# Prometheus scrape endpoint
+@app.server.route("/metrics")
+def metrics_endpoint():
+    return Response(metrics.render_prometheus(), mimetype='text/plain; version=0.0.4')
+
+# Latency summary (count, error rate, p50/p95/p99) as JSON
+@app.server.route("/metrics.json")
+def metrics_summary():
+    return jsonify(metrics.summary())
+
+# Circuit breaker state, smoothed latency and success rate per data source
+@app.server.route("/sources")
+def source_health_report():
+    return jsonify(fetcher.source_health.snapshot())
+
+# Alert rules and the most recently fired alerts
+@app.server.route("/alerts")
+def alerts_report():
+    return jsonify(alert_engine.snapshot())
+
+def get_memory_report():
+    """Deep byte sizes of the loaded datasets, per-range filtered copies and caches"""
+    return {
+        'datasets': {
+            'btc_data': dataset_report(btc_data),
+            'market_data': dataset_report(market_data),
+            # TechnicalAnalysis keeps its own copy of the price data plus the indicators
+            'technical_analysis': dataset_report(technical_analysis.data, shared_with=btc_data)
+                                  if technical_analysis is not None else None,
+            'correlations_bytes': deep_nbytes(correlations)
+        },
+        # Copy made by the chart callbacks for each time range
+        'filtered_copy_bytes': {
+            time_range: deep_nbytes(filter_data_by_time_range(btc_data, time_range))
+            for time_range in TIME_RANGE_DAYS
+        },
+        'caches': {
+            'export_cache': {'entries': len(export_cache), 'bytes': export_cache.nbytes()},
+            'dataset_versions': {'entries': len(dataset_versions), 'bytes': deep_nbytes(dataset_versions)}
+        },
+        'callback_payload_bytes': payload_sizes.summary(),
+        'tracemalloc': allocation_tracker.summary()
+    }
+
+# Memory accounting (tracemalloc snapshots need BTC_TRACEMALLOC=1)
+@app.server.route("/memory")
+def memory_report():
+    return jsonify(get_memory_report())
+
+# Live price updates as Server-Sent Events (live mode only)
+@app.server.route("/stream/price")
+def stream_price():
+    if price_broadcaster is None:
+        return Response("Live mode is disabled (set BTC_LIVE_MODE=1)", status=404)
+    
+    return Response(
+        stream_updates(price_broadcaster),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+# Streaming export endpoint, e.g. /export?format=parquet&range=1Y&columns=price,RSI
+@app.server.route("/export")
+def export_data():
+    export_format = request.args.get('format', 'csv')
+    time_range = request.args.get('range', '2Y')
+    columns = [col for col in request.args.get('columns', '').split(',') if col]
+    
+    if btc_data is None:
+        return Response("No data available", status=503)
+    
+    if export_format not in EXPORT_FORMATS:
+        return Response(f"Unsupported format, use one of: {', '.join(EXPORT_FORMATS)}", status=400)
+    
+    try:
+        payload = get_export(export_format, time_range, columns)
+    except ImportError:
+        return Response("Parquet and Arrow exports need pyarrow (pip install pyarrow)", status=501)
+    except Exception as e:
+        print(f"Error exporting data: {e}")
+        return Response("Export failed", status=500)
+    
+    mimetype, extension = EXPORT_FORMATS[export_format]
+    return Response(
+        iter_chunks(payload),
+        mimetype=mimetype,
+        headers={
+            'Content-Disposition': f'attachment; filename=bitcoin_analysis_data_{time_range}.{extension}',
+            'Content-Length': str(len(payload))
+        }
+    )
+
 if __name__ == '__main__':
     print("🚀 Starting Enhanced Bitcoin Price Analysis Dashboard...")
     print("Dashboard will be available at: http://127.0.0.1:8050")
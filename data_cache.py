@@ -0,0 +1,84 @@
+import json
+import os
+import tempfile
+import time
+
+from config import CACHE_DIR
+
+
+class TTLFileCache:
+    """
+    JSON values on disk that expire after a time-to-live
+
+    Each key is one file, written atomically, so concurrent processes (cron
+    checks, the dashboard, batch jobs) can share the cache directory.
+    Only standard library imports, to keep command line tools fast to start.
+    """
+
+    def __init__(self, directory=CACHE_DIR):
+        self.directory = directory
+
+    def _path(self, key):
+        safe_key = "".join(ch if ch.isalnum() or ch in "-_." else "_" for ch in key)
+        return os.path.join(self.directory, f"{safe_key}.json")
+
+    def get(self, key, ttl):
+        """Cached value for key if it is younger than ttl seconds, else None"""
+        try:
+            with open(self._path(key)) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if time.time() - entry.get('stored_at', 0) > ttl:
+            return None
+        return entry.get('value')
+
+    def set(self, key, value):
+        """Store a JSON-serializable value; cache write failures are not fatal"""
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'stored_at': time.time(), 'value': value}, f)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            print(f"⚠️  Could not write cache entry {key}: {e}")
+
+class DatasetCache:
+    """
+    DataFrames cached as Parquet files with a time-to-live
+
+    Used by batch jobs so repeated runs over the same symbols and ranges
+    don't refetch. pandas is only imported when a dataset is read or written.
+    """
+
+    def __init__(self, directory=os.path.join(CACHE_DIR, 'datasets')):
+        self.directory = directory
+
+    def _path(self, key):
+        safe_key = "".join(ch if ch.isalnum() or ch in "-_." else "_" for ch in key)
+        return os.path.join(self.directory, f"{safe_key}.parquet")
+
+    def get(self, key, ttl):
+        """Cached DataFrame for key if its file is younger than ttl seconds, else None"""
+        import pandas as pd
+
+        path = self._path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > ttl:
+                return None
+            return pd.read_parquet(path)
+        except Exception:
+            return None
+
+    def set(self, key, frame):
+        """Store a DataFrame; cache write failures are not fatal"""
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            os.close(fd)
+            frame.to_parquet(tmp_path)
+            os.replace(tmp_path, self._path(key))
+        except Exception as e:
+            print(f"⚠️  Could not write cached dataset {key}: {e}")
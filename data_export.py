@@ -0,0 +1,112 @@
+import gzip
+import io
+from collections import OrderedDict
+from threading import Lock
+
+# Supported export formats: (mimetype, file extension)
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'csv.gz': ('application/gzip', 'csv.gz'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+    'arrow': ('application/vnd.apache.arrow.file', 'arrow')
+}
+
+# Size of the pieces a streamed export is sent in
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+
+def prepare_export_frame(data, columns=None):
+    """
+    Select the requested columns and turn the date index into a column
+
+    Unknown columns are ignored; no (or only unknown) columns means all columns.
+    """
+    selected = [col for col in (columns or []) if col in data.columns]
+    frame = data[selected] if selected else data
+
+    frame = frame.reset_index()
+    if 'date' not in frame.columns:
+        frame = frame.rename(columns={frame.columns[0]: 'date'})
+
+    return frame
+
+def build_export(data, export_format, columns=None):
+    """
+    Serialize data to bytes in one of EXPORT_FORMATS
+
+    Parquet and Arrow IPC need pyarrow, which is only imported when used.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {export_format}")
+
+    frame = prepare_export_frame(data, columns)
+
+    if export_format in ('csv', 'csv.gz'):
+        # Vectorized date formatting instead of a per-row strftime
+        payload = frame.to_csv(index=False, date_format='%Y-%m-%d').encode('utf-8')
+        if export_format == 'csv.gz':
+            payload = gzip.compress(payload, compresslevel=6)
+        return payload
+
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    buffer = io.BytesIO()
+
+    if export_format == 'parquet':
+        import pyarrow.parquet as pq
+        pq.write_table(table, buffer, compression='snappy')
+    else:
+        with pa.ipc.new_file(buffer, table.schema) as writer:
+            writer.write_table(table)
+
+    return buffer.getvalue()
+
+def iter_chunks(payload, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield an export payload in chunks for a streamed response"""
+    view = memoryview(payload)
+    for start in range(0, len(view), chunk_size):
+        yield bytes(view[start:start + chunk_size])
+
+class ExportCache:
+    """
+    Built export artifacts keyed by dataset version, format, range and columns
+
+    Repeated downloads of the same selection are served without re-serializing.
+    Old entries are evicted least-recently-used first.
+    """
+
+    def __init__(self, max_entries=32):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def get_or_build(self, key, build):
+        """Return the cached artifact for key, building it with build() on a miss"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+
+        payload = build()
+
+        with self._lock:
+            self._entries[key] = payload
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        return payload
+
+    def clear(self):
+        """Drop every cached artifact"""
+        with self._lock:
+            self._entries.clear()
+
+    def nbytes(self):
+        """Total size of the cached artifacts"""
+        with self._lock:
+            return sum(len(payload) for payload in self._entries.values())
+
+    def __len__(self):
+        return len(self._entries)
@@ -1,42 +1,122 @@
 import requests
 import pandas as pd
-import yfinance as yf
 from datetime import datetime, timedelta
 import time
 import numpy as np
 
+from config import CRYPTOCOMPARE_BASE_URL, COINGECKO_BASE_URL, YAHOO_BASE_URL, DEDUPE_WINDOW
+from metrics import metrics
+from singleflight import SingleFlight
+from source_health import SourceHealthRegistry
+from time_index import epoch_seconds, normalize_frame
+from correlation_engine import BITCOIN, align_prices
+
+# CryptoCompare history endpoint and bar length in seconds per interval
+CRYPTOCOMPARE_INTERVALS = {
+    '1d': ('histoday', 86400),
+    '1h': ('histohour', 3600),
+    '1m': ('histominute', 60)
+}
+
+# Most bars CryptoCompare returns per request
+CRYPTOCOMPARE_PAGE_SIZE = 2000
+
+# Bitcoin history sources in their default order of reliability;
+# sample data is not listed, it is always the last resort
+BITCOIN_SOURCES = ("CryptoCompare", "CoinGecko", "Yahoo Finance")
+
+# Bar columns every Bitcoin source returns ('price' is the close), all float64
+PRICE_COLUMNS = ('price', 'open', 'high', 'low', 'volume', 'market_cap')
+
+# Columns a source may not have; they are NaN there and the indicators use the close
+OHLC_COLUMNS = ('open', 'high', 'low')
+
+def price_frame(index, columns):
+    """
+    Bar frame in the canonical column layout from a dict of column arrays
+
+    Missing open/high/low columns are NaN and a missing market cap is 0.
+    Every column is float64, so pandas keeps them in one contiguous block.
+    """
+    length = len(index)
+    frame = {}
+    for name in PRICE_COLUMNS:
+        values = columns.get(name)
+        if values is None:
+            frame[name] = np.full(length, np.nan if name in OHLC_COLUMNS else 0.0)
+        else:
+            frame[name] = np.asarray(values, dtype=np.float64)
+    return pd.DataFrame(frame, index=index)
+
 class DataFetcher:
-    def __init__(self):
-        self.coingecko_base_url = "https://api.coingecko.com/api/v3"
-        self.cryptocompare_base_url = "https://min-api.cryptocompare.com/data"
+    def __init__(self, coingecko_base_url=None, cryptocompare_base_url=None, yahoo_base_url=None, source_health=None):
+        """
+        API base URLs default to the configured ones (see config.py), so the
+        fetcher can be pointed at mock_market_server.py
+
+        yahoo_base_url: Yahoo chart API base URL; when unset, yfinance is used
+        source_health: SourceHealthRegistry deciding which sources to try and
+                       in which order (a fresh one per fetcher by default)
+        """
+        self.coingecko_base_url = coingecko_base_url or COINGECKO_BASE_URL
+        self.cryptocompare_base_url = cryptocompare_base_url or CRYPTOCOMPARE_BASE_URL
+        self.yahoo_base_url = yahoo_base_url or YAHOO_BASE_URL
+        self.source_health = source_health or SourceHealthRegistry(BITCOIN_SOURCES)
+        # Concurrent identical fetches share one upstream request
+        self.flights = SingleFlight(dedupe_window=DEDUPE_WINDOW)
         
     def fetch_bitcoin_data(self, days=730):  # 2 years = 730 days
-        """Fetch Bitcoin price data from multiple sources with fallbacks"""
+        """
+        Fetch Bitcoin price data from multiple sources with fallbacks
+
+        Sources whose circuit breaker is open are skipped, and the rest are
+        tried fastest healthy source first (see source_health.py). Sample
+        data is always the last fallback. Concurrent calls for the same
+        history share one fetch and get the same DataFrame.
+        """
+        return self.flights.do(('bitcoin', days), self._fetch_bitcoin_data, days)
+    
+    def _fetch_bitcoin_data(self, days):
         print("🔍 Fetching Bitcoin data from multiple sources...")
         
-        # Try multiple data sources in order of reliability
-        data_sources = [
-            ("CryptoCompare", self._fetch_from_cryptocompare),
-            ("CoinGecko", self._fetch_from_coingecko),
-            ("Yahoo Finance", self._fetch_from_yfinance),
-            ("Sample Data", self._generate_sample_data)
-        ]
+        fetch_funcs = {
+            "CryptoCompare": self._fetch_from_cryptocompare,
+            "CoinGecko": self._fetch_from_coingecko,
+            "Yahoo Finance": self._fetch_from_yfinance
+        }
         
-        for source_name, fetch_func in data_sources:
-            try:
-                print(f"Trying {source_name}...")
-                btc_data = fetch_func(days)
-                if btc_data is not None and not btc_data.empty:
-                    print(f"✅ Successfully fetched {len(btc_data)} days from {source_name}")
-                    return btc_data
-                else:
-                    print(f"⚠️  {source_name} returned no data")
-            except Exception as e:
-                print(f"❌ {source_name} failed: {str(e)[:100]}...")
+        source_order = self.source_health.order()
+        skipped = [name for name in BITCOIN_SOURCES if name not in source_order]
+        if skipped:
+            print(f"⏭️  Skipping {', '.join(skipped)} (circuit breaker open)")
+        
+        for position, source_name in enumerate(source_order):
+            start = time.perf_counter()
+            btc_data = None
+            with metrics.track("fetch_source", source_name) as attempt:
+                try:
+                    print(f"Trying {source_name}...")
+                    btc_data = fetch_funcs[source_name](days)
+                    if btc_data is None or btc_data.empty:
+                        print(f"⚠️  {source_name} returned no data")
+                        attempt.error = True
+                except Exception as e:
+                    print(f"❌ {source_name} failed: {str(e)[:100]}...")
+                    attempt.error = True
+            
+            if attempt.error:
+                self.source_health.record_failure(source_name, time.perf_counter() - start)
                 continue
+            
+            self.source_health.record_success(source_name, time.perf_counter() - start)
+            for unused in source_order[position + 1:]:
+                self.source_health.release(unused)
+            print(f"✅ Successfully fetched {len(btc_data)} days from {source_name}")
+            return btc_data
         
         print("❌ All data sources failed, using sample data")
-        return self._generate_sample_data(days)
+        with metrics.track("fetch_source", "Sample Data"):
+            return self._generate_sample_data(days)
     
     def _fetch_from_cryptocompare(self, days):
         """Fetch Bitcoin data from CryptoCompare API"""
@@ -65,22 +145,17 @@ class DataFetcher:
                 data = response.json()
                 
                 if data['Response'] == 'Success':
-                    # Extract price data
-                    prices = data['Data']['Data']
-                    
-                    # Convert to DataFrame
-                    df_data = []
-                    for price_point in prices:
-                        df_data.append({
-                            'date': datetime.fromtimestamp(price_point['time']),
-                            'price': price_point['close'],
-                            'volume': price_point['volumeto'],  # Volume in USD
-                            'market_cap': 0  # CryptoCompare doesn't provide this
-                        })
+                    # Extract OHLCV bars; CryptoCompare doesn't provide market cap
+                    bars = pd.DataFrame.from_records(data['Data']['Data'])
                     
-                    df = pd.DataFrame(df_data)
-                    df = df.set_index('date')
-                    df = df.sort_index()
+                    df = price_frame(pd.to_datetime(bars['time'].to_numpy(), unit='s'), {
+                        'price': bars['close'],
+                        'open': bars['open'],
+                        'high': bars['high'],
+                        'low': bars['low'],
+                        'volume': bars['volumeto']  # Volume in USD
+                    })
+                    df = normalize_frame(df)
                     
                     # Add returns and volatility
                     df['returns'] = df['price'].pct_change()
@@ -98,6 +173,81 @@ class DataFetcher:
             print(f"CryptoCompare API error: {e}")
             return None
     
+    def fetch_symbol_data(self, symbol='BTC', interval='1d', start_date=None, end_date=None):
+        """
+        Fetch price history for any CryptoCompare symbol and interval
+        
+        Pages back from end_date in requests of up to 2000 bars, so long
+        ranges at hourly or minute intervals work too.
+        
+        Parameters:
+        symbol (str): Coin symbol, e.g. 'BTC', 'ETH'
+        interval (str): '1d', '1h' or '1m'
+        start_date, end_date (datetime): Range to fetch, naive datetimes are UTC
+                                         (default: the last 2 years)
+        """
+        if interval not in CRYPTOCOMPARE_INTERVALS:
+            raise ValueError(f"Unsupported interval {interval}, use one of: {', '.join(CRYPTOCOMPARE_INTERVALS)}")
+        
+        endpoint, step = CRYPTOCOMPARE_INTERVALS[interval]
+        end_date = end_date or datetime.utcnow()
+        start_date = start_date or end_date - timedelta(days=730)
+        
+        url = f"{self.cryptocompare_base_url}/v2/{endpoint}"
+        start_ts = epoch_seconds(start_date)
+        to_ts = epoch_seconds(end_date)
+        pages = []
+        
+        try:
+            while to_ts >= start_ts:
+                params = {
+                    'fsym': symbol,
+                    'tsym': 'USD',
+                    'limit': max(1, min(CRYPTOCOMPARE_PAGE_SIZE, (to_ts - start_ts) // step)),
+                    'toTs': to_ts
+                }
+                response = requests.get(url, params=params, timeout=30)
+                
+                if response.status_code != 200:
+                    print(f"CryptoCompare API returned status {response.status_code} for {symbol}")
+                    return None
+                
+                data = response.json()
+                if data['Response'] != 'Success':
+                    print(f"CryptoCompare API error for {symbol}: {data.get('Message', 'Unknown error')}")
+                    return None
+                
+                bars = data['Data']['Data']
+                if not bars or bars[0]['time'] - step >= to_ts:
+                    break
+                pages.append(bars)
+                to_ts = bars[0]['time'] - step
+        except Exception as e:
+            print(f"CryptoCompare API error for {symbol}: {e}")
+            return None
+        
+        bars = [bar for page in reversed(pages) for bar in page]
+        if not bars:
+            return None
+        
+        bars = pd.DataFrame.from_records(bars)
+        df = price_frame(pd.to_datetime(bars['time'].to_numpy(), unit='s'), {
+            'price': bars['close'],
+            'open': bars['open'],
+            'high': bars['high'],
+            'low': bars['low'],
+            'volume': bars['volumeto']
+        })
+        
+        # Pages can overlap; bars before the coin was listed have a zero price
+        df = normalize_frame(df)
+        df = df[(df['price'] > 0) & (df.index >= pd.Timestamp(start_ts, unit='s'))]
+        
+        df['returns'] = df['price'].pct_change()
+        df['volatility'] = df['returns'].rolling(window=30).std()
+        
+        return df
+    
     def _fetch_from_coingecko(self, days):
         """Fetch Bitcoin data from CoinGecko API with improved error handling"""
         try:
@@ -129,26 +279,17 @@ class DataFetcher:
                 volumes = data.get('total_volumes', [])
                 market_caps = data.get('market_caps', [])
                 
-                # Convert to DataFrame
-                df = pd.DataFrame(prices, columns=['timestamp', 'price'])
-                df['date'] = pd.to_datetime(df['timestamp'], unit='ms')
-                
-                # Add volume if available
-                if volumes:
-                    df['volume'] = [vol[1] for vol in volumes]
-                else:
-                    df['volume'] = 0
-                
-                # Add market cap if available
-                if market_caps:
-                    df['market_cap'] = [cap[1] for cap in market_caps]
-                else:
-                    df['market_cap'] = 0
+                # market_chart has closes only (no open/high/low), plus
+                # volume and market cap when available
+                points = np.asarray(prices, dtype=np.float64)
+                df = price_frame(pd.to_datetime(points[:, 0], unit='ms'), {
+                    'price': points[:, 1],
+                    'volume': np.asarray(volumes, dtype=np.float64)[:, 1] if volumes else None,
+                    'market_cap': np.asarray(market_caps, dtype=np.float64)[:, 1] if market_caps else None
+                })
                 
-                # Clean up
-                df = df.drop('timestamp', axis=1)
-                df = df.set_index('date')
-                df = df.sort_index()
+                # The last point is the current price, which becomes today's bar
+                df = normalize_frame(df, floor='D')
                 
                 # Add returns and volatility
                 df['returns'] = df['price'].pct_change()
@@ -177,18 +318,30 @@ class DataFetcher:
             # Try multiple Bitcoin tickers
             tickers = ['BTC-USD', 'BTCUSD=X', 'BTC=X']
             
+            # yfinance is slow to import, so only load it when this fallback is reached
+            if not self.yahoo_base_url:
+                import yfinance as yf
+            
             for ticker in tickers:
                 try:
                     print(f"Trying yfinance ticker: {ticker}")
-                    btc = yf.Ticker(ticker)
-                    data = btc.history(start=start_date, end=end_date, interval="1d", progress=False)
+                    if self.yahoo_base_url:
+                        data = self._fetch_yahoo_chart(ticker, start_date, end_date)
+                    else:
+                        btc = yf.Ticker(ticker)
+                        data = btc.history(start=start_date, end=end_date, interval="1d", progress=False)
                     
                     if not data.empty and len(data) > 10:  # Need at least 10 days of data
-                        # Rename columns to match expected format
-                        df = pd.DataFrame()
-                        df['price'] = data['Close']
-                        df['volume'] = data['Volume']
-                        df['market_cap'] = 0  # yfinance doesn't provide market cap
+                        # Rename columns to match expected format; yfinance
+                        # doesn't provide market cap and its indexes are in exchange time
+                        df = price_frame(data.index, {
+                            'price': data['Close'],
+                            'open': data['Open'],
+                            'high': data['High'],
+                            'low': data['Low'],
+                            'volume': data['Volume']
+                        })
+                        df = normalize_frame(df, floor='D')
                         
                         # Add returns and volatility
                         df['returns'] = df['price'].pct_change()
@@ -210,6 +363,31 @@ class DataFetcher:
             print(f"yfinance API error: {e}")
             return None
     
+    def _fetch_yahoo_chart(self, ticker, start_date, end_date):
+        """Daily OHLCV bars from the Yahoo chart API at yahoo_base_url"""
+        url = f"{self.yahoo_base_url}/v8/finance/chart/{ticker}"
+        params = {
+            'period1': int(start_date.timestamp()),
+            'period2': int(end_date.timestamp()),
+            'interval': '1d'
+        }
+        
+        response = requests.get(url, params=params, timeout=30)
+        if response.status_code != 200:
+            print(f"Yahoo chart API returned status {response.status_code}")
+            return pd.DataFrame()
+        
+        result = response.json()['chart']['result'][0]
+        quote = result['indicators']['quote'][0]
+        
+        return pd.DataFrame({
+            'Open': quote['open'],
+            'High': quote['high'],
+            'Low': quote['low'],
+            'Close': quote['close'],
+            'Volume': quote['volume']
+        }, index=pd.to_datetime(result['timestamp'], unit='s'), dtype=np.float64)
+    
     def _generate_sample_data(self, days):
         """Generate realistic sample Bitcoin data for demonstration"""
         print("Generating realistic sample data for demonstration...")
@@ -256,20 +434,34 @@ class DataFetcher:
             else:
                 volumes.append(2e10)
         
-        # Create DataFrame
-        df = pd.DataFrame({
-            'price': prices,
+        # Create DataFrame; each bar opens at the previous close and its
+        # range spans the open and close (no intraday path is simulated)
+        closes = np.asarray(prices)
+        opens = np.concatenate((closes[:1], closes[:-1]))
+        df = price_frame(dates.floor('D').rename('date'), {
+            'price': closes,
+            'open': opens,
+            'high': np.maximum(opens, closes),
+            'low': np.minimum(opens, closes),
             'volume': volumes,
-            'market_cap': [price * 19_000_000 for price in prices],  # Approximate BTC supply
-            'returns': pd.Series(prices).pct_change(),
-            'volatility': pd.Series(prices).pct_change().rolling(window=30).std()
-        }, index=dates)
+            'market_cap': closes * 19_000_000  # Approximate BTC supply
+        })
+        df['returns'] = df['price'].pct_change()
+        df['volatility'] = df['returns'].rolling(window=30).std()
         
         print(f"✅ Generated {len(df)} days of realistic sample data")
         return df
     
     def fetch_traditional_markets(self, start_date, end_date):
-        """Fetch traditional market data for correlation analysis"""
+        """
+        Fetch traditional market data for correlation analysis
+
+        Concurrent calls for the same dates share one fetch.
+        """
+        key = ('markets', start_date.date(), end_date.date())
+        return self.flights.do(key, self._fetch_traditional_markets, start_date, end_date)
+    
+    def _fetch_traditional_markets(self, start_date, end_date):
         try:
             # Try multiple ticker formats for better reliability
             ticker_mappings = {
@@ -280,14 +472,21 @@ class DataFetcher:
             
             market_data = {}
             
+            if not self.yahoo_base_url:
+                import yfinance as yf
+            
             for market_name, tickers in ticker_mappings.items():
                 for ticker in tickers:
                     try:
                         print(f"Trying {market_name} ticker: {ticker}")
-                        data = yf.download(ticker, start=start_date, end=end_date, progress=False, timeout=30)
+                        if self.yahoo_base_url:
+                            data = self._fetch_yahoo_chart(ticker, start_date, end_date)
+                        else:
+                            data = yf.download(ticker, start=start_date, end=end_date, progress=False, timeout=30)
                         
                         if not data.empty and len(data) > 10:
-                            market_data[market_name] = data['Close']
+                            # One row per UTC day, whatever the exchange timezone
+                            market_data[market_name] = normalize_frame(data[['Close']], floor='D')['Close']
                             print(f"✅ {market_name} data fetched successfully")
                             break
                         else:
@@ -313,29 +512,36 @@ class DataFetcher:
             return None
     
     def calculate_correlations(self, btc_data, market_data):
-        """Calculate correlation between Bitcoin and traditional markets"""
+        """
+        Calculate correlation between Bitcoin and traditional markets
+
+        Prices are aligned on their common bars first (see
+        correlation_engine.align_prices) and returns taken over those bars,
+        so a Monday return spans the weekend for both Bitcoin and the markets.
+        """
         if btc_data is None or market_data is None:
             return None
         
         try:
-            # Align data by date
-            btc_returns = btc_data['returns'].dropna()
-            market_returns = market_data.pct_change().dropna()
-            
-            # Align indices
-            aligned_data = pd.concat([btc_returns, market_returns], axis=1).dropna()
-            
-            if len(aligned_data) < 30:  # Need sufficient data
+            prices, _ = align_prices(btc_data, market_data)
+            if len(prices) < 31:  # Need sufficient data (30 returns)
                 return None
             
+            btc_prices = prices[BITCOIN].to_numpy()
+            btc_returns = btc_prices[1:] / btc_prices[:-1] - 1
+            
             # Calculate correlations
             correlations = {}
-            for col in market_returns.columns:
-                if col in aligned_data.columns:
-                    corr = aligned_data['returns'].corr(aligned_data[col])
-                    correlations[col] = corr
+            for col in market_data.columns:
+                market_prices = prices[col].to_numpy()
+                returns = market_prices[1:] / market_prices[:-1] - 1
+                
+                valid = np.isfinite(btc_returns) & np.isfinite(returns)
+                if valid.sum() < 30:
+                    continue
+                correlations[col] = float(np.corrcoef(btc_returns[valid], returns[valid])[0, 1])
             
-            return correlations
+            return correlations or None
             
         except Exception as e:
             print(f"Error calculating correlations: {e}")
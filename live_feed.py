@@ -0,0 +1,179 @@
+import json
+import queue
+import threading
+import time
+
+import requests
+
+
+class CryptoComparePriceSource:
+    """Latest BTC/USD price from CryptoCompare's lightweight price endpoint"""
+
+    def __init__(self, base_url="https://min-api.cryptocompare.com/data"):
+        self.base_url = base_url
+
+    def poll(self):
+        """Return (timestamp, price) or None if the request failed"""
+        try:
+            response = requests.get(
+                f"{self.base_url}/price",
+                params={'fsym': 'BTC', 'tsyms': 'USD'},
+                timeout=10
+            )
+            if response.status_code == 200:
+                price = response.json().get('USD')
+                if price:
+                    return time.time(), float(price)
+            print(f"Live price request returned status {response.status_code}")
+        except Exception as e:
+            print(f"Live price request failed: {e}")
+        return None
+
+class ReplayPriceSource:
+    """
+    Replays recorded prices in a loop, a stand-in for the live feed
+
+    Used for tests and offline demos; each poll returns the next price.
+    """
+
+    def __init__(self, prices):
+        self.prices = [float(price) for price in prices]
+        self._position = 0
+
+        if not self.prices:
+            raise ValueError("ReplayPriceSource needs at least one price")
+
+    @classmethod
+    def from_file(cls, path):
+        """Load prices from a CSV file with a 'price' column, or one price per line"""
+        with open(path) as f:
+            lines = [line.strip() for line in f if line.strip()]
+
+        header = lines[0].split(',')
+        if 'price' in header:
+            column = header.index('price')
+            return cls(line.split(',')[column] for line in lines[1:])
+
+        return cls(lines)
+
+    def poll(self):
+        price = self.prices[self._position % len(self.prices)]
+        self._position += 1
+        return time.time(), price
+
+class PriceBroadcaster:
+    """
+    Polls one price source and fans the updates out to every subscriber
+
+    All viewers share a single upstream subscription: one background thread
+    polls the source and pushes each update onto the subscribers' queues.
+    A slow subscriber only ever holds the latest update, it never builds a
+    backlog. The thread stops when the last viewer leaves and the next
+    subscribe() starts it again.
+    """
+
+    def __init__(self, source, interval=5.0):
+        self.source = source
+        self.interval = interval
+        self.reference_price = None
+        self.latest = None
+
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stopped = False
+        # Wakes the polling thread early; whether it exits is decided under the lock
+        self._stop = threading.Event()
+
+    def set_reference_price(self, price):
+        """Previous close the 1D change is measured against"""
+        self.reference_price = float(price) if price else None
+
+    def subscribe(self):
+        """Register a viewer and return its update queue (starts polling on first use)"""
+        subscriber = queue.Queue(maxsize=1)
+
+        with self._lock:
+            if not self._subscribers:
+                # A stop requested for the previous session must not end this one
+                self._stop.clear()
+                self._stopped = False
+            self._subscribers.add(subscriber)
+            if self.latest is not None:
+                subscriber.put_nowait(self.latest)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="price-broadcaster", daemon=True)
+                self._thread.start()
+
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+            if not self._subscribers:
+                # Wake the polling thread so it exits now instead of after the interval
+                self._stop.set()
+
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+    def stop(self):
+        with self._lock:
+            self._stopped = True
+            self._stop.set()
+
+    def publish(self, timestamp, price):
+        """Build an update from a new price and hand it to every subscriber"""
+        change_1d = None
+        if self.reference_price:
+            change_1d = (price / self.reference_price - 1) * 100
+
+        message = {'timestamp': timestamp, 'price': price, 'change_1d': change_1d}
+
+        with self._lock:
+            self.latest = message
+            subscribers = list(self._subscribers)
+
+        for subscriber in subscribers:
+            # Replace a pending update the viewer hasn't picked up yet
+            try:
+                subscriber.get_nowait()
+            except queue.Empty:
+                pass
+            try:
+                subscriber.put_nowait(message)
+            except queue.Full:
+                pass
+
+        return message
+
+    def _run(self):
+        while True:
+            tick = self.source.poll()
+            if tick is not None:
+                self.publish(*tick)
+            self._stop.wait(self.interval)
+
+            # Viewers may have left and come back while polling or waiting
+            with self._lock:
+                if self._stopped or not self._subscribers:
+                    self._thread = None
+                    return
+
+def format_sse(message):
+    """Encode an update as a Server-Sent Events message"""
+    return f"data: {json.dumps(message)}\n\n"
+
+def stream_updates(broadcaster, keepalive=15.0):
+    """Generator for an SSE response: yields updates until the client disconnects"""
+    subscriber = broadcaster.subscribe()
+    try:
+        while True:
+            try:
+                yield format_sse(subscriber.get(timeout=keepalive))
+            except queue.Empty:
+                # Comment line keeps proxies from closing an idle connection
+                yield ": keepalive\n\n"
+    finally:
+        broadcaster.unsubscribe(subscriber)
@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""
+Concurrent-user load test for the dashboard
+
+Boots the app in-process against a synthetic stand-in data source (or
+targets a running dashboard with --url) and replays the callback traffic a
+browser sends to /_dash-update-component: the initial page load, then a mix
+of time range switches, refreshes and downloads from N simulated users.
+
+Usage:
+    python load_test.py --users 10 --duration 60
+    python load_test.py --users 25 --rows 100000 --think-time 0.5
+    python load_test.py --url http://127.0.0.1:8050 --users 5 --output load.json
+
+Reports throughput, latency percentiles and error rates per callback.
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from collections import defaultdict
+
+import requests
+
+# The dashboard module must not fetch live data when imported
+os.environ.setdefault("BTC_STARTUP_FETCH", "0")
+
+TIME_RANGE_BUTTONS = {
+    '1M': '1m-btn',
+    '3M': '3m-btn',
+    '6M': '6m-btn',
+    '1Y': '1y-btn',
+    '2Y': '2y-btn'
+}
+
+# Share of user actions: (action, weight)
+ACTIONS = [('switch_range', 0.7), ('refresh', 0.15), ('download', 0.15)]
+
+# Each user keeps one correlation view open
+CORRELATION_VIEWS = ['bars', 'rolling', 'heatmap']
+
+EXPORT_FORMATS = ['csv', 'csv.gz', 'parquet', 'arrow']
+
+# Viewport widths simulated users report
+VIEWPORT_WIDTHS = [1280, 1440, 1920, 2560]
+
+
+def parse_output_key(output_key):
+    """Dash output key ('a.b' or '..a.b...c.d..') to its outputs payload"""
+    def parse(spec):
+        component_id, prop = spec.rsplit('.', 1)
+        return {'id': component_id, 'property': prop}
+
+    if output_key.startswith('..'):
+        return [parse(spec) for spec in output_key[2:-2].split('...')]
+    return parse(output_key)
+
+class CallbackGraph:
+    """Server-side callbacks of the app, as returned by /_dash-dependencies"""
+
+    def __init__(self, dependencies):
+        self.callbacks = []
+
+        for dependency in dependencies:
+            # Clientside callbacks never reach the server
+            if dependency.get('clientside_function'):
+                continue
+            self.callbacks.append({
+                'output': dependency['output'],
+                'inputs': dependency['inputs'],
+                'state': dependency['state'],
+                'prevent_initial_call': dependency.get('prevent_initial_call', False)
+            })
+
+    def triggered_by(self, prop_id):
+        """Callbacks with prop_id among their inputs"""
+        return [cb for cb in self.callbacks
+                if any(f"{dep['id']}.{dep['property']}" == prop_id for dep in cb['inputs'])]
+
+    def producing(self, prop_id):
+        """Callback writing prop_id, if any runs on the server"""
+        for cb in self.callbacks:
+            outputs = parse_output_key(cb['output'])
+            outputs = outputs if isinstance(outputs, list) else [outputs]
+            if any(f"{out['id']}.{out['property']}" == prop_id for out in outputs):
+                return cb
+        return None
+
+class LoadStats:
+    """Latencies and errors per callback, shared by all simulated users"""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds, ok):
+        with self._lock:
+            self.latencies[name].append(seconds)
+            if not ok:
+                self.errors[name] += 1
+
+    def report(self, elapsed):
+        callbacks = {}
+        total = 0
+        total_errors = 0
+
+        for name in sorted(self.latencies):
+            samples = sorted(self.latencies[name])
+            count = len(samples)
+            total += count
+            total_errors += self.errors[name]
+
+            callbacks[name] = {
+                'count': count,
+                'errors': self.errors[name],
+                'error_rate': self.errors[name] / count,
+                'throughput_rps': count / elapsed,
+                'mean_ms': statistics.fmean(samples) * 1000,
+                'p50_ms': percentile(samples, 0.5) * 1000,
+                'p95_ms': percentile(samples, 0.95) * 1000,
+                'p99_ms': percentile(samples, 0.99) * 1000,
+                'max_ms': samples[-1] * 1000
+            }
+
+        return {
+            'elapsed_s': elapsed,
+            'requests': total,
+            'errors': total_errors,
+            'error_rate': total_errors / total if total else 0.0,
+            'throughput_rps': total / elapsed if elapsed else 0.0,
+            'callbacks': callbacks
+        }
+
+def percentile(ordered, q):
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+class SimulatedUser:
+    """
+    One browser session
+
+    Keeps the client-side values the callbacks read (version store, time
+    range, button clicks) and, like the Dash renderer, fires every callback
+    whose inputs changed after each response.
+    """
+
+    def __init__(self, base_url, graph, stats, think_time, rng):
+        self.base_url = base_url.rstrip('/')
+        self.graph = graph
+        self.stats = stats
+        self.think_time = think_time
+        self.rng = rng
+        self.session = requests.Session()
+
+        self.values = {
+            'viewport-store.data': rng.choice(VIEWPORT_WIDTHS),
+            'time-range-store.data': '2Y',
+            'refresh-btn.n_clicks': None,
+            'download-btn.n_clicks': None,
+            'export-format.value': 'csv',
+            'export-columns.value': [],
+            'correlation-view.value': rng.choice(CORRELATION_VIEWS),
+            'correlation-window.value': 90
+        }
+
+    def _payload(self, callback, changed):
+        def fill(dependencies):
+            return [dict(dep, value=self.values.get(f"{dep['id']}.{dep['property']}"))
+                    for dep in dependencies]
+
+        return {
+            'output': callback['output'],
+            'outputs': parse_output_key(callback['output']),
+            'inputs': fill(callback['inputs']),
+            'state': fill(callback['state']),
+            'changedPropIds': changed
+        }
+
+    def call(self, callback, changed):
+        """POST one callback, returns the props it changed"""
+        name = callback_name(callback['output'])
+        start = time.perf_counter()
+        try:
+            response = self.session.post(f"{self.base_url}/_dash-update-component",
+                                         json=self._payload(callback, changed), timeout=120)
+            ok = response.status_code in (200, 204)
+        except requests.RequestException:
+            response = None
+            ok = False
+        self.stats.record(name, time.perf_counter() - start, ok)
+
+        if not ok or response.status_code == 204:
+            return []
+
+        updated = []
+        for component_id, props in response.json().get('response', {}).items():
+            for prop, value in props.items():
+                prop_id = f"{component_id}.{prop}"
+                # Only keep values other callbacks read; figures are dropped
+                if self.graph.triggered_by(prop_id) or prop_id in self.values:
+                    self.values[prop_id] = value
+                    updated.append(prop_id)
+        return updated
+
+    def trigger(self, prop_ids):
+        """
+        Fire the callbacks listening to prop_ids, then the ones their outputs trigger
+
+        Like the renderer, each callback runs once per round even when
+        several of its inputs changed.
+        """
+        changed = list(dict.fromkeys(prop_ids))
+        while changed:
+            calls = {}
+            for prop_id in changed:
+                for callback in self.graph.triggered_by(prop_id):
+                    calls.setdefault(callback['output'], (callback, []))[1].append(prop_id)
+
+            changed = []
+            for callback, triggers in calls.values():
+                changed.extend(self.call(callback, triggers))
+            changed = list(dict.fromkeys(changed))
+
+    def load_page(self):
+        """
+        Initial callbacks: the button callbacks set the data version and time
+        range, the cards and charts then load once
+        """
+        changed = []
+        for callback in self.graph.callbacks:
+            if callback['prevent_initial_call']:
+                continue
+            if any(dep['property'] == 'n_clicks' for dep in callback['inputs']):
+                changed.extend(self.call(callback, []))
+        self.trigger(changed)
+
+    def switch_range(self):
+        time_range = self.rng.choice(list(TIME_RANGE_BUTTONS))
+        button = f"{TIME_RANGE_BUTTONS[time_range]}.n_clicks"
+        self.values[button] = (self.values.get(button) or 0) + 1
+
+        if self.graph.producing('time-range-store.data'):
+            self.trigger([button])
+        else:
+            # Clientside range mode: the store changes in the browser
+            self.values['time-range-store.data'] = time_range
+            self.trigger(['time-range-store.data'])
+
+    def refresh(self):
+        self.values['refresh-btn.n_clicks'] = (self.values['refresh-btn.n_clicks'] or 0) + 1
+        self.trigger(['refresh-btn.n_clicks'])
+
+    def download(self):
+        self.values['export-format.value'] = self.rng.choice(EXPORT_FORMATS)
+        self.values['download-btn.n_clicks'] = (self.values['download-btn.n_clicks'] or 0) + 1
+        self.trigger(['download-btn.n_clicks'])
+
+    def run(self, deadline):
+        self.load_page()
+
+        actions, weights = zip(*ACTIONS)
+        while time.monotonic() < deadline:
+            getattr(self, self.rng.choices(actions, weights)[0])()
+            if self.think_time:
+                time.sleep(self.rng.uniform(0, 2 * self.think_time))
+
+def callback_name(output_key):
+    """Readable name for a callback: its (first) output"""
+    outputs = parse_output_key(output_key)
+    first = outputs[0] if isinstance(outputs, list) else outputs
+    suffix = " (+more)" if isinstance(outputs, list) and len(outputs) > 1 else ""
+    return f"{first['id']}.{first['property']}{suffix}"
+
+def boot_app(rows, fetch_latency):
+    """Start the dashboard in a background thread on a free port, fed by synthetic data"""
+    from werkzeug.serving import make_server
+
+    # Per-request access logs would drown the report
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+
+    import dashboard
+    from synthetic_data import SyntheticDataFetcher
+
+    dashboard.fetcher = SyntheticDataFetcher(rows=rows, latency=fetch_latency)
+    dashboard.fetch_and_process_data()
+
+    server = make_server('127.0.0.1', 0, dashboard.app.server, threaded=True)
+    threading.Thread(target=server.serve_forever, name="dashboard-server", daemon=True).start()
+
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+def print_report(report, users):
+    print(f"\n📊 {users} users, {report['elapsed_s']:.1f} s: {report['requests']} requests, "
+          f"{report['throughput_rps']:.1f} req/s, {report['error_rate']:.1%} errors")
+    print(f"{'callback':<38} {'count':>6} {'err%':>6} {'req/s':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+
+    for name, stats in report['callbacks'].items():
+        print(f"{name:<38} {stats['count']:>6} {stats['error_rate']:>6.1%} {stats['throughput_rps']:>7.2f} "
+              f"{stats['p50_ms']:>8.1f} {stats['p95_ms']:>8.1f} {stats['p99_ms']:>8.1f} {stats['max_ms']:>8.1f}")
+    print("(latencies in ms)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the dashboard with concurrent simulated users")
+    parser.add_argument('--users', type=int, default=10, help="Concurrent simulated users (default: 10)")
+    parser.add_argument('--duration', type=float, default=30, help="Seconds to run after the page loads start (default: 30)")
+    parser.add_argument('--think-time', type=float, default=1.0, help="Mean pause between user actions in seconds (default: 1)")
+    parser.add_argument('--rows', type=int, default=730, help="Rows of synthetic data for the in-process app (default: 730)")
+    parser.add_argument('--fetch-latency', type=float, default=0.0, help="Simulated API latency per fetch in seconds (default: 0)")
+    parser.add_argument('--url', help="Load test a running dashboard instead of booting one")
+    parser.add_argument('--seed', type=int, default=1, help="Random seed for the user actions (default: 1)")
+    parser.add_argument('--output', help="Write the report as JSON to this file")
+    args = parser.parse_args()
+
+    server = None
+    if args.url:
+        base_url = args.url
+    else:
+        print(f"🚀 Booting dashboard with {args.rows:,} rows of synthetic data...")
+        server, base_url = boot_app(args.rows, args.fetch_latency)
+
+    try:
+        dependencies = requests.get(f"{base_url}/_dash-dependencies", timeout=30).json()
+        graph = CallbackGraph(dependencies)
+
+        stats = LoadStats()
+        master = random.Random(args.seed)
+        users = [SimulatedUser(base_url, graph, stats, args.think_time, random.Random(master.random()))
+                 for _ in range(args.users)]
+
+        print(f"👥 Running {args.users} users against {base_url} for {args.duration:.0f} s...")
+        start = time.monotonic()
+        deadline = start + args.duration
+        threads = [threading.Thread(target=user.run, args=(deadline,), daemon=True) for user in users]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        report = stats.report(time.monotonic() - start)
+        report['users'] = args.users
+        print_report(report, args.users)
+
+        if server is not None:
+            import dashboard
+
+            # The boot fetch isn't part of the run
+            report['upstream_fetches'] = dashboard.fetcher.fetches - 1
+            report['refresh_coalescing'] = dashboard.refresh_flight.stats()
+            print(f"🔁 {report['upstream_fetches']} upstream fetches for "
+                  f"{report['callbacks'].get('last-updated.children (+more)', {}).get('count', 0)} refresh callbacks")
+
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(report, f, indent=2)
+            print(f"💾 Report written to {args.output}")
+
+        return 1 if report['requests'] == 0 else 0
+    finally:
+        if server is not None:
+            server.shutdown()
+
+if __name__ == "__main__":
+    sys.exit(main())
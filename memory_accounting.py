@@ -0,0 +1,157 @@
+import functools
+import sys
+import threading
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# Allocation sites listed in a tracemalloc report
+TOP_ALLOCATIONS = 15
+
+# Stack frames stored per traced allocation
+TRACEMALLOC_FRAMES = 5
+
+
+def deep_nbytes(obj):
+    """Approximate deep size in bytes of a DataFrame, Series, array or container"""
+    if obj is None:
+        return 0
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(index=True, deep=True))
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    if isinstance(obj, (bytes, bytearray, memoryview)):
+        return len(obj)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(deep_nbytes(k) + deep_nbytes(v) for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return sys.getsizeof(obj) + sum(deep_nbytes(item) for item in obj)
+    return sys.getsizeof(obj)
+
+def column_report(data):
+    """Bytes and dtype of every column of a DataFrame, largest first"""
+    if data is None or data.empty:
+        return []
+
+    usage = data.memory_usage(index=False, deep=True)
+    columns = [
+        {'column': str(col), 'dtype': str(data[col].dtype), 'bytes': int(usage[col])}
+        for col in data.columns
+    ]
+    return sorted(columns, key=lambda entry: entry['bytes'], reverse=True)
+
+def dataset_report(data, shared_with=None):
+    """
+    Size summary for one dataset
+
+    Parameters:
+    data (pd.DataFrame): Dataset to measure
+    shared_with (pd.DataFrame): Another dataset this one copies columns from;
+        the bytes of the duplicated columns are reported
+    """
+    if data is None:
+        return None
+
+    report = {
+        'rows': len(data),
+        'columns': len(data.columns) if isinstance(data, pd.DataFrame) else 1,
+        'bytes': deep_nbytes(data),
+        'index_bytes': int(data.index.memory_usage(deep=True))
+    }
+
+    if isinstance(data, pd.DataFrame):
+        report['per_column'] = column_report(data)
+
+        if shared_with is not None:
+            duplicated = [col for col in data.columns if col in shared_with.columns]
+            report['duplicated_columns'] = duplicated
+            report['duplicated_bytes'] = int(data[duplicated].memory_usage(index=False, deep=True).sum()) if duplicated else 0
+
+    return report
+
+class AllocationTracker:
+    """
+    tracemalloc snapshots taken around selected calls
+
+    When enabled, tracing starts immediately; each wrapped call records the
+    top allocation sites that grew between a snapshot before and after it,
+    plus the traced peak during the call.
+    """
+
+    def __init__(self, enabled=False, top=TOP_ALLOCATIONS):
+        self.enabled = enabled
+        self.top = top
+        self.reports = {}
+        self._lock = threading.Lock()
+
+        if enabled and not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+
+    def tracked(self, name=None):
+        """Decorator recording the allocations of a function's calls"""
+        def decorator(func):
+            report_name = name or func.__name__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled or not tracemalloc.is_tracing():
+                    return func(*args, **kwargs)
+
+                with self._lock:
+                    before = tracemalloc.take_snapshot()
+                    tracemalloc.reset_peak()
+                    try:
+                        return func(*args, **kwargs)
+                    finally:
+                        _, peak = tracemalloc.get_traced_memory()
+                        after = tracemalloc.take_snapshot()
+                        self.reports[report_name] = self._build_report(before, after, peak)
+            return wrapper
+        return decorator
+
+    def _build_report(self, before, after, peak):
+        filters = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        stats = after.filter_traces(filters).compare_to(before.filter_traces(filters), 'lineno')
+
+        return {
+            'taken_at': datetime.now().isoformat(timespec='seconds'),
+            'net_bytes': sum(stat.size_diff for stat in stats),
+            'peak_bytes': peak,
+            'top_allocations': [
+                {
+                    'location': f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                    'size_diff_bytes': stat.size_diff,
+                    'size_bytes': stat.size,
+                    'count_diff': stat.count_diff
+                }
+                for stat in stats[:self.top]
+            ]
+        }
+
+    def summary(self):
+        current, peak = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (0, 0)
+        return {
+            'enabled': self.enabled,
+            'traced_bytes': current,
+            'traced_peak_bytes': peak,
+            'calls': self.reports
+        }
+
+class PayloadSizes:
+    """Size of the last response sent for each callback output (serialized figures and cards)"""
+
+    def __init__(self):
+        self._sizes = {}
+        self._lock = threading.Lock()
+
+    def record(self, name, nbytes):
+        with self._lock:
+            self._sizes[name] = nbytes
+
+    def summary(self):
+        with self._lock:
+            return dict(sorted(self._sizes.items(), key=lambda item: item[1], reverse=True))
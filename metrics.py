@@ -0,0 +1,169 @@
+import functools
+import threading
+import time
+from collections import deque
+
+# Histogram bucket upper bounds in seconds (Prometheus "le" labels)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Recent samples kept per series for the p50/p95/p99 summary
+QUANTILE_WINDOW = 1024
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class LatencySeries:
+    """Bucketed latency histogram plus a window of recent samples for quantiles"""
+
+    def __init__(self):
+        self.bucket_counts = [0] * len(LATENCY_BUCKETS)
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.recent = deque(maxlen=QUANTILE_WINDOW)
+
+    def observe(self, seconds, error=False):
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                self.bucket_counts[i] += 1
+                break
+        self.count += 1
+        self.total += seconds
+        self.recent.append(seconds)
+        if error:
+            self.errors += 1
+
+    def quantile(self, q):
+        """Quantile of the recent samples (None before the first sample)"""
+        if not self.recent:
+            return None
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+class Timer:
+    """Result of a tracked block; set error = True to count it as failed"""
+
+    def __init__(self):
+        self.error = False
+        self.seconds = None
+
+class MetricsRegistry:
+    """
+    Latency histograms, counts and error rates keyed by (kind, name)
+
+    kind groups related series (callback, fetch_source, fetch_stage,
+    indicators, http), name identifies the callback, source or stage.
+    """
+
+    def __init__(self):
+        self._series = {}
+        self._lock = threading.Lock()
+        self._active = threading.local()
+
+    def observe(self, kind, name, seconds, error=False):
+        with self._lock:
+            series = self._series.get((kind, name))
+            if series is None:
+                series = self._series[(kind, name)] = LatencySeries()
+            series.observe(seconds, error)
+
+    def track(self, kind, name):
+        """Context manager timing a block; exceptions are counted as errors and re-raised"""
+        return _Tracked(self, kind, name)
+
+    def timed(self, kind, name=None):
+        """Decorator timing every call of a function (named after the function by default)"""
+        def decorator(func):
+            series_name = name or func.__name__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.track(kind, series_name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def mark_error(self):
+        """Count the innermost tracked block as failed (for errors that are caught and handled)"""
+        stack = getattr(self._active, 'stack', None)
+        if stack:
+            stack[-1].error = True
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def summary(self):
+        """JSON-friendly summary: count, error rate, mean and p50/p95/p99 in milliseconds"""
+        with self._lock:
+            items = sorted(self._series.items())
+
+            summary = {}
+            for (kind, name), series in items:
+                entry = {
+                    'count': series.count,
+                    'errors': series.errors,
+                    'error_rate': series.errors / series.count if series.count else 0.0,
+                    'mean_ms': series.total / series.count * 1000 if series.count else None
+                }
+                for q in QUANTILES:
+                    value = series.quantile(q)
+                    entry[f'p{int(q * 100)}_ms'] = value * 1000 if value is not None else None
+                summary.setdefault(kind, {})[name] = entry
+
+        return summary
+
+    def render_prometheus(self):
+        """Prometheus text exposition format"""
+        lines = [
+            "# HELP btc_dashboard_duration_seconds Time spent in callbacks, fetches and calculations",
+            "# TYPE btc_dashboard_duration_seconds histogram"
+        ]
+        error_lines = [
+            "# HELP btc_dashboard_errors_total Failed callbacks, fetches and calculations",
+            "# TYPE btc_dashboard_errors_total counter"
+        ]
+
+        with self._lock:
+            for (kind, name), series in sorted(self._series.items()):
+                labels = f'kind="{_escape(kind)}",name="{_escape(name)}"'
+
+                cumulative = 0
+                for bound, bucket_count in zip(LATENCY_BUCKETS, series.bucket_counts):
+                    cumulative += bucket_count
+                    lines.append(f'btc_dashboard_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'btc_dashboard_duration_seconds_bucket{{{labels},le="+Inf"}} {series.count}')
+                lines.append(f'btc_dashboard_duration_seconds_sum{{{labels}}} {series.total:.6f}')
+                lines.append(f'btc_dashboard_duration_seconds_count{{{labels}}} {series.count}')
+
+                error_lines.append(f'btc_dashboard_errors_total{{{labels}}} {series.errors}')
+
+        return "\n".join(lines + error_lines) + "\n"
+
+class _Tracked:
+    def __init__(self, registry, kind, name):
+        self.registry = registry
+        self.kind = kind
+        self.name = name
+        self.timer = Timer()
+
+    def __enter__(self):
+        stack = getattr(self.registry._active, 'stack', None)
+        if stack is None:
+            stack = self.registry._active.stack = []
+        stack.append(self.timer)
+        self.start = time.perf_counter()
+        return self.timer
+
+    def __exit__(self, exc_type, exc, tb):
+        self.timer.seconds = time.perf_counter() - self.start
+        self.registry._active.stack.pop()
+        self.registry.observe(self.kind, self.name, self.timer.seconds,
+                              error=self.timer.error or exc_type is not None)
+        return False
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+# Process-wide registry used by the dashboard, fetcher and analysis
+metrics = MetricsRegistry()
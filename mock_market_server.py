@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Local mock of the market data APIs, for hermetic fetcher tests and benchmarks
+
+Serves synthetic data in the response shapes of:
+    /cryptocompare/data/v2/histoday, /v2/histohour, /v2/histominute and /price
+    /coingecko/api/v3/coins/bitcoin/market_chart and /simple/price
+    /yahoo/v8/finance/chart/<symbol>
+
+plus a POST /webhook receiver standing in for alert webhooks (see alerts.py),
+with configurable latency, error rate, 429 rate and payload size.
+
+Usage:
+    python mock_market_server.py --port 8765 --latency 0.2 --error-rate 0.1
+    python mock_market_server.py --fail cryptocompare,coingecko     # force fallbacks
+
+Point the dashboard or any script at it with the printed environment variables:
+    BTC_CRYPTOCOMPARE_URL=http://127.0.0.1:8765/cryptocompare/data
+    BTC_COINGECKO_URL=http://127.0.0.1:8765/coingecko/api/v3
+    BTC_YAHOO_URL=http://127.0.0.1:8765/yahoo
+"""
+
+import argparse
+import functools
+import json
+import random
+import sys
+import threading
+import time
+import zlib
+from collections import Counter, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs, unquote
+
+import pandas as pd
+
+from synthetic_data import generate_price_data
+
+PROVIDERS = ('cryptocompare', 'coingecko', 'yahoo')
+
+# Start prices for the symbols the fetchers ask for; others start at 100
+SYMBOL_PRICES = {
+    'BTC-USD': 110000, 'BTCUSD=X': 110000, 'BTC=X': 110000, 'ETH-USD': 4000, 'SOL-USD': 200,
+    '^GSPC': 5000, 'SPY': 500, '^VIX': 15,
+    'GC=F': 2000, 'GLD': 190, 'XAUUSD=X': 2000,
+    'DX-Y.NYB': 100, 'UUP': 28, 'DXY': 100
+}
+
+# Largest history one request can ask for
+MAX_BARS = 100_000
+
+
+def get_bars(symbol, bars, freq):
+    """The most recent synthetic OHLCV bars, consistent across request sizes"""
+    return get_history(symbol, freq).tail(bars).reset_index(drop=True)
+
+@functools.lru_cache(maxsize=32)
+def get_history(symbol, freq):
+    """MAX_BARS synthetic OHLCV bars ending at the current (whole) bar"""
+    end = pd.Timestamp.now().floor(freq)
+    data = generate_price_data(MAX_BARS, freq, start_price=SYMBOL_PRICES.get(symbol, 100),
+                               seed=zlib.crc32(symbol.encode()), end=end)
+
+    return pd.DataFrame({
+        'time': data.index.asi8 // 10**9,
+        'open': data['open'].to_numpy(),
+        'high': data['high'].to_numpy(),
+        'low': data['low'].to_numpy(),
+        'close': data['price'].to_numpy(),
+        'volume': data['volume'].to_numpy(),
+        'market_cap': data['market_cap'].to_numpy()
+    })
+
+class MockSettings:
+    """Failure injection and payload settings shared by all requests"""
+
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, rate_limit_rate=0.0,
+                 bars=None, fail=(), seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.bars = bars
+        self.fail = set(fail)
+        self.random = random.Random(seed)
+        self.requests = Counter()
+        self.webhooks = deque(maxlen=100)
+        self._lock = threading.Lock()
+
+    def draw(self):
+        with self._lock:
+            return self.random.random()
+
+    def count(self, provider, status):
+        with self._lock:
+            self.requests[f"{provider} {status}"] += 1
+
+class MockMarketHandler(BaseHTTPRequestHandler):
+    settings = MockSettings()
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        provider = url.path.strip('/').split('/')[0]
+
+        if url.path == '/_stats':
+            return self._send(200, dict(self.settings.requests))
+        if url.path == '/_webhooks':
+            return self._send(200, list(self.settings.webhooks))
+
+        if provider not in PROVIDERS:
+            return self._send(404, {'error': f"Unknown path {url.path}"})
+
+        settings = self.settings
+        if settings.latency or settings.jitter:
+            time.sleep(max(0.0, settings.latency + (2 * settings.draw() - 1) * settings.jitter))
+
+        if provider in settings.fail or settings.draw() < settings.error_rate:
+            return self._reply(provider, 500, {'error': "Injected server error"})
+        if settings.draw() < settings.rate_limit_rate:
+            return self._reply(provider, 429, {'error': "Injected rate limit"})
+
+        try:
+            body = getattr(self, f"_{provider}")(url.path, params)
+        except (KeyError, ValueError) as e:
+            return self._reply(provider, 400, {'error': str(e)})
+
+        if body is None:
+            return self._reply(provider, 404, {'error': f"Unknown path {url.path}"})
+        return self._reply(provider, 200, body)
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != '/webhook':
+            return self._send(404, {'error': f"Unknown path {url.path}"})
+
+        length = int(self.headers.get('Content-Length', 0))
+        try:
+            body = json.loads(self.rfile.read(length) or b'null')
+        except ValueError:
+            return self._reply('webhook', 400, {'error': "Body is not JSON"})
+
+        self.settings.webhooks.append(body)
+        return self._reply('webhook', 200, {'received': True})
+
+    def _bar_count(self, requested):
+        return min(self.settings.bars or requested, MAX_BARS)
+
+    def _cryptocompare(self, path, params):
+        if path.endswith('/price'):
+            bars = get_bars('BTC-USD', 2, 'D')
+            return {params.get('tsyms', 'USD').split(',')[0]: float(bars['close'].iloc[-1])}
+
+        freq = {'histoday': 'D', 'histohour': 'h', 'histominute': 'min'}.get(path.rsplit('/', 1)[-1])
+        if freq is None:
+            return None
+
+        # CryptoCompare returns limit + 1 bars, ending at toTs when given
+        bars = get_history(f"{params.get('fsym', 'BTC')}-USD", freq)
+        if 'toTs' in params:
+            bars = bars[bars['time'] <= int(params['toTs'])]
+        bars = bars.tail(self._bar_count(int(params.get('limit', 30)) + 1))
+        rows = [{
+            'time': int(bar.time), 'high': bar.high, 'low': bar.low, 'open': bar.open,
+            'volumefrom': bar.volume / bar.close, 'volumeto': bar.volume, 'close': bar.close,
+            'conversionType': 'direct', 'conversionSymbol': ''
+        } for bar in bars.itertuples()]
+
+        return {
+            'Response': 'Success', 'Message': '', 'HasWarning': False, 'Type': 100,
+            'Data': {'Aggregated': False, 'TimeFrom': rows[0]['time'] if rows else 0,
+                     'TimeTo': rows[-1]['time'] if rows else 0, 'Data': rows}
+        }
+
+    def _coingecko(self, path, params):
+        if path.endswith('/simple/price'):
+            bars = get_bars('BTC-USD', 2, 'D')
+            return {'bitcoin': {'usd': float(bars['close'].iloc[-1])}}
+        if not path.endswith('/market_chart'):
+            return None
+
+        bars = get_bars('BTC-USD', self._bar_count(int(params.get('days', 30)) + 1), 'D')
+        ms = (bars['time'] * 1000).tolist()
+
+        return {
+            'prices': [list(pair) for pair in zip(ms, bars['close'].tolist())],
+            'market_caps': [list(pair) for pair in zip(ms, bars['market_cap'].tolist())],
+            'total_volumes': [list(pair) for pair in zip(ms, bars['volume'].tolist())]
+        }
+
+    def _yahoo(self, path, params):
+        if '/v8/finance/chart/' not in path:
+            return None
+
+        symbol = unquote(path.rsplit('/', 1)[-1])
+        now = int(time.time())
+        start = int(params.get('period1', now - 365 * 86400))
+        end = int(params.get('period2', now))
+        bars = get_bars(symbol, self._bar_count(max(2, (end - start) // 86400)), 'D')
+
+        return {
+            'chart': {
+                'result': [{
+                    'meta': {'symbol': symbol, 'currency': 'USD', 'dataGranularity': '1d',
+                             'regularMarketPrice': float(bars['close'].iloc[-1])},
+                    'timestamp': bars['time'].tolist(),
+                    'indicators': {'quote': [{
+                        'open': bars['open'].tolist(),
+                        'high': bars['high'].tolist(),
+                        'low': bars['low'].tolist(),
+                        'close': bars['close'].tolist(),
+                        'volume': bars['volume'].tolist()
+                    }]}
+                }],
+                'error': None
+            }
+        }
+
+    def _reply(self, provider, status, body):
+        self.settings.count(provider, status)
+        self._send(status, body)
+
+    def _send(self, status, body):
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        if status == 429:
+            self.send_header('Retry-After', '1')
+        self.end_headers()
+        self.wfile.write(payload)
+
+class MockMarketServer:
+    """
+    Mock market data server running in a background thread
+
+    Example:
+        with MockMarketServer(latency=0.1, fail=['cryptocompare']) as server:
+            fetcher = DataFetcher(**server.fetcher_urls())
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, **settings):
+        handler = type('Handler', (MockMarketHandler,), {'settings': MockSettings(**settings)})
+        self.settings = handler.settings
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def fetcher_urls(self):
+        """Keyword arguments pointing a DataFetcher at this server"""
+        return {
+            'cryptocompare_base_url': f"{self.url}/cryptocompare/data",
+            'coingecko_base_url': f"{self.url}/coingecko/api/v3",
+            'yahoo_base_url': f"{self.url}/yahoo"
+        }
+
+    def environment(self):
+        """Environment variables pointing the dashboard at this server"""
+        urls = self.fetcher_urls()
+        return {
+            'BTC_CRYPTOCOMPARE_URL': urls['cryptocompare_base_url'],
+            'BTC_COINGECKO_URL': urls['coingecko_base_url'],
+            'BTC_YAHOO_URL': urls['yahoo_base_url']
+        }
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="mock-market-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock CryptoCompare, CoinGecko and Yahoo chart APIs")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Random +/- seconds around the latency")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Share of requests answered with 500")
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help="Share of requests answered with 429")
+    parser.add_argument('--bars', type=int, help="Bars per response, overriding the requested history length")
+    parser.add_argument('--fail', default='', help=f"Providers that always fail ({', '.join(PROVIDERS)})")
+    parser.add_argument('--seed', type=int, help="Seed for the injected failures")
+    args = parser.parse_args()
+
+    server = MockMarketServer(
+        host=args.host, port=args.port, latency=args.latency, jitter=args.jitter,
+        error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate, bars=args.bars,
+        fail=[name for name in args.fail.split(',') if name], seed=args.seed
+    )
+
+    print(f"🧪 Mock market data server on {server.url} (stats at {server.url}/_stats)")
+    for name, value in server.environment().items():
+        print(f"   export {name}={value}")
+    print(f"   export BTC_ALERT_WEBHOOK={server.url}/webhook      # alerts received at {server.url}/_webhooks")
+
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
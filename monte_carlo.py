@@ -0,0 +1,225 @@
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from config import MONTE_CARLO_WORKERS
+from time_index import DAY_NS, bar_step
+
+# Percentiles drawn as forecast cones
+CONE_PERCENTILES = (5, 25, 50, 75, 95)
+
+# Return models: resample historical returns, or draw from a normal fitted to them (GBM)
+METHODS = ('bootstrap', 'gbm')
+
+# Simulated returns held in memory at once per chunk (8 bytes each)
+CHUNK_VALUES = 4_000_000
+
+# Cumulative log returns are histogrammed per step on a grid of this many
+# bins spanning +/- HISTOGRAM_SIGMAS standard deviations of the step
+HISTOGRAM_BINS = 4000
+HISTOGRAM_SIGMAS = 10.0
+
+# Paths kept per job to draw as examples
+SAMPLE_PATHS = 20
+
+
+def _simulate_chunk(log_returns, method, mu, sigma, horizon, n_paths, seed, keep_paths):
+    """
+    Simulate n_paths paths of horizon steps and summarize them
+
+    Returns per-step histograms of the cumulative log return (in units of
+    sigma * sqrt(step)), so chunks from any worker can simply be added up,
+    plus the terminal statistics and the first keep_paths paths.
+    """
+    rng = np.random.default_rng(seed)
+    if method == 'bootstrap':
+        paths = log_returns[rng.integers(0, len(log_returns), size=(n_paths, horizon))]
+    else:
+        paths = rng.normal(mu, sigma, size=(n_paths, horizon))
+    np.cumsum(paths, axis=1, out=paths)
+
+    scale = sigma * np.sqrt(np.arange(1, horizon + 1))
+    width = 2 * HISTOGRAM_SIGMAS / HISTOGRAM_BINS
+    bins = np.floor((paths / scale + HISTOGRAM_SIGMAS) / width).astype(np.int64)
+    np.clip(bins, 0, HISTOGRAM_BINS - 1, out=bins)
+    bins += np.arange(horizon) * HISTOGRAM_BINS
+    counts = np.bincount(bins.ravel(), minlength=horizon * HISTOGRAM_BINS)
+
+    terminal = paths[:, -1]
+    return {
+        'counts': counts.reshape(horizon, HISTOGRAM_BINS),
+        'paths': n_paths,
+        'above_start': int(np.count_nonzero(terminal > 0)),
+        'terminal_ratio_sum': float(np.exp(terminal).sum()),
+        'samples': paths[:keep_paths].copy()
+    }
+
+class MonteCarloForecast:
+    """
+    Forward price paths simulated from a price series' own returns
+
+    The paths are generated in chunks that fit in CHUNK_VALUES, optionally
+    spread over a process pool; each chunk is reduced to per-step
+    histograms that are merged into percentile cones, so memory stays flat
+    from 10k to millions of paths. Seeds are derived per chunk, so results
+    don't depend on the number of workers.
+
+    Parameters:
+    data (pd.DataFrame): DataFrame with a 'price' column and a time index
+    method (str): 'bootstrap' (resample historical log returns) or 'gbm'
+    horizon_days (int): Days to simulate forward
+    n_paths (int): Number of paths
+    seed (int): Seed for reproducible runs
+    """
+
+    def __init__(self, data, method='bootstrap', horizon_days=90, n_paths=10_000, seed=42):
+        if method not in METHODS:
+            raise ValueError(f"Unsupported method {method}, use one of: {', '.join(METHODS)}")
+
+        prices = data['price'].to_numpy(dtype=np.float64)
+        log_returns = np.diff(np.log(prices))
+        self.log_returns = log_returns[np.isfinite(log_returns)]
+        if len(self.log_returns) < 2:
+            raise ValueError("Need at least 3 prices to simulate from")
+
+        self.method = method
+        self.n_paths = n_paths
+        self.seed = seed
+        self.start_price = float(prices[-1])
+        self.mu = float(self.log_returns.mean())
+        self.sigma = max(float(self.log_returns.std(ddof=1)), 1e-9)
+
+        step = bar_step(data.index) if isinstance(data.index, pd.DatetimeIndex) else DAY_NS
+        self.horizon = max(1, int(round(horizon_days * DAY_NS / step)))
+        self.dates = (data.index[-1] + pd.to_timedelta(np.arange(1, self.horizon + 1) * step, unit='ns')
+                      if isinstance(data.index, pd.DatetimeIndex) else np.arange(1, self.horizon + 1))
+
+    def _chunks(self):
+        chunk_paths = max(1, CHUNK_VALUES // self.horizon)
+        sizes = [min(chunk_paths, self.n_paths - start) for start in range(0, self.n_paths, chunk_paths)]
+        seeds = np.random.SeedSequence(self.seed).spawn(len(sizes))
+        for i, (size, seed) in enumerate(zip(sizes, seeds)):
+            yield (self.log_returns, self.method, self.mu, self.sigma, self.horizon, size, seed,
+                   SAMPLE_PATHS if i == 0 else 0)
+
+    def run(self, workers=MONTE_CARLO_WORKERS, progress=None):
+        """
+        Simulate all paths and return the percentile cones
+
+        workers: processes to spread the chunks over (1 runs in this process)
+        progress: optional callback receiving the number of paths done so far
+        """
+        total = None
+        done = 0
+
+        if workers > 1:
+            pool = ProcessPoolExecutor(max_workers=workers)
+            results = pool.map(_simulate_chunk, *zip(*self._chunks()))
+        else:
+            pool = None
+            results = (_simulate_chunk(*chunk) for chunk in self._chunks())
+
+        try:
+            for chunk in results:
+                if total is None:
+                    total = chunk
+                else:
+                    total['counts'] += chunk['counts']
+                    total['above_start'] += chunk['above_start']
+                    total['terminal_ratio_sum'] += chunk['terminal_ratio_sum']
+                done += chunk['paths']
+                if progress is not None:
+                    progress(done)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        total['paths'] = done
+        return self._summarize(total)
+
+    def _summarize(self, total):
+        counts = total['counts']
+        cumulative = np.cumsum(counts, axis=1)
+        width = 2 * HISTOGRAM_SIGMAS / HISTOGRAM_BINS
+        scale = self.sigma * np.sqrt(np.arange(1, self.horizon + 1))
+
+        cones = {}
+        for percentile in CONE_PERCENTILES:
+            target = percentile / 100 * total['paths']
+            # First bin reaching the target, then linear interpolation inside it
+            bins = np.argmax(cumulative >= target, axis=1)
+            steps = np.arange(self.horizon)
+            below = np.where(bins > 0, cumulative[steps, np.maximum(bins - 1, 0)], 0)
+            inside = np.maximum(counts[steps, bins], 1)
+            position = (bins + np.clip((target - below) / inside, 0.0, 1.0)) * width - HISTOGRAM_SIGMAS
+            cones[percentile] = self.start_price * np.exp(position * scale)
+
+        return {
+            'dates': self.dates,
+            'start_price': self.start_price,
+            'method': self.method,
+            'paths': total['paths'],
+            'horizon': self.horizon,
+            'cones': cones,
+            'probability_above_start': total['above_start'] / total['paths'],
+            'expected_price': self.start_price * total['terminal_ratio_sum'] / total['paths'],
+            'sample_paths': self.start_price * np.exp(total['samples'])
+        }
+
+class ForecastJobs:
+    """
+    Monte Carlo runs in background threads, keyed by their parameters
+
+    start() returns immediately; poll status() for progress and the result.
+    Finished results are kept (least recently used first out), so asking
+    for the same forecast again is instant.
+    """
+
+    def __init__(self, max_entries=8, workers=MONTE_CARLO_WORKERS):
+        self.max_entries = max_entries
+        self.workers = workers
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def start(self, key, data, **params):
+        """Start (or reuse) the job for key; returns its job key"""
+        with self._lock:
+            if key in self._jobs and self._jobs[key]['state'] != 'failed':
+                self._jobs.move_to_end(key)
+                return key
+
+            job = {'id': next(self._ids), 'state': 'running', 'done': 0, 'total': params.get('n_paths', 10_000),
+                   'result': None, 'error': None, 'started': time.monotonic(), 'seconds': None}
+            self._jobs[key] = job
+            while len(self._jobs) > self.max_entries:
+                oldest = next(iter(self._jobs))
+                if self._jobs[oldest]['state'] == 'running':
+                    break
+                self._jobs.popitem(last=False)
+
+        thread = threading.Thread(target=self._run, args=(job, data, params), name=f"monte-carlo-{job['id']}",
+                                  daemon=True)
+        thread.start()
+        return key
+
+    def _run(self, job, data, params):
+        try:
+            forecast = MonteCarloForecast(data, **params)
+            job['result'] = forecast.run(self.workers, progress=lambda done: job.update(done=done))
+            job['state'] = 'done'
+        except Exception as e:
+            print(f"❌ Monte Carlo forecast failed: {e}")
+            job['error'] = str(e)
+            job['state'] = 'failed'
+        job['seconds'] = time.monotonic() - job['started']
+
+    def status(self, key):
+        """The job dict for key (state, done, total, result, error, seconds) or None"""
+        with self._lock:
+            return self._jobs.get(key)
@@ -0,0 +1,94 @@
+"""
+Fast latest-price lookups for health checks and command line tools
+
+Uses CryptoCompare's smallest endpoints (CoinGecko as a fallback) and a
+local TTL cache, and skips pandas and the indicator work entirely.
+urllib is used instead of requests because importing requests alone
+takes longer than a cached lookup.
+"""
+
+import json
+import time
+from datetime import datetime, timezone
+
+from config import CRYPTOCOMPARE_BASE_URL, COINGECKO_BASE_URL, QUOTE_TTL
+from data_cache import TTLFileCache
+
+REQUEST_TIMEOUT = 5
+
+_cache = TTLFileCache()
+
+
+def _get_json(url):
+    from urllib.request import Request, urlopen
+
+    request = Request(url, headers={'Accept': 'application/json', 'User-Agent': 'btc-price-analysis'})
+    with urlopen(request, timeout=REQUEST_TIMEOUT) as response:
+        return json.loads(response.read())
+
+def _latest_from_cryptocompare():
+    data = _get_json(f"{CRYPTOCOMPARE_BASE_URL}/price?fsym=BTC&tsyms=USD")
+    return float(data['USD'])
+
+def _latest_from_coingecko():
+    data = _get_json(f"{COINGECKO_BASE_URL}/simple/price?ids=bitcoin&vs_currencies=usd")
+    return float(data['bitcoin']['usd'])
+
+def get_latest_price(ttl=QUOTE_TTL):
+    """
+    Latest BTC/USD price
+
+    Returns a dict with 'price', 'timestamp' (unix seconds), 'source' and
+    'cached', or None if every source failed. A cached price younger than
+    ttl seconds is returned without any network request.
+    """
+    cached = _cache.get('latest_price', ttl)
+    if cached is not None:
+        return dict(cached, cached=True)
+
+    for source_name, fetch in [("CryptoCompare", _latest_from_cryptocompare),
+                               ("CoinGecko", _latest_from_coingecko)]:
+        try:
+            quote = {'price': fetch(), 'timestamp': time.time(), 'source': source_name}
+            _cache.set('latest_price', quote)
+            return dict(quote, cached=False)
+        except Exception as e:
+            print(f"❌ {source_name} price request failed: {str(e)[:100]}")
+
+    return None
+
+def get_recent(n=5, ttl=QUOTE_TTL):
+    """
+    The n most recent daily closes, oldest first
+
+    Each entry has 'date' (YYYY-MM-DD, UTC), 'price' and 'change' (percent
+    against the previous close). The last entry is today's bar so far.
+    Returns None if the request failed.
+    """
+    key = f"recent_{n}"
+    cached = _cache.get(key, ttl)
+    if cached is not None:
+        return cached
+
+    try:
+        # limit=n returns n + 1 bars; the extra one gives the first change
+        data = _get_json(f"{CRYPTOCOMPARE_BASE_URL}/v2/histoday?fsym=BTC&tsym=USD&limit={n}")
+        if data.get('Response') != 'Success':
+            print(f"❌ CryptoCompare error: {data.get('Message', 'Unknown error')}")
+            return None
+        bars = data['Data']['Data']
+    except Exception as e:
+        print(f"❌ CryptoCompare history request failed: {str(e)[:100]}")
+        return None
+
+    recent = []
+    for previous, bar in zip(bars, bars[1:]):
+        recent.append({
+            'date': datetime.fromtimestamp(bar['time'], tz=timezone.utc).strftime('%Y-%m-%d'),
+            'price': bar['close'],
+            'change': (bar['close'] / previous['close'] - 1) * 100 if previous['close'] else None
+        })
+
+    recent = recent[-n:]
+    _cache.set(key, recent)
+    return recent
@@ -0,0 +1,205 @@
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+
+from config import (PROFILE_MODE, PROFILE_HEADER, PROFILE_DIR, PROFILE_FORMAT,
+                    PROFILE_INTERVAL_MS, PROFILE_MAX_PER_MINUTE)
+
+PROFILE_FORMATS = {'collapsed': 'collapsed.txt', 'speedscope': 'speedscope.json'}
+
+# Deepest stack recorded per sample
+MAX_STACK_DEPTH = 256
+
+
+class StackSampler:
+    """
+    Samples one thread's call stack at a fixed interval
+
+    Runs in a background thread using sys._current_frames(), so the profiled
+    code runs unmodified; overhead is bounded by the sampling interval.
+    Stacks are counted root first as tuples of (function, file, line).
+    """
+
+    def __init__(self, thread_id, interval=0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.duration = 0.0
+
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self):
+        self._start = time.perf_counter()
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.duration = time.perf_counter() - self._start
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+
+            stack = []
+            while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                code = frame.f_code
+                stack.append((code.co_name, os.path.basename(code.co_filename), code.co_firstlineno))
+                frame = frame.f_back
+
+            self.stacks[tuple(reversed(stack))] += 1
+
+def to_collapsed(stacks):
+    """Collapsed-stack text (one 'root;...;leaf count' line per stack) for flamegraph tools"""
+    lines = []
+    for stack, count in stacks.most_common():
+        lines.append(";".join(f"{name} ({filename}:{line})" for name, filename, line in stack) + f" {count}")
+    return "\n".join(lines) + "\n"
+
+def to_speedscope(stacks, name, interval, duration):
+    """Sampled profile in the speedscope file format"""
+    frame_ids = {}
+    frames = []
+    samples = []
+    weights = []
+
+    for stack, count in stacks.items():
+        sample = []
+        for frame in stack:
+            if frame not in frame_ids:
+                frame_ids[frame] = len(frames)
+                frames.append({'name': frame[0], 'file': frame[1], 'line': frame[2]})
+            sample.append(frame_ids[frame])
+        samples.append(sample)
+        weights.append(count * interval)
+
+    return {
+        '$schema': 'https://www.speedscope.app/file-format-schema.json',
+        'shared': {'frames': frames},
+        'profiles': [{
+            'type': 'sampled',
+            'name': name,
+            'unit': 'seconds',
+            'startValue': 0,
+            'endValue': duration,
+            'samples': samples,
+            'weights': weights
+        }],
+        'name': name,
+        'exporter': 'btc-price-analysis'
+    }
+
+class Profiler:
+    """
+    Opt-in profiling for selected functions
+
+    A wrapped call is profiled when profiling is enabled for the process or,
+    with allow_header, the current request sent an "X-Profile: 1" header.
+    At most max_per_minute profiles are recorded and only one runs at a
+    time, so it can stay enabled under real traffic.
+    """
+
+    def __init__(self, enabled=False, allow_header=False, output_dir="profiles",
+                 output_format="collapsed", interval_ms=5.0, max_per_minute=6):
+        if output_format not in PROFILE_FORMATS:
+            raise ValueError(f"Unsupported profile format: {output_format}")
+
+        self.enabled = enabled
+        self.allow_header = allow_header
+        self.output_dir = output_dir
+        self.output_format = output_format
+        self.interval = interval_ms / 1000
+        self.max_per_minute = max_per_minute
+
+        self._recent = deque()
+        self._lock = threading.Lock()
+        self._running = threading.Lock()
+
+    def requested(self):
+        """Whether the current call should be profiled (process setting or request header)"""
+        if self.enabled:
+            return True
+        if not self.allow_header:
+            return False
+
+        try:
+            from flask import has_request_context, request
+        except ImportError:
+            return False
+
+        return has_request_context() and request.headers.get("X-Profile", "").strip() in ("1", "true")
+
+    def _acquire_slot(self):
+        """Take one of this minute's profiling slots (False when the limit is reached)"""
+        now = time.monotonic()
+        with self._lock:
+            while self._recent and now - self._recent[0] > 60:
+                self._recent.popleft()
+            if len(self._recent) >= self.max_per_minute:
+                return False
+            self._recent.append(now)
+            return True
+
+    def profiled(self, name=None):
+        """Decorator profiling calls of a function when requested"""
+        def decorator(func):
+            profile_name = name or func.__name__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.requested():
+                    return func(*args, **kwargs)
+                # Only a profile that actually starts uses up a slot
+                if not self._running.acquire(blocking=False):
+                    return func(*args, **kwargs)
+                if not self._acquire_slot():
+                    self._running.release()
+                    return func(*args, **kwargs)
+
+                sampler = StackSampler(threading.get_ident(), self.interval)
+                sampler.start()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    sampler.stop()
+                    self._running.release()
+                    self.write(profile_name, sampler)
+            return wrapper
+        return decorator
+
+    def write(self, name, sampler):
+        """Write a finished profile to the output directory, returns the path"""
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            timestamp = datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+            path = os.path.join(self.output_dir, f"{name}-{timestamp}.{PROFILE_FORMATS[self.output_format]}")
+
+            with open(path, 'w') as f:
+                if self.output_format == 'speedscope':
+                    json.dump(to_speedscope(sampler.stacks, name, self.interval, sampler.duration), f)
+                else:
+                    f.write(to_collapsed(sampler.stacks))
+
+            print(f"🔬 Profile of {name} ({sampler.duration * 1000:.0f} ms) written to {path}")
+            return path
+        except Exception as e:
+            print(f"❌ Failed to write profile for {name}: {e}")
+            return None
+
+# Process-wide profiler configured from the environment
+profiler = Profiler(
+    enabled=PROFILE_MODE,
+    allow_header=PROFILE_HEADER,
+    output_dir=PROFILE_DIR,
+    output_format=PROFILE_FORMAT if PROFILE_FORMAT in PROFILE_FORMATS else 'collapsed',
+    interval_ms=PROFILE_INTERVAL_MS,
+    max_per_minute=PROFILE_MAX_PER_MINUTE
+)
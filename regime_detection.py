@@ -0,0 +1,209 @@
+import copy
+import math
+import threading
+
+import numpy as np
+import pandas as pd
+
+from time_index import DAY_NS, bar_step
+
+# Size of the volatility change the detector is tuned for (variance up by
+# this factor, or down by its inverse)
+VARIANCE_SHIFT = 3.0
+
+# CUSUM score (log likelihood ratio) that confirms a change
+CUSUM_THRESHOLD = 8.0
+
+# Bars a new regime collects before it is tested for the next change
+MIN_REGIME_BARS = 10
+
+# Squared standardized returns are capped here, so a single outlier can't
+# confirm a change on its own
+MAX_SQUARED_Z = 16.0
+
+# Regime labels by volatility relative to the long-run level, matching
+# get_volatility_analysis
+REGIME_LABELS = [(1.5, 'High Volatility'), (1.2, 'Above Average Volatility'), (0.8, 'Normal Volatility'),
+                 (0.0, 'Low Volatility')]
+
+# Bitcoin trades every day of the year
+TRADING_DAYS_PER_YEAR = 365
+
+
+def regime_label(ratio):
+    for floor, label in REGIME_LABELS:
+        if ratio > floor:
+            return label
+    return REGIME_LABELS[-1][1]
+
+class VolatilityRegimeDetector:
+    """
+    Online volatility regime detection with two-sided CUSUM tests
+
+    Each log return is scored against the variance of the current regime:
+    one CUSUM accumulates the evidence that the variance rose by
+    VARIANCE_SHIFT, the other that it fell by as much. When either passes
+    CUSUM_THRESHOLD, the regime is split where that CUSUM last started
+    rising. Only running sums are kept, so each bar is O(1), and a refresh
+    only feeds the bars that are new since the last one.
+
+    Parameters:
+    shift (float): Variance ratio the tests are tuned for
+    threshold (float): CUSUM score that confirms a change
+    min_bars (int): Bars a regime needs before it is tested
+    """
+
+    def __init__(self, shift=VARIANCE_SHIFT, threshold=CUSUM_THRESHOLD, min_bars=MIN_REGIME_BARS):
+        self.threshold = threshold
+        self.min_bars = min_bars
+        # Per-bar log likelihood ratio terms of the two tests: a + b * z^2
+        self._up = (-0.5 * math.log(shift), 0.5 * (1 - 1 / shift))
+        self._down = (0.5 * math.log(shift), 0.5 * (1 - shift))
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.step = None
+        self.last_timestamp = None
+        self.bars = 0
+        self.total_squares = 0.0
+        self.closed = []
+
+        self.regime_start = None
+        self.regime_bars = 0
+        self.regime_squares = 0.0
+
+        # CUSUM scores and, for each, where it started rising (timestamp and
+        # the regime's bar count and sum of squares just before)
+        self.up_score = self.down_score = 0.0
+        self.up_start = self.down_start = None
+
+    def _process(self, timestamps, log_returns):
+        """Feed bars in order (the hot loop, kept to plain local arithmetic)"""
+        up_a, up_b = self._up
+        down_a, down_b = self._down
+        threshold, min_bars = self.threshold, self.min_bars
+        up_score, down_score = self.up_score, self.down_score
+        up_start, down_start = self.up_start, self.down_start
+        regime_bars, regime_squares = self.regime_bars, self.regime_squares
+        bars, total_squares = self.bars, self.total_squares
+
+        for timestamp, r in zip(timestamps, log_returns):
+            if r != r:
+                continue
+            square = r * r
+            if self.regime_start is None:
+                self.regime_start = timestamp
+
+            if regime_bars >= min_bars:
+                variance = regime_squares / regime_bars
+                z2 = min(square / variance, MAX_SQUARED_Z) if variance > 0 else MAX_SQUARED_Z
+
+                score = up_score + up_a + up_b * z2
+                if score <= 0:
+                    up_score, up_start = 0.0, None
+                else:
+                    if up_start is None:
+                        up_start = (timestamp, regime_bars, regime_squares)
+                    up_score = score
+
+                score = down_score + down_a + down_b * z2
+                if score <= 0:
+                    down_score, down_start = 0.0, None
+                else:
+                    if down_start is None:
+                        down_start = (timestamp, regime_bars, regime_squares)
+                    down_score = score
+
+            regime_bars += 1
+            regime_squares += square
+            bars += 1
+            total_squares += square
+
+            if up_score > threshold or down_score > threshold:
+                start, before_bars, before_squares = up_start if up_score > threshold else down_start
+                self.closed.append({'start': self.regime_start, 'end': start, 'bars': before_bars,
+                                    'variance': before_squares / before_bars})
+                self.regime_start = start
+                regime_bars -= before_bars
+                regime_squares -= before_squares
+                up_score = down_score = 0.0
+                up_start = down_start = None
+
+        self.up_score, self.down_score = up_score, down_score
+        self.up_start, self.down_start = up_start, down_start
+        self.regime_bars, self.regime_squares = regime_bars, regime_squares
+        self.bars, self.total_squares = bars, total_squares
+
+    def _feed(self, data, first, last):
+        """Process the bars data[first:last] (first > 0 uses the bar before it for the return)"""
+        prices = data['price'].to_numpy(dtype=np.float64)[max(first - 1, 0):last]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            log_returns = np.diff(np.log(prices))
+        timestamps = data.index[max(first, 1):last]
+        self._process(timestamps, log_returns.tolist())
+        if last > 0:
+            self.last_timestamp = data.index[last - 1]
+
+    def update_frame(self, data):
+        """
+        Feed the bars of data that are new since the last call and return the regimes
+
+        The latest bar is still open and revised by every refresh, so it is
+        only applied to a copy of the state for the result; it is fed for
+        good once a newer bar arrives. When the data no longer contains the
+        last fed bar (a different source or history), the state is rebuilt.
+        """
+        with self._lock:
+            if len(data) == 0:
+                return []
+
+            first = 0
+            if self.last_timestamp is not None:
+                position = int(data.index.searchsorted(self.last_timestamp))
+                if position < len(data) and data.index[position] == self.last_timestamp:
+                    first = position + 1
+                else:
+                    self.reset()
+            if self.step is None:
+                self.step = bar_step(data.index) if isinstance(data.index, pd.DatetimeIndex) else DAY_NS
+
+            if first < len(data) - 1:
+                self._feed(data, first, len(data) - 1)
+
+            preview = copy.copy(self)
+            preview.closed = list(self.closed)
+            preview._feed(data, len(data) - 1, len(data))
+            return preview.regimes()
+
+    def regimes(self):
+        """
+        Closed regimes plus the current one, oldest first
+
+        Each is a dict with start, end (the next regime's start, or the last
+        bar for the current one), bars, annualised volatility, the ratio of its
+        volatility to the long-run level and a label.
+        """
+        if self.bars == 0:
+            return []
+
+        long_run = math.sqrt(self.total_squares / self.bars)
+        per_year = TRADING_DAYS_PER_YEAR * DAY_NS / (self.step or DAY_NS)
+        regimes = self.closed + [{'start': self.regime_start, 'end': self.last_timestamp,
+                                  'bars': self.regime_bars,
+                                  'variance': self.regime_squares / max(self.regime_bars, 1)}]
+
+        result = []
+        for regime in regimes:
+            volatility = math.sqrt(regime['variance'])
+            ratio = volatility / long_run if long_run > 0 else 1.0
+            result.append({
+                'start': regime['start'],
+                'end': regime['end'],
+                'bars': regime['bars'],
+                'volatility_annual': volatility * math.sqrt(per_year),
+                'ratio': ratio,
+                'label': regime_label(ratio)
+            })
+        result[-1]['current'] = True
+        return result
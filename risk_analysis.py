@@ -0,0 +1,256 @@
+import threading
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from time_index import DAY_NS, bar_step
+
+# Confidence level of VaR and CVaR
+CONFIDENCE = 0.95
+
+# Window of the rolling statistics, in days
+RISK_WINDOW_DAYS = 30
+
+# Annual risk-free rate used by Sharpe and Sortino
+RISK_FREE_RATE = 0.0
+
+# Bitcoin trades every day of the year
+TRADING_DAYS_PER_YEAR = 365
+
+# Windows processed at once by the rolling historical CVaR (bounds memory)
+CVAR_CHUNK_VALUES = 2_000_000
+
+
+class RiskAnalysis:
+    """
+    Risk and return distribution statistics for a price series
+
+    Running sums of the first four powers of the returns (and of the
+    squared downside returns) are built once, so the moments of any period
+    or rolling window come from two lookups instead of a rescan. Period
+    summaries are cached per start date, so each time range is computed
+    once per dataset.
+
+    Parameters:
+    data (pd.DataFrame): DataFrame with a 'price' column and a time index
+    confidence (float): VaR / CVaR confidence level
+    window_days (int): Window of the rolling statistics
+    """
+
+    def __init__(self, data, confidence=CONFIDENCE, window_days=RISK_WINDOW_DAYS):
+        self.confidence = confidence
+        self.window_days = window_days
+
+        prices = data['price'].to_numpy(dtype=np.float64)
+        self.index = data.index
+        self.prices = prices
+        self.returns = np.concatenate(([np.nan], prices[1:] / prices[:-1] - 1)) if len(prices) else prices
+
+        step = bar_step(data.index) if isinstance(data.index, pd.DatetimeIndex) else DAY_NS
+        self.periods_per_year = TRADING_DAYS_PER_YEAR * DAY_NS / step
+        self.window = max(2, int(round(window_days * DAY_NS / step)))
+
+        # Running sums over the returns, centred on their mean to keep the
+        # higher powers well conditioned; missing returns count as absent
+        returns = self.returns
+        valid = np.isfinite(returns)
+        self._center = float(np.mean(returns[valid])) if valid.any() else 0.0
+        centred = np.where(valid, returns - self._center, 0.0)
+        downside = np.where(valid, np.minimum(returns, 0.0), 0.0)
+
+        powers = np.stack([valid.astype(np.float64), centred, centred ** 2, centred ** 3, centred ** 4,
+                           downside ** 2], axis=1)
+        self._sums = np.vstack([np.zeros((1, powers.shape[1])), np.cumsum(powers, axis=0)])
+
+        self._summaries = {}
+        self._lock = threading.Lock()
+
+    def _moments(self, starts, ends):
+        """Count, mean, variance, skewness, excess kurtosis and downside deviation of returns[start:end]"""
+        sums = self._sums[ends] - self._sums[starts]
+        count = sums[:, 0]
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            m1 = sums[:, 1] / count
+            raw2, raw3, raw4 = sums[:, 2] / count, sums[:, 3] / count, sums[:, 4] / count
+
+            # Central moments from the raw moments around the global centre
+            m2 = np.clip(raw2 - m1 ** 2, 0.0, None)
+            m3 = raw3 - 3 * m1 * raw2 + 2 * m1 ** 3
+            m4 = raw4 - 4 * m1 * raw3 + 6 * m1 ** 2 * raw2 - 3 * m1 ** 4
+
+            # Sample (bias-adjusted) statistics, like pandas' std(), skew() and kurt()
+            skewness = m3 / m2 ** 1.5 * np.sqrt(count * (count - 1)) / (count - 2)
+            kurtosis = ((count + 1) * (m4 / m2 ** 2 - 3) + 6) * (count - 1) / ((count - 2) * (count - 3))
+
+            return {
+                'count': count,
+                'mean': m1 + self._center,
+                'variance': m2 * count / (count - 1),
+                'skewness': skewness,
+                'kurtosis': kurtosis,
+                'downside_deviation': np.sqrt(sums[:, 5] / count)
+            }
+
+    def _parametric(self, mean, std):
+        """Normal-distribution VaR and CVaR (positive numbers are losses)"""
+        tail = 1 - self.confidence
+        z = NormalDist().inv_cdf(tail)
+        var = -(mean + z * std)
+        cvar = -(mean - std * NormalDist().pdf(z) / tail)
+        return var, cvar
+
+    def summary(self, start=None):
+        """
+        Risk statistics of the period from start (a timestamp) to the last bar
+
+        Returns a dict; values that need more data than the period holds are None.
+        """
+        first = self._position(start)
+        with self._lock:
+            cached = self._summaries.get(first)
+        if cached is not None:
+            return cached
+
+        summary = self._summarize(first)
+        with self._lock:
+            self._summaries[first] = summary
+        return summary
+
+    def _position(self, start):
+        """Position of the first bar at or after start, clamped to the last bar"""
+        if start is None:
+            return 0
+        return min(int(self.index.searchsorted(start)), max(len(self.returns) - 1, 0))
+
+    def _summarize(self, first):
+        # Returns between the bars of the period (the first bar has none)
+        end = len(self.returns)
+        moments = self._moments(np.array([min(first + 1, end)]), np.array([end]))
+        moments = {name: float(values[0]) for name, values in moments.items()}
+        count = moments['count']
+
+        returns = self.returns[first + 1:]
+        returns = returns[np.isfinite(returns)]
+
+        summary = {
+            'periods': int(count),
+            'confidence': self.confidence,
+            'var_historical': None, 'cvar_historical': None,
+            'var_parametric': None, 'cvar_parametric': None,
+            'volatility_annual': None, 'sharpe': None, 'sortino': None,
+            'skewness': None, 'kurtosis': None
+        }
+        summary.update(self._drawdowns(first))
+
+        if count < 2:
+            return summary
+
+        std = np.sqrt(moments['variance'])
+        excess_mean = moments['mean'] - RISK_FREE_RATE / self.periods_per_year
+        scale = np.sqrt(self.periods_per_year)
+
+        # Historical: the (1 - confidence) quantile of the returns and the mean up to it
+        tail_count = _tail_count(len(returns), self.confidence)
+        tail = np.partition(returns, tail_count - 1)[:tail_count]
+        var_parametric, cvar_parametric = self._parametric(moments['mean'], std)
+
+        summary.update({
+            'var_historical': float(-tail.max()),
+            'cvar_historical': float(-tail.mean()),
+            'var_parametric': float(var_parametric),
+            'cvar_parametric': float(cvar_parametric),
+            'volatility_annual': float(std * scale),
+            'sharpe': float(excess_mean / std * scale) if std > 0 else None,
+            'sortino': float(excess_mean / moments['downside_deviation'] * scale)
+                       if moments['downside_deviation'] > 0 else None,
+            'skewness': _finite_or_none(moments['skewness']),
+            'kurtosis': _finite_or_none(moments['kurtosis'])
+        })
+        return summary
+
+    def _drawdowns(self, first):
+        """Max and current drawdown and their durations, measured from the running peak since first"""
+        prices = self.prices[first:]
+        if len(prices) == 0:
+            return {'max_drawdown': None, 'max_drawdown_duration_days': None,
+                    'current_drawdown': None, 'current_drawdown_duration_days': None}
+
+        peaks = np.maximum.accumulate(prices)
+        drawdown = prices / peaks - 1
+
+        # Position of the latest peak at every bar; time under water is the distance to it
+        positions = np.arange(len(prices))
+        last_peak = np.maximum.accumulate(np.where(prices >= peaks, positions, 0))
+        index = self.index[first:]
+        if isinstance(index, pd.DatetimeIndex):
+            under_water_days = (index.asi8 - index.asi8[last_peak]) / DAY_NS
+        else:
+            under_water_days = (positions - last_peak).astype(np.float64)
+
+        return {
+            'max_drawdown': float(-drawdown.min()),
+            'max_drawdown_duration_days': float(under_water_days.max()),
+            'current_drawdown': float(-drawdown[-1]),
+            'current_drawdown_duration_days': float(under_water_days[-1])
+        }
+
+    def rolling(self, start=None, historical=True):
+        """
+        Rolling statistics over window_days, one row per bar from start
+
+        Columns: parametric VaR / CVaR, skewness, excess kurtosis, annualised
+        volatility and drawdown from the running peak; with historical=True
+        also historical VaR / CVaR, which need a partial sort of every window
+        (O(rows x window)), so leave them out for very long minute-level series.
+        """
+        first = self._position(start)
+        ends = np.arange(max(first, self.window) + 1, len(self.returns) + 1)
+        starts = ends - self.window
+
+        moments = self._moments(starts, ends)
+        std = np.sqrt(moments['variance'])
+        var_parametric, cvar_parametric = self._parametric(moments['mean'], std)
+
+        prices = self.prices[ends[0] - 1:] if len(ends) else self.prices[:0]
+        result = pd.DataFrame({
+            'var_parametric': var_parametric,
+            'cvar_parametric': cvar_parametric,
+            'skewness': moments['skewness'],
+            'kurtosis': moments['kurtosis'],
+            'volatility_annual': std * np.sqrt(self.periods_per_year),
+            'drawdown': -(prices / np.maximum.accumulate(prices) - 1) if len(prices) else prices
+        }, index=self.index[ends - 1])
+
+        if historical:
+            result['var_historical'], result['cvar_historical'] = self._rolling_historical(starts, ends)
+        return result
+
+    def _rolling_historical(self, starts, ends):
+        """Historical VaR and CVaR of each window, partially sorting chunks of windows at a time"""
+        var = np.full(len(ends), np.nan)
+        cvar = np.full(len(ends), np.nan)
+        if len(ends) == 0:
+            return var, cvar
+
+        returns = np.where(np.isfinite(self.returns), self.returns, np.nan)
+        windows = np.lib.stride_tricks.sliding_window_view(returns, self.window)[starts]
+        tail_count = _tail_count(self.window, self.confidence)
+
+        chunk = max(1, CVAR_CHUNK_VALUES // self.window)
+        for offset in range(0, len(windows), chunk):
+            block = windows[offset:offset + chunk]
+            # NaNs sort last, so they only matter when a window is mostly missing
+            tail = np.partition(block, tail_count - 1, axis=1)[:, :tail_count]
+            var[offset:offset + chunk] = -tail.max(axis=1)
+            cvar[offset:offset + chunk] = -tail.mean(axis=1)
+
+        return var, cvar
+
+def _tail_count(n, confidence):
+    """Returns up to and including the (1 - confidence) quantile (numpy's 'lower' method)"""
+    return int(np.floor((n - 1) * (1 - confidence))) + 1
+
+def _finite_or_none(value):
+    return float(value) if np.isfinite(value) else None
@@ -6,10 +6,17 @@ Simple script to launch the dashboard with error handling
 
 import sys
 import os
+import argparse
+import importlib.util
 import subprocess
 import time
 from datetime import datetime
 
+# Package name -> module name, where they differ
+PACKAGE_MODULES = {
+    'dash-bootstrap-components': 'dash_bootstrap_components'
+}
+
 def check_dependencies():
     """Check if required dependencies are installed"""
     print("Checking dependencies...")
@@ -21,11 +28,11 @@ def check_dependencies():
     
     missing_packages = []
     
+    # find_spec locates a package without importing it, which takes seconds for all of them
     for package in required_packages:
-        try:
-            __import__(package.replace('-', '_'))
+        if importlib.util.find_spec(PACKAGE_MODULES.get(package, package)) is not None:
             print(f"✅ {package}")
-        except ImportError:
+        else:
             print(f"❌ {package}")
             missing_packages.append(package)
     
@@ -91,6 +98,39 @@ def run_tests():
         print(f"❌ Error running tests: {e}")
         return False
 
+def report_import_time(module='dashboard', top=15):
+    """Import a module with -X importtime and show the slowest top-level imports"""
+    print(f"\nMeasuring import time of {module}...")
+    
+    env = dict(os.environ, BTC_STARTUP_FETCH='0')
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            capture_output=True, text=True, env=env, timeout=300)
+    
+    if result.returncode != 0:
+        print(f"❌ Importing {module} failed:")
+        print(result.stderr[-2000:])
+        return False
+    
+    # Lines look like "import time:   self [us] |  cumulative | <indent>package"
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        imports.append((depth, int(cumulative), name.strip()))
+    
+    total = sum(cumulative for depth, cumulative, name in imports if depth == 0 and name == module)
+    print(f"Total: {total / 1000:.0f} ms")
+    
+    # Packages are charged to whichever module imported them first
+    print(f"Slowest imports made by {module}:")
+    direct = sorted((i for i in imports if i[0] == 1), key=lambda i: i[1], reverse=True)
+    for depth, cumulative, name in direct[:top]:
+        print(f"   {cumulative / 1000:>8.1f} ms  {name}")
+    
+    return True
+
 def launch_dashboard():
     """Launch the dashboard"""
     print("\n🚀 Launching Bitcoin Price Analysis Dashboard...")
@@ -109,6 +149,14 @@ def launch_dashboard():
 
 def main():
     """Main launcher function"""
+    parser = argparse.ArgumentParser(description="Bitcoin Price Analysis Dashboard Launcher")
+    parser.add_argument('--import-time', nargs='?', const='dashboard', metavar='MODULE',
+                        help="Report the import time of MODULE (default: dashboard) and exit")
+    args = parser.parse_args()
+    
+    if args.import_time:
+        return report_import_time(args.import_time)
+    
     print("Bitcoin Price Analysis Dashboard Launcher")
     print("=" * 50)
     print(f"Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
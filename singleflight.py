@@ -0,0 +1,79 @@
+import threading
+import time
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.finished_at = None
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key into one execution
+
+    While a call for a key is running, other callers with that key wait for
+    it and get its result (or its exception). A successful result is also
+    handed out for `dedupe_window` seconds after it finished, so a burst of
+    requests arriving just after a refresh doesn't start another one.
+    All callers get the same object and must not modify it.
+    """
+
+    def __init__(self, dedupe_window=0.0, clock=time.monotonic):
+        self.dedupe_window = dedupe_window
+        self.clock = clock
+        self.executions = 0
+        self.shared = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func, *args, **kwargs):
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None and call.done.is_set():
+                if call.error is None and self.clock() - call.finished_at < self.dedupe_window:
+                    self.shared += 1
+                    return call.result
+                call = None
+
+            if call is None:
+                call = self._calls[key] = _Call()
+                self.executions += 1
+                leader = True
+            else:
+                self.shared += 1
+                leader = False
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                call.finished_at = self.clock()
+                # Failures are only shared with the callers that waited for them
+                if call.error is not None and self._calls.get(key) is call:
+                    del self._calls[key]
+            call.done.set()
+
+        return call.result
+
+    def forget(self, key):
+        """Drop a finished result so the next call for key runs again"""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None and call.done.is_set():
+                del self._calls[key]
+
+    def stats(self):
+        with self._lock:
+            return {'executions': self.executions, 'shared': self.shared, 'in_flight': sum(
+                not call.done.is_set() for call in self._calls.values())}
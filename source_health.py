@@ -0,0 +1,135 @@
+import threading
+import time
+
+from config import BREAKER_FAILURES, BREAKER_COOLDOWN
+
+# Weight of the newest sample in the latency and success rate averages
+EWMA_ALPHA = 0.3
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class SourceHealth:
+    """Circuit breaker state plus smoothed latency and success rate of one data source"""
+
+    def __init__(self, name, rank):
+        self.name = name
+        self.rank = rank  # position in the default fallback order
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.probing = False
+        self.ewma_latency = None
+        self.ewma_success = 1.0
+        self.attempts = 0
+        self.failures = 0
+
+    def record(self, seconds, success):
+        self.attempts += 1
+        self.ewma_success += EWMA_ALPHA * ((1.0 if success else 0.0) - self.ewma_success)
+        if self.ewma_latency is None:
+            self.ewma_latency = seconds
+        else:
+            self.ewma_latency += EWMA_ALPHA * (seconds - self.ewma_latency)
+
+    def expected_cost(self):
+        """Expected seconds spent per successful fetch (None before the first attempt)"""
+        if self.ewma_latency is None:
+            return None
+        return self.ewma_latency / max(self.ewma_success, 0.01)
+
+    def to_dict(self, now):
+        return {
+            'state': self.state,
+            'consecutive_failures': self.consecutive_failures,
+            'attempts': self.attempts,
+            'failures': self.failures,
+            'ewma_latency_ms': self.ewma_latency * 1000 if self.ewma_latency is not None else None,
+            'ewma_success_rate': self.ewma_success,
+            'open_for_seconds': now - self.opened_at if self.opened_at is not None else None
+        }
+
+class SourceHealthRegistry:
+    """
+    Per-source circuit breakers and adaptive fallback order
+
+    A source is skipped (open) after `failure_threshold` consecutive
+    failures. Once `cooldown` seconds have passed one call is let through
+    as a probe (half-open): success closes the breaker, failure opens it
+    again for another cooldown. Usable sources are ordered by the expected
+    time per successful fetch, so the fastest healthy source goes first.
+    """
+
+    def __init__(self, source_names, failure_threshold=BREAKER_FAILURES, cooldown=BREAKER_COOLDOWN,
+                 clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.clock = clock
+        self._sources = {name: SourceHealth(name, rank) for rank, name in enumerate(source_names)}
+        self._lock = threading.Lock()
+
+    def order(self):
+        """
+        Source names to try, best first; open breakers are left out
+
+        A source due for its half-open probe goes first, because a fallback
+        that keeps working would otherwise hide the recovery forever. Only
+        one caller gets the probe at a time.
+        """
+        now = self.clock()
+        probes, usable = [], []
+
+        with self._lock:
+            for source in self._sources.values():
+                if source.state == OPEN and now - source.opened_at >= self.cooldown:
+                    source.state = HALF_OPEN
+                    source.probing = False
+
+                if source.state == CLOSED:
+                    usable.append(source)
+                elif source.state == HALF_OPEN and not source.probing:
+                    source.probing = True
+                    probes.append(source)
+
+        usable.sort(key=lambda source: (source.expected_cost() is None,
+                                        source.expected_cost() or 0.0, source.rank))
+        return [source.name for source in probes + usable]
+
+    def record_success(self, name, seconds):
+        with self._lock:
+            source = self._sources[name]
+            source.record(seconds, True)
+            source.consecutive_failures = 0
+            if source.state != CLOSED:
+                print(f"✅ {name} recovered, circuit breaker closed")
+            source.state = CLOSED
+            source.opened_at = None
+            source.probing = False
+
+    def record_failure(self, name, seconds):
+        with self._lock:
+            source = self._sources[name]
+            source.record(seconds, False)
+            source.failures += 1
+            source.consecutive_failures += 1
+
+            if source.state == HALF_OPEN or source.consecutive_failures >= self.failure_threshold:
+                if source.state != OPEN:
+                    print(f"⚡ {name} failed {source.consecutive_failures} times in a row, "
+                          f"skipping it for {self.cooldown:.0f} s")
+                source.state = OPEN
+                source.opened_at = self.clock()
+                source.probing = False
+
+    def release(self, name):
+        """Give back an unused half-open probe (e.g. an earlier source already succeeded)"""
+        with self._lock:
+            self._sources[name].probing = False
+
+    def snapshot(self):
+        """JSON-friendly health of every source"""
+        now = self.clock()
+        with self._lock:
+            return {name: source.to_dict(now) for name, source in self._sources.items()}
@@ -0,0 +1,169 @@
+import time
+
+import numpy as np
+import pandas as pd
+from datetime import datetime
+
+from data_fetcher import DataFetcher, price_frame
+
+# Bars per trend regime, as in DataFetcher._generate_sample_data
+TREND_LENGTH = 30
+
+# Share of the trend carried over to the next regime
+TREND_PERSISTENCE = 0.9
+
+# Time scale (days) over which the price reverts towards the start price
+PRICE_REVERSION_DAYS = 1460
+
+# Approximate BTC supply used for the market cap column
+BTC_SUPPLY = 19_000_000
+
+
+def default_frequency(rows):
+    """Finest bar size whose history still fits pandas' datetime range"""
+    if rows <= 20_000:
+        return 'D'
+    if rows <= 1_000_000:
+        return 'h'
+    return 'min'
+
+def generate_price_data(rows, freq=None, start_price=110000, seed=42, end=None):
+    """
+    Vectorized synthetic Bitcoin OHLCV data with the columns DataFetcher returns
+
+    Same model as the sample data (trend changes every 30 bars, volatility
+    rising with the trend, volume rising with the move size), but without
+    per-row Python loops so millions of rows are generated in seconds.
+
+    Parameters:
+    rows (int): Number of bars
+    freq (str): Bar size ('D', 'h', 'min'); chosen from rows when omitted
+    start_price (float): Price of the first bar
+    seed (int): Random seed, for reproducible data
+    end (datetime): Timestamp of the last bar (now by default)
+    """
+    freq = freq or default_frequency(rows)
+    rng = np.random.default_rng(seed)
+
+    end = pd.Timestamp(end or datetime.now())
+    dates = pd.date_range(end=end, periods=rows, freq=freq)
+
+    # Daily volatility and drift scaled to the bar size
+    bar_days = pd.tseries.frequencies.to_offset(freq).nanos / pd.Timedelta(days=1).value
+
+    # Trend shocks every 30 bars. Unlike the sample data's pure random walk
+    # the trend reverts to its mean, so long histories don't drift to
+    # overflow: an AR(1) process, run as an exponentially weighted mean.
+    n_trends = rows // TREND_LENGTH + 1
+    shocks = rng.normal(0, 0.001, n_trends)
+    shocks[0] = 0.0
+    alpha = 1 - TREND_PERSISTENCE
+    trend = 0.0001 + pd.Series(shocks / alpha).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+    trend = np.repeat(trend, TREND_LENGTH)[:rows]
+
+    volatility = (0.025 + np.abs(trend) * 2) * np.sqrt(bar_days)
+    log_returns = rng.normal(trend * bar_days, volatility)
+    log_returns[0] = 0.0
+
+    # The log price slowly reverts towards the start price (AR(1) again), so
+    # histories of 100k+ bars keep a realistic range instead of wandering
+    # off by orders of magnitude; over a few years it behaves like a random walk
+    reversion = min(1.0, bar_days / PRICE_REVERSION_DAYS)
+    log_price = pd.Series(log_returns / reversion).ewm(alpha=reversion, adjust=False).mean().to_numpy()
+
+    # Floor at about a tenth of the start price ($10k for the default, like the sample data)
+    prices = np.maximum(start_price * np.exp(log_price), start_price / 11)
+
+    move = np.abs(np.diff(prices, prepend=prices[0])) / prices
+    volumes = 2e10 * bar_days * (1 + move * 10) * rng.lognormal(0, 0.3, rows)
+
+    # Bars open at the previous close and range past the open and close by
+    # up to about half a bar's volatility
+    opens = np.concatenate((prices[:1], prices[:-1]))
+    wicks = np.abs(rng.normal(0, volatility / 2, (2, rows)))
+    highs = np.maximum(opens, prices) * np.exp(wicks[0])
+    lows = np.minimum(opens, prices) * np.exp(-wicks[1])
+
+    df = price_frame(dates, {
+        'price': prices,
+        'open': opens,
+        'high': highs,
+        'low': lows,
+        'volume': volumes,
+        'market_cap': prices * BTC_SUPPLY
+    })
+    df['returns'] = df['price'].pct_change()
+    df['volatility'] = df['returns'].rolling(window=30).std()
+
+    return df
+
+def generate_market_data(index, seed=7):
+    """Synthetic S&P 500, Gold and US Dollar closes on the given dates"""
+    rng = np.random.default_rng(seed)
+    markets = {
+        'S&P 500': (5000, 0.01),
+        'Gold': (2000, 0.008),
+        'US Dollar': (100, 0.004)
+    }
+
+    return pd.DataFrame({
+        name: start * np.cumprod(1 + rng.normal(0, vol, len(index)))
+        for name, (start, vol) in markets.items()
+    }, index=index)
+
+def generate_ticks(count, start=None, start_price=110000, ticks_per_second=20, seed=42):
+    """
+    Synthetic BTC/USD trades: (timestamps in ns, prices, sizes in BTC) arrays
+
+    Trades arrive as a Poisson process; the price is a random walk with the
+    sample data's 2.5% daily volatility, rounded to cents, and trade sizes
+    are lognormal around 0.02 BTC.
+    """
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp(start or datetime.now()).value
+
+    gaps = rng.exponential(1e9 / ticks_per_second, count)
+    timestamps = start + np.cumsum(gaps).astype(np.int64)
+
+    volatility = 0.025 * np.sqrt(gaps / pd.Timedelta(days=1).value)
+    prices = np.round(start_price * np.exp(np.cumsum(rng.normal(0, volatility))), 2)
+    sizes = np.round(rng.lognormal(np.log(0.02), 1.2, count), 8)
+
+    return timestamps, prices, sizes
+
+class SyntheticDataFetcher(DataFetcher):
+    """
+    Stand-in DataFetcher serving synthetic data, for load tests and offline runs
+
+    Every fetch returns one more bar than the previous one, like a live
+    source picking up new data between refreshes.
+
+    Parameters:
+    rows (int): Bars returned by the first fetch
+    freq (str): Bar size
+    latency (float): Seconds each fetch waits, to mimic a remote API
+    max_new_bars (int): Bars available for later fetches to append
+    """
+
+    def __init__(self, rows=730, freq='D', latency=0.0, max_new_bars=1000):
+        super().__init__()
+        self.rows = rows
+        self.latency = latency
+        self.fetches = 0
+
+        # The first fetch ends now, later fetches append the bars after it
+        bar = pd.tseries.frequencies.to_offset(freq)
+        self._history = generate_price_data(rows + max_new_bars, freq, end=pd.Timestamp.now() + max_new_bars * bar)
+
+    def fetch_bitcoin_data(self, days=730):
+        if self.latency:
+            time.sleep(self.latency)
+
+        end = min(self.rows + self.fetches, len(self._history))
+        self.fetches += 1
+        return self._history.iloc[:end].copy()
+
+    def fetch_traditional_markets(self, start_date, end_date):
+        if self.latency:
+            time.sleep(self.latency)
+        return generate_market_data(self._history.index)
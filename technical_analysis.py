@@ -1,6 +1,7 @@
 import pandas as pd
 import numpy as np
-from scipy import stats
+
+from metrics import metrics
 
 class TechnicalAnalysis:
     def __init__(self, data):
@@ -9,17 +10,33 @@ class TechnicalAnalysis:
         
         Parameters:
         data (pd.DataFrame): DataFrame with 'price', 'volume', 'returns' columns
+                             and optionally 'high' / 'low' (see get_bar_range)
         """
         self.data = data.copy()
+        self.high, self.low = self.get_bar_range()
         self.calculate_indicators()
     
+    def get_bar_range(self):
+        """Bar highs and lows, falling back to the close where a source has none"""
+        price = self.data['price']
+        bounds = []
+        for column in ('high', 'low'):
+            values = self.data[column] if column in self.data.columns else price
+            bounds.append(values.fillna(price) if values.hasnans else values)
+        return tuple(bounds)
+    
     def calculate_indicators(self):
         """Calculate all technical indicators"""
-        self.calculate_moving_averages()
-        self.calculate_volatility_indicators()
-        self.calculate_volume_indicators()
-        self.calculate_momentum_indicators()
-        self.calculate_support_resistance()
+        with metrics.track("indicators", "moving_averages"):
+            self.calculate_moving_averages()
+        with metrics.track("indicators", "volatility"):
+            self.calculate_volatility_indicators()
+        with metrics.track("indicators", "volume"):
+            self.calculate_volume_indicators()
+        with metrics.track("indicators", "momentum"):
+            self.calculate_momentum_indicators()
+        with metrics.track("indicators", "support_resistance"):
+            self.calculate_support_resistance()
     
     def calculate_moving_averages(self):
         """Calculate various moving averages"""
@@ -47,11 +64,13 @@ class TechnicalAnalysis:
         self.data['BB_width'] = (self.data['BB_upper'] - self.data['BB_lower']) / self.data['BB_middle']
         
         # Average True Range (ATR)
-        high_low = self.data['price'] - self.data['price'].shift(1)
-        high_close = np.abs(self.data['price'] - self.data['price'].shift(1))
-        low_close = np.abs(self.data['price'].shift(1) - self.data['price'])
+        previous_close = self.data['price'].shift(1)
+        high_low = self.high - self.low
+        high_close = np.abs(self.high - previous_close)
+        low_close = np.abs(self.low - previous_close)
         
-        true_range = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
+        # fmax skips the missing previous close of the first bar
+        true_range = np.fmax(high_low, np.fmax(high_close, low_close))
         self.data['ATR'] = true_range.rolling(window=14).mean()
         
         # Volatility ratio
@@ -81,8 +100,8 @@ class TechnicalAnalysis:
         self.data['RSI'] = 100 - (100 / (1 + rs))
         
         # Stochastic Oscillator
-        low_14 = self.data['price'].rolling(window=14).min()
-        high_14 = self.data['price'].rolling(window=14).max()
+        low_14 = self.low.rolling(window=14).min()
+        high_14 = self.high.rolling(window=14).max()
         self.data['stoch_k'] = 100 * ((self.data['price'] - low_14) / (high_14 - low_14))
         self.data['stoch_d'] = self.data['stoch_k'].rolling(window=3).mean()
         
@@ -92,8 +111,8 @@ class TechnicalAnalysis:
     def calculate_support_resistance(self):
         """Calculate support and resistance levels"""
         # Pivot Points
-        high = self.data['price'].rolling(window=20).max()
-        low = self.data['price'].rolling(window=20).min()
+        high = self.high.rolling(window=20).max()
+        low = self.low.rolling(window=20).min()
         close = self.data['price']
         
         self.data['pivot'] = (high + low + close) / 3
@@ -230,8 +249,8 @@ class TechnicalAnalysis:
             'price_change_1d': self.data['returns'].iloc[-1] * 100,
             'price_change_7d': ((self.data['price'].iloc[-1] / self.data['price'].iloc[-8]) - 1) * 100,
             'price_change_30d': ((self.data['price'].iloc[-1] / self.data['price'].iloc[-31]) - 1) * 100,
-            'highest_price': self.data['price'].max(),
-            'lowest_price': self.data['price'].min(),
+            'highest_price': self.high.max(),
+            'lowest_price': self.low.min(),
             'average_price': self.data['price'].mean(),
             'price_volatility': self.data['price'].std(),
             'total_volume': self.data['volume'].sum(),
@@ -183,6 +183,71 @@ def test_dashboard_imports():
         print(f"❌ Unexpected error: {e}")
         return False
 
+def test_price_broadcaster():
+    """Test that the live price feed keeps polling when a viewer leaves and another joins mid-poll"""
+    print("Testing Price Broadcaster...")
+    print("=" * 50)
+    
+    try:
+        import threading
+        import time
+        from live_feed import PriceBroadcaster, ReplayPriceSource
+        
+        class SlowSource(ReplayPriceSource):
+            """Replay source whose polls block until released"""
+            def __init__(self, prices):
+                super().__init__(prices)
+                self.polling = threading.Event()
+                self.release = threading.Event()
+                self.polls = 0
+            
+            def poll(self):
+                self.polls += 1
+                self.polling.set()
+                self.release.wait(5)
+                return super().poll()
+        
+        source = SlowSource([100, 101, 102])
+        broadcaster = PriceBroadcaster(source, interval=0.05)
+        
+        # The last viewer leaves and a new one joins while the thread is inside poll()
+        first = broadcaster.subscribe()
+        source.polling.wait(5)
+        broadcaster.unsubscribe(first)
+        second = broadcaster.subscribe()
+        source.release.set()
+        
+        second.get(timeout=5)
+        polls = source.polls
+        second.get(timeout=5)
+        if source.polls <= polls or not broadcaster._thread.is_alive():
+            print("❌ Polling stopped while a viewer was still subscribed")
+            return False
+        print("✅ Polling continues after a viewer rejoins during a poll")
+        
+        # Once every viewer has left, the thread stops and polling ends
+        broadcaster.unsubscribe(second)
+        time.sleep(0.3)
+        polls = source.polls
+        time.sleep(0.3)
+        if source.polls != polls or broadcaster._thread is not None:
+            print("❌ Polling continued with no viewers")
+            return False
+        print("✅ Polling stops when the last viewer leaves")
+        
+        # The next viewer starts it again
+        third = broadcaster.subscribe()
+        third.get(timeout=5)
+        third.get(timeout=5)
+        broadcaster.unsubscribe(third)
+        print("✅ Polling restarts for the next viewer")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Error testing price broadcaster: {e}")
+        traceback.print_exc()
+        return False
+
 def main():
     """Run all tests"""
     print("Bitcoin Price Analysis Dashboard - Test Suite")
@@ -197,6 +262,13 @@ def main():
     
     print()
     
+    # Test the live price feed (offline, replayed prices)
+    if not test_price_broadcaster():
+        print("\n❌ Price broadcaster tests failed.")
+        return False
+    
+    print()
+    
     # Test data fetcher
     if not test_data_fetcher():
         print("\n❌ Data fetcher tests failed.")
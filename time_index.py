@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+
+NS_PER_SECOND = 10**9
+DAY_NS = 86400 * NS_PER_SECOND
+
+# Rows looked at to estimate a frame's bar size
+BAR_STEP_SAMPLE = 1000
+
+
+def to_utc_index(index):
+    """DatetimeIndex in UTC without a timezone (tz-aware indexes are converted first)"""
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_convert('UTC').tz_localize(None)
+    return index
+
+def epoch_seconds(moment):
+    """Unix seconds of a datetime; naive datetimes are taken to be UTC like the canonical index"""
+    moment = pd.Timestamp(moment)
+    if moment.tz is None:
+        moment = moment.tz_localize('UTC')
+    return int(moment.timestamp())
+
+def normalize_frame(frame, floor=None):
+    """
+    Put a price frame on the canonical index: UTC-naive, sorted, one row per bar
+
+    floor: bar size to snap timestamps to (e.g. 'D' for daily sources whose
+           timestamps carry the exchange open or the time of the request);
+           when several rows fall into one bar the last one is kept
+    """
+    index = to_utc_index(frame.index)
+    if floor is not None:
+        index = index.floor(floor)
+
+    frame = frame.set_axis(index.rename('date'))
+    if not frame.index.is_monotonic_increasing:
+        frame = frame.sort_index(kind='stable')
+    if frame.index.has_duplicates:
+        frame = frame[~frame.index.duplicated(keep='last')]
+    return frame
+
+def bar_step(index):
+    """Typical bar size of a sorted DatetimeIndex in nanoseconds (median spacing of its first rows)"""
+    values = index.asi8[:BAR_STEP_SAMPLE + 1]
+    if len(values) < 2:
+        return DAY_NS
+    return max(1, int(np.median(np.diff(values))))
+
+def bar_keys(index, step):
+    """int64 bar numbers since the epoch (UTC) for a canonical index and a bar size in nanoseconds"""
+    return index.asi8 // step
+
+def last_per_key(keys):
+    """Positions of the last row of each run of equal keys in a sorted key array"""
+    if len(keys) == 0:
+        return np.empty(0, dtype=np.intp)
+    return np.flatnonzero(np.append(keys[1:] != keys[:-1], True))
+
+def merge_join(left_keys, right_keys):
+    """
+    Inner join of two sorted, unique int64 key arrays
+
+    Returns the common keys and their positions in each array. The stable
+    sort inside intersect1d merges the two already sorted runs, so this is
+    linear in the total length.
+    """
+    # Frames on the same bar grid need no search at all
+    if np.array_equal(left_keys, right_keys):
+        positions = np.arange(len(left_keys))
+        return left_keys, positions, positions
+    return np.intersect1d(left_keys, right_keys, assume_unique=True, return_indices=True)
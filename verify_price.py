@@ -3,38 +3,39 @@
 Quick verification of current Bitcoin price
 """
 
-from data_fetcher import DataFetcher
+import sys
 from datetime import datetime
 
+from price_quote import get_latest_price, get_recent
+
 def main():
     print("🔍 Verifying Current Bitcoin Price")
     print("=" * 40)
-    
-    fetcher = DataFetcher()
-    
-    # Fetch current Bitcoin data
-    print("Fetching latest Bitcoin data...")
-    btc_data = fetcher.fetch_bitcoin_data(days=30)  # Just get recent data
-    
-    if btc_data is not None and not btc_data.empty:
-        current_price = btc_data['price'].iloc[-1]
-        current_date = btc_data.index[-1]
-        
-        print(f"✅ Current Bitcoin Price: ${current_price:,.2f}")
-        print(f"📅 Last Updated: {current_date.strftime('%Y-%m-%d %H:%M:%S')}")
-        print(f"📊 Data Source: CryptoCompare API")
-        print(f"📈 24h Change: {btc_data['returns'].iloc[-1]*100:+.2f}%")
-        
-        # Show last 5 prices for verification
+
+    # Latest price from the lightest endpoint (or the local cache)
+    quote = get_latest_price()
+
+    if quote is None:
+        print("❌ Failed to fetch Bitcoin price")
+        return False
+
+    source = f"{quote['source']} (cached)" if quote['cached'] else quote['source']
+    print(f"✅ Current Bitcoin Price: ${quote['price']:,.2f}")
+    print(f"📅 Last Updated: {datetime.fromtimestamp(quote['timestamp']).strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"📊 Data Source: {source}")
+
+    # Show last 5 daily closes for verification
+    recent = get_recent(5)
+    if recent:
+        if recent[-1]['change'] is not None:
+            print(f"📈 24h Change: {recent[-1]['change']:+.2f}%")
+
         print(f"\n📊 Last 5 Prices:")
-        for i in range(-5, 0):
-            date = btc_data.index[i]
-            price = btc_data['price'].iloc[i]
-            change = btc_data['returns'].iloc[i] * 100
-            print(f"   {date.strftime('%m-%d')}: ${price:,.2f} ({change:+.2f}%)")
-            
-    else:
-        print("❌ Failed to fetch Bitcoin data")
+        for bar in recent:
+            change = f" ({bar['change']:+.2f}%)" if bar['change'] is not None else ""
+            print(f"   {bar['date'][5:]}: ${bar['price']:,.2f}{change}")
+
+    return True
 
 if __name__ == "__main__":
-    main()
+    sys.exit(0 if main() else 1)